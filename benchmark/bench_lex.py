@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+"""
+Micro-benchmark of the where_builder2 lexers, run from the repository root:
+
+    python -m benchmark.bench_lex [seconds]
+"""
+import sys
+import time
+
+from src.pydoo.where_builder2.lex import Lex
+from src.pydoo.where_builder2.table_lex import TableLex
+
+KEYS = (
+    'id',
+    'name?^',
+    'id , between',
+    'col1 | col2 !=',
+    'col/FROM_UNIXTIME/DATE',
+    '/STR_TO_DATE(*, \'%Y-%M-%D\')',
+    '/FUNC2(*, arg)/FUNC3(arg1, *)',
+    ' {st{r(in}g} ',
+    'col->Integer',
+    '#not exists',
+)
+
+
+def bench(lexer, seconds: float) -> float:
+    tokens = 0
+    deadline = time.perf_counter() + seconds
+    start = time.perf_counter()
+    while time.perf_counter() < deadline:
+        for key in KEYS:
+            tokens += lexer(key).key_op_depart().__len__()
+    return tokens / (time.perf_counter() - start)
+
+
+def main():
+    seconds = float(sys.argv[1]) if sys.argv.__len__() > 1 else 1.0
+    results = {lexer.__name__: bench(lexer, seconds) for lexer in (Lex, TableLex)}
+    for name, rate in results.items():
+        print(f"{name:10} {rate:14,.0f} tokens/s")
+    print(f"TableLex / Lex: {results['TableLex'] / results['Lex']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
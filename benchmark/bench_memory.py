@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+"""
+Memory benchmark of building statements, run from the repository root:
+
+    python -m benchmark.bench_memory [count]                   # print results
+    python -m benchmark.bench_memory [count] --no-slots        # baseline, part classes without __slots__
+    python -m benchmark.bench_memory [count] --compare         # both, and the change against the baseline
+
+Builds `count` typical statements (table, fields, dict where, join, order, limit), keeps them alive
+and reports the traced allocation per statement and the build time (measured without tracing).
+--compare only compares memory, the build time of one run is informational and too noisy to compare,
+use benchmark.suite for timings.
+The baseline loads the modules of src.pydoo.part with their `__slots__` removed, so their instances keep a __dict__.
+"""
+import argparse
+import ast
+import gc
+import importlib.abc
+import importlib.machinery
+import json
+import subprocess
+import sys
+import time
+import tracemalloc
+
+PART_PACKAGE = "src.pydoo.part."
+
+
+class NoSlotsLoader(importlib.machinery.SourceFileLoader):
+    # Compiles the source without the `__slots__` of its classes, bytecode caches are neither read nor written.
+
+    def get_code(self, fullname):
+        path = self.get_filename(fullname)
+        tree = ast.parse(self.get_data(path), path)
+        for node in ast.walk(tree):
+            if isinstance(node, ast.ClassDef):
+                node.body = [stmt for stmt in node.body if not (
+                    isinstance(stmt, ast.Assign) and any(isinstance(target, ast.Name) and target.id == "__slots__" for target in stmt.targets))] or [ast.Pass()]
+        return compile(tree, path, "exec", dont_inherit=True)
+
+
+class NoSlotsFinder(importlib.abc.MetaPathFinder):
+    def find_spec(self, fullname, path, target=None):
+        if not fullname.startswith(PART_PACKAGE):
+            return None
+        spec = importlib.machinery.PathFinder.find_spec(fullname, path)
+        if spec is not None and isinstance(spec.loader, importlib.machinery.SourceFileLoader):
+            spec.loader = NoSlotsLoader(fullname, spec.origin)
+        return spec
+
+
+def build(statement_class: type, index: int):
+    stmt = statement_class("orders o").field(["o.id", "o.uid", "o.price", "u.name"])
+    stmt.inner_join("users", "u", "u.id = o.uid")
+    stmt.where({"o.state": 1, "o.shop": "main", "o.deleted": 0, "u.level": 3})
+    stmt.where("o.price", ">", index)
+    stmt.order_by("o.id", "desc")
+    return stmt.limit(20)
+
+
+def measure(count: int) -> dict:
+    # Imported here, after NoSlotsFinder is installed for the baseline.
+    from src.pydoo.statement import Statement
+    gc.collect()
+    start = time.perf_counter()
+    statements = [build(Statement, index) for index in range(count)]
+    elapsed = time.perf_counter() - start
+    del statements
+    gc.collect()
+
+    tracemalloc.start()
+    statements = [build(Statement, index) for index in range(count)]
+    size, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "statements": statements.__len__(),
+        "bytes_per_statement": size / count,
+        "peak_bytes": peak,
+        "build_seconds": elapsed,
+    }
+
+
+def report(result: dict):
+    count = result["statements"]
+    print(f"statements      {count:,}")
+    print(f"bytes/statement {result['bytes_per_statement']:,.0f}")
+    print(f"peak bytes      {result['peak_bytes']:,}")
+    print(f"build time      {result['build_seconds']:.2f} s ({count / result['build_seconds']:,.0f} statements/s)")
+
+
+def compare(current: dict, baseline: dict):
+    print(f"{'':16} {'no slots':>14} {'current':>14} {'change':>8}")
+    for label, current_value, base_value in (
+            ("bytes/statement", current["bytes_per_statement"], baseline["bytes_per_statement"]),
+            ("peak bytes", current["peak_bytes"], baseline["peak_bytes"])):
+        print(f"{label:16} {base_value:14,.0f} {current_value:14,.0f} {current_value / base_value - 1:+8.1%}")
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(prog="python -m benchmark.bench_memory", description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("count", type=int, nargs="?", default=100_000)
+    parser.add_argument("--no-slots", action="store_true", help="load the part classes without __slots__")
+    parser.add_argument("--compare", action="store_true", help="also run the --no-slots baseline and print the change")
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    args = parser.parse_args(argv)
+
+    if args.no_slots:
+        if any(name.startswith(PART_PACKAGE) for name in sys.modules):
+            raise ValueError("Part modules are already imported with __slots__")
+        sys.meta_path.insert(0, NoSlotsFinder())
+    current = measure(args.count)
+    if args.compare:
+        # Classes cannot lose their __slots__ once imported, the baseline runs in its own interpreter.
+        output = subprocess.run([sys.executable, "-m", "benchmark.bench_memory", str(args.count), "--no-slots", "--json"],
+                                check=True, capture_output=True, text=True).stdout
+        compare(current, json.loads(output))
+    elif args.json:
+        json.dump(current, sys.stdout)
+        print()
+    else:
+        report(current)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,270 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark suite of the query building and executing hot path, run from the repository root:
+
+    python -m benchmark.suite                                  # print results
+    python -m benchmark.suite --json results.json              # save results
+    python -m benchmark.suite --baseline results.json          # compare, exit 1 on regressions
+    python -m benchmark.suite --filter render --seconds 2
+
+Every case runs `rounds` rounds of a calibrated number of calls, the median time per call of the rounds is reported.
+A case is a regression when its median is slower than the baseline by more than `--threshold` (default 10%)
+and by more than NOISE_SIGMAS standard deviations of the rounds of either run.
+Cases measured with fewer than MIN_ROUNDS rounds or rounds shorter than MIN_ROUND_SECONDS, in either run,
+are too noisy to compare and never fail, use the defaults for regression checks.
+"""
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+from typing import Callable
+
+from src.pydoo.api.sqlite_api import SQLiteConnection
+from src.pydoo.executor import Executor
+from src.pydoo.part.where_part import WhereAnd, WhereOr
+from src.pydoo.pydoo import Pydoo
+from src.pydoo.statement import Statement
+from src.pydoo.where_builder2.key_cache import KeyParser
+from src.pydoo.where_builder2.lex import Lex
+from src.pydoo.where_builder2.parser import Parser
+from src.pydoo.where_builder2.table_lex import TableLex
+
+# Noise floor of compare()
+MIN_ROUNDS = 3
+MIN_ROUND_SECONDS = 0.05
+NOISE_SIGMAS = 3
+
+# Condition keys of the operator list in data/Usage.md
+OPERATOR_KEYS = (
+    'col', 'col,eq', 'col,equal', 'col=', 'col,lt', 'col,less than', 'col<', 'col,gt', 'col,greater than', 'col>',
+    'col,le', 'col,less equal', 'col<=', 'col,ge', 'col,greater equal', 'col>=', 'col,ne', 'col,not equal', 'col!=',
+    'col,in', 'col:', ' col,l', 'col,like', 'col?', 'col,lp', 'col,like p', 'col,like prefix', 'col?^', 'col,ls',
+    'col,like s', 'col,like suffix', 'col?$', 'col,nl', 'col,not like', 'col,like n', 'col!?', 'col,b', 'col,between',
+    'col~', 'col,nb', 'col,not between', 'col!~', 'col!', 'col,not', 'col,regexp', 'col\\', '{count(distinct colA)}',
+    '#or', '#and', '#exists', '#not exists', "col/STR_TO_DATE(*, '%Y-%m-%d')", 'col/FROM_UNIXTIME/DATE', 'col->Integer',
+)
+
+
+# Statement building
+
+def build_simple():
+    return Statement("users").field(["id", "name"]).where({"id": 1}).limit(10)
+
+
+def build_join():
+    stmt = Statement("orders o").field(["o.id", "o.uid", "o.price", "u.name"])
+    stmt.inner_join("users", "u", "u.id = o.uid")
+    stmt.where({"o.state": 1, "o.shop": "main", "o.deleted": 0, "u.level": 3})
+    stmt.order_by("o.id", "desc")
+    return stmt.limit(20)
+
+
+def build_in_list():
+    ids = list(range(10000))
+    return lambda: Statement("users").where({"id": ids}).to_sql()
+
+
+def build_fork():
+    base = build_join().freeze()
+    return lambda: base.fork().where("o.shop", "other")
+
+
+# Rendering
+
+def where_tree(depth: int, breadth: int, level: int = 0) -> WhereAnd:
+    where = WhereOr() if level % 2 else WhereAnd()
+    for index in range(breadth):
+        if level + 1 < depth:
+            where.add_exp(where_tree(depth, breadth, level + 1))
+        else:
+            where.add_exp(f"c{level}_{index} = %s")
+    return where
+
+
+def render_deep_where(pretty: bool = False):
+    stmt = Statement("t").field(["a", "b"]).where(where_tree(5, 3)).limit(10)
+    return lambda: stmt.to_sql(pretty)
+
+
+def render_deep_where_parts():
+    where = where_tree(5, 3)
+    return lambda: where.to_sql()
+
+
+# where_builder2
+
+def lex_parse(lexer):
+    def run():
+        for key in OPERATOR_KEYS:
+            Parser.parse(lexer(key).key_op_depart())
+    return run
+
+
+def key_parser_cached():
+    parser = KeyParser()
+    return lambda: [parser.parse(key) for key in OPERATOR_KEYS]
+
+
+# sqlite3 end to end
+
+def sqlite_doo() -> Pydoo:
+    executor = Executor(SQLiteConnection.connect())
+    executor.execute("Create Table users (id Integer Primary Key, name Text, level Integer)").close()
+    executor.execute_many("Insert Into users (name, level) Values (?, ?)", [(f"user{index}", index % 5) for index in range(1000)]).close()
+    doo = Pydoo(executor)
+    doo.result_type = Pydoo.ResultType.FETCH_ALL
+    return doo
+
+
+def sqlite_select_one():
+    doo = sqlite_doo()
+    return lambda: doo.table("users").field(["id", "name"]).where("name", "user500").select()
+
+
+def sqlite_select_page():
+    doo = sqlite_doo()
+    return lambda: doo.table("users").where("level", ">", "2").limit(100).select()
+
+
+def sqlite_insert():
+    doo = sqlite_doo()
+    return lambda: doo.table("users").insert({"name": "new", "level": 1})
+
+
+def sqlite_insert_many():
+    doo = sqlite_doo()
+    rows = [{"name": f"bulk{index}", "level": index % 5} for index in range(100)]
+    return lambda: doo.table("users").insert_many(rows)
+
+
+# name -> factory of the function to time, the setup of the factory is not timed
+CASES: dict[str, Callable[[], Callable]] = {
+    "build.simple": lambda: build_simple,
+    "build.join": lambda: build_join,
+    "build.fork": build_fork,
+    "build.in_list_10k": build_in_list,
+    "render.deep_where": render_deep_where,
+    "render.deep_where_pretty": lambda: render_deep_where(True),
+    "render.deep_where_parts": render_deep_where_parts,
+    "where_builder2.lex_parse": lambda: lex_parse(Lex),
+    "where_builder2.table_lex_parse": lambda: lex_parse(TableLex),
+    "where_builder2.key_parser_cached": key_parser_cached,
+    "sqlite.select_one": sqlite_select_one,
+    "sqlite.select_page": sqlite_select_page,
+    "sqlite.insert": sqlite_insert,
+    "sqlite.insert_many_100": sqlite_insert_many,
+}
+
+
+def measure(func: Callable, seconds: float, rounds: int) -> dict:
+    # Calibrate the calls of one round to about seconds / rounds.
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= seconds / rounds / 10 or loops >= 1 << 24:
+            break
+        loops *= 10
+    loops = max(1, int(loops * (seconds / rounds) / max(elapsed, 1e-9)))
+    times = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        times.append((time.perf_counter() - start) / loops)
+    return {
+        "loops": loops,
+        "rounds": rounds,
+        "median_us": statistics.median(times) * 1e6,
+        "min_us": min(times) * 1e6,
+        "stdev_us": (statistics.stdev(times) if rounds > 1 else 0.0) * 1e6,
+    }
+
+
+def run(names: list[str], seconds: float, rounds: int) -> dict:
+    results = {}
+    for name in names:
+        results[name] = measure(CASES[name](), seconds, rounds)
+        print(f"{name:36} {results[name]['median_us']:12.2f} us  ±{results[name]['stdev_us']:.2f}", file=sys.stderr)
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "results": results,
+    }
+
+
+def comparable(result: dict) -> bool:
+    # Enough rounds for a stdev, each long enough to outlast timer and scheduling noise
+    return result["rounds"] >= MIN_ROUNDS and result["loops"] * result["median_us"] / 1e6 >= MIN_ROUND_SECONDS
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list[str]:
+    """
+    :return: names of the cases slower than the baseline by more than threshold and the noise of the rounds
+    """
+    regressions = []
+    print(f"{'case':36} {'baseline us':>12} {'current us':>12} {'change':>8}")
+    for name, result in current["results"].items():
+        base = baseline["results"].get(name)
+        if base is None:
+            print(f"{name:36} {'-':>12} {result['median_us']:12.2f} {'new':>8}")
+            continue
+        slower = result["median_us"] - base["median_us"]
+        change = slower / base["median_us"]
+        flag = ""
+        if not (comparable(result) and comparable(base)):
+            flag = "  too noisy"
+        elif change > threshold and slower > NOISE_SIGMAS * max(result["stdev_us"], base["stdev_us"]):
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:36} {base['median_us']:12.2f} {result['median_us']:12.2f} {change:+8.1%}{flag}")
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmark.suite", description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--baseline", help="compare with results saved by --json")
+    parser.add_argument("--threshold", type=float, default=0.1, help="allowed slowdown against the baseline, 0.1 = 10%%")
+    parser.add_argument("--seconds", type=float, default=1.0, help="time spent on each case")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--filter", default="", help="run the cases whose name contains this")
+    parser.add_argument("--list", action="store_true", help="list the cases")
+    args = parser.parse_args(argv)
+
+    names = [name for name in CASES if args.filter in name]
+    if args.list:
+        print("\n".join(names))
+        return 0
+    if not names:
+        parser.error(f"No case matches {args.filter!r}")
+
+    current = run(names, args.seconds, args.rounds)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(current, f, indent=2)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(current, baseline, args.threshold)
+        noisy = [name for name, result in current["results"].items()
+                 if name in baseline["results"] and not (comparable(result) and comparable(baseline["results"][name]))]
+        if noisy:
+            print(f"{noisy.__len__()} case(s) too noisy to compare, they need --rounds >= {MIN_ROUNDS} "
+                  f"and rounds of at least {MIN_ROUND_SECONDS} s in both runs")
+        if regressions:
+            print(f"{regressions.__len__()} regression(s): {', '.join(regressions)}")
+            return 1
+    elif not args.json:
+        json.dump(current, sys.stdout, indent=2)
+        print()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -11,6 +11,7 @@ __license__ = "https://www.apache.org/licenses/LICENSE-2.0.html"
 __link__ = "https://github.com/ruilx/pydoo"
 
 from .pydoo import Pydoo
+from .async_pydoo import AsyncPydoo
 from .part.select_part import SelectPart
 
-__all__ = ("Pydoo", "SelectPart")
+__all__ = ("Pydoo", "AsyncPydoo", "SelectPart")
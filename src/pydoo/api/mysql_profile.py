@@ -14,3 +14,11 @@ class MySQLProfile(object):
     @staticmethod
     def dict_cursor():
         return pymysql.cursors.DictCursor
+
+    @staticmethod
+    def stream_cursor():
+        return pymysql.cursors.SSCursor
+
+    @staticmethod
+    def stream_dict_cursor():
+        return pymysql.cursors.SSDictCursor
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+
+import sqlite3
+
+from .db_api import DBAPI
+
+
+class SQLiteConnection(DBAPI):
+    """
+    DBAPI adapter of a sqlite3 connection, sqlite3 has no ping() and begin().
+    The wrapped connection is switched to autocommit mode, transactions are opened by begin() explicitly.
+    Like PyMySQL, setting `cursorclass` to `DictCursor` makes the rows of later cursors dicts.
+    """
+    cursorclass = None
+
+    def __init__(self, connection: sqlite3.Connection):
+        super().__init__(connection)
+        self.connection.isolation_level = None
+
+    @staticmethod
+    def connect(database: str = ":memory:", **kwargs) -> "SQLiteConnection":
+        kwargs.setdefault("check_same_thread", False)
+        return SQLiteConnection(sqlite3.connect(database, **kwargs))
+
+    def ping(self):
+        self.connection.execute("Select 1").close()
+
+    @staticmethod
+    def DictCursor(cursor: sqlite3.Cursor, row: tuple) -> dict:
+        # sqlite3 row factory
+        return {column[0]: value for column, value in zip(cursor.description, row)}
+
+    def cursor(self):
+        cursor = self.connection.cursor()
+        if self.cursorclass is not None:
+            cursor.row_factory = self.cursorclass
+        return cursor
+
+    def begin(self):
+        if not self.connection.in_transaction:
+            self.connection.execute("Begin")
+
+    def commit(self):
+        if self.connection.in_transaction:
+            self.connection.commit()
+
+    def rollback(self):
+        if self.connection.in_transaction:
+            self.connection.rollback()
+
+    def close(self):
+        self.connection.close()
@@ -0,0 +1,309 @@
+# -*- coding: utf-8 -*-
+import abc
+import asyncio
+import concurrent.futures
+import functools
+import inspect
+
+from .executor import Executor, PooledExecutor
+
+
+class AsyncCursor(object, metaclass=abc.ABCMeta):
+    """
+    Awaitable cursor returned by AsyncExecutor.query() / execute().
+    The statement holds one concurrency slot of its executor until the cursor is closed,
+    iterating with `async for` closes the cursor at the end.
+    """
+
+    def __init__(self, cursor, slot: asyncio.Semaphore | None = None):
+        self.cursor = cursor
+        self.slot = slot
+        self.closed = False
+        self.arraysize = 100
+
+    @property
+    def description(self):
+        return self.cursor.description
+
+    @property
+    def rowcount(self):
+        return self.cursor.rowcount
+
+    @property
+    def lastrowid(self):
+        return getattr(self.cursor, "lastrowid", None)
+
+    @abc.abstractmethod
+    async def _call(self, name: str, *args):
+        raise NotImplementedError
+
+    async def fetchone(self):
+        return await self._call("fetchone")
+
+    async def fetchmany(self, size: int | None = None):
+        return await self._call("fetchmany", self.arraysize if size is None else size)
+
+    async def fetchall(self):
+        return await self._call("fetchall")
+
+    async def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            await self._call("close")
+        finally:
+            self._release()
+
+    def _release(self):
+        if self.slot is not None:
+            slot, self.slot = self.slot, None
+            slot.release()
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        try:
+            while True:
+                rows = await self.fetchmany(self.arraysize)
+                if not rows:
+                    break
+                for row in rows:
+                    yield row
+        finally:
+            await self.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    def __del__(self):
+        # A cursor dropped without close() must not keep its slot forever.
+        self._release()
+
+
+class ThreadedAsyncCursor(AsyncCursor):
+    def __init__(self, cursor, slot: asyncio.Semaphore | None, run):
+        super().__init__(cursor, slot)
+        self.run = run
+
+    async def _call(self, name: str, *args):
+        return await self.run(getattr(self.cursor, name), *args)
+
+
+class NativeAsyncCursor(AsyncCursor):
+    def __init__(self, cursor, slot: asyncio.Semaphore | None = None, dict_rows: bool = False):
+        super().__init__(cursor, slot)
+        self.dict_rows = dict_rows
+
+    async def _call(self, name: str, *args):
+        result = getattr(self.cursor, name)(*args)
+        if inspect.isawaitable(result):
+            result = await result
+        if self.dict_rows and name.startswith("fetch"):
+            result = self._dict_result(result)
+        return result
+
+    def _dict_result(self, result):
+        # Rows of a driver dict cursor are dicts already, writes have no description
+        if result is None or isinstance(result, dict) or self.description is None:
+            return result
+        names = [column[0] for column in self.description]
+        if isinstance(result, tuple):
+            return dict(zip(names, result))
+        return [row if isinstance(row, dict) else dict(zip(names, row)) for row in result]
+
+
+class AsyncExecutor(object, metaclass=abc.ABCMeta):
+    """
+    Base of the asyncio executors, at most `max_concurrency` statements are open at the same time.
+    """
+
+    def __init__(self, max_concurrency: int = 1):
+        if not isinstance(max_concurrency, int) or max_concurrency <= 0:
+            raise ValueError("max_concurrency must be an integer greater than 0")
+        self.max_concurrency = max_concurrency
+        # Created in the running loop on first use.
+        self.slot: asyncio.Semaphore | None = None
+        # Database engine and driver placeholder, see Executor.type and Executor.placeholder
+        self.type = ""
+        self.placeholder = ""
+        # Limits of one statement used to split bulk writes, see Executor.max_bind_params
+        self.max_bind_params = 65535
+        self.max_packet_size = 4 * 1024 * 1024
+        # Set by use_dict_cursor()
+        self.dict_rows = False
+
+        self.logs = []
+        self.logging = False
+
+    def _get_slot(self) -> asyncio.Semaphore:
+        if self.slot is None:
+            self.slot = asyncio.Semaphore(self.max_concurrency)
+        return self.slot
+
+    @abc.abstractmethod
+    async def _open(self, query: str, args, write: bool, slot: asyncio.Semaphore, stream: bool = False) -> AsyncCursor:
+        raise NotImplementedError
+
+    async def _run(self, query: str, args, write: bool, stream: bool = False) -> AsyncCursor:
+        slot = self._get_slot()
+        await slot.acquire()
+        try:
+            return await self._open(query, args, write, slot, stream)
+        except BaseException:
+            slot.release()
+            raise
+
+    def use_dict_cursor(self):
+        """
+        Rows of later statements are dicts, used by AsyncPydoo for FETCH_ALL_AS_DICT, see Executor.use_dict_cursor().
+        """
+        self.dict_rows = True
+
+    async def query(self, query: str, args=None, stream: bool = False) -> AsyncCursor:
+        return await self._run(query, args, write=False, stream=stream)
+
+    async def execute(self, query: str, args=None) -> AsyncCursor:
+        return await self._run(query, args, write=True)
+
+    # Transactions of the single connection, see AsyncPydoo.transaction()
+
+    async def begin(self):
+        raise NotImplementedError(f"{type(self).__name__} does not support transactions")
+
+    async def commit(self):
+        raise NotImplementedError(f"{type(self).__name__} does not support transactions")
+
+    async def rollback(self):
+        raise NotImplementedError(f"{type(self).__name__} does not support transactions")
+
+    async def savepoint(self, name: str):
+        await (await self.execute(f"Savepoint {name}")).close()
+
+    async def release_savepoint(self, name: str):
+        await (await self.execute(f"Release Savepoint {name}")).close()
+
+    async def rollback_to_savepoint(self, name: str):
+        await (await self.execute(f"Rollback To Savepoint {name}")).close()
+
+    async def close(self):
+        ...
+
+
+class ThreadedAsyncExecutor(AsyncExecutor):
+    """
+    Offloads a blocking Executor to a thread pool, for sync drivers like PyMySQL or sqlite3.
+    A single connection Executor is not thread safe, so concurrency defaults to 1 unless it is a PooledExecutor.
+    """
+
+    def __init__(self, executor: Executor, max_concurrency: int | None = None):
+        if max_concurrency is None:
+            max_concurrency = executor.pool.max_size if isinstance(executor, PooledExecutor) else 1
+        super().__init__(max_concurrency)
+        self.executor = executor
+        self.type = executor.type
+        self.placeholder = executor.placeholder
+        self.max_bind_params = executor.max_bind_params
+        self.max_packet_size = executor.max_packet_size
+        self.threads = concurrent.futures.ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="pydoo")
+
+    def use_dict_cursor(self):
+        super().use_dict_cursor()
+        self.executor.use_dict_cursor()
+
+    async def run(self, func, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.threads, functools.partial(func, *args))
+
+    async def _open(self, query: str, args, write: bool, slot: asyncio.Semaphore, stream: bool = False) -> AsyncCursor:
+        if write:
+            cursor = await self.run(self.executor.execute, query, args)
+        else:
+            cursor = await self.run(self.executor.query, query, args, stream)
+        return ThreadedAsyncCursor(cursor, slot, self.run)
+
+    def _check_transaction(self):
+        # The connection of a pooled transaction is pinned to a thread, threads of the pool are not the task's.
+        if isinstance(self.executor, PooledExecutor):
+            raise ValueError("Transactions of AsyncPydoo need a single connection Executor, not PooledExecutor")
+
+    async def begin(self):
+        self._check_transaction()
+        await self.run(self.executor.begin)
+
+    async def commit(self):
+        self._check_transaction()
+        await self.run(self.executor.commit)
+
+    async def rollback(self):
+        self._check_transaction()
+        await self.run(self.executor.rollback)
+
+    async def close(self):
+        self.threads.shutdown(wait=True)
+        if hasattr(self.executor, "close"):
+            self.executor.close()
+
+
+class NativeAsyncExecutor(AsyncExecutor):
+    """
+    Executor over a native asyncio driver connection (aiomysql, aiosqlite style),
+    whose cursor() and cursor methods return awaitables.
+    One connection runs one statement at a time, so concurrency defaults to 1.
+    Streaming queries open cursors of `stream_cursor_class` (e.g. aiomysql.SSCursor) when it is set.
+    """
+
+    def __init__(self, conn, max_concurrency: int = 1, stream_cursor_class=None):
+        super().__init__(max_concurrency)
+        self.conn = conn
+        self.type = Executor._detect_type(conn)
+        self.placeholder = Executor._detect_placeholder(conn)
+        self.stream_cursor_class = stream_cursor_class
+
+    def connection(self):
+        return self.conn
+
+    async def _open(self, query: str, args, write: bool, slot: asyncio.Semaphore, stream: bool = False) -> AsyncCursor:
+        if stream and self.stream_cursor_class is not None:
+            cursor = self.conn.cursor(self.stream_cursor_class)
+        else:
+            cursor = self.conn.cursor()
+        if inspect.isawaitable(cursor):
+            cursor = await cursor
+        native = NativeAsyncCursor(cursor, slot, self.dict_rows)
+        try:
+            result = cursor.execute(query) if args is None else cursor.execute(query, args)
+            if inspect.isawaitable(result):
+                await result
+        except BaseException:
+            native.slot = None
+            await native.close()
+            raise
+        return native
+
+    async def _call_conn(self, name: str):
+        result = getattr(self.conn, name)()
+        if inspect.isawaitable(result):
+            await result
+
+    async def begin(self):
+        # aiosqlite connections have no begin()
+        if hasattr(self.conn, "begin"):
+            await self._call_conn("begin")
+        else:
+            await (await self.execute("Begin")).close()
+
+    async def commit(self):
+        await self._call_conn("commit")
+
+    async def rollback(self):
+        await self._call_conn("rollback")
+
+    async def close(self):
+        result = self.conn.close()
+        if inspect.isawaitable(result):
+            await result
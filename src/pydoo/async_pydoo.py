@@ -0,0 +1,207 @@
+# -*- coding: utf-8 -*-
+import time
+
+from .api.db_api import DBAPI as Connection
+from .async_executor import AsyncExecutor, ThreadedAsyncExecutor
+from .async_statement import AsyncStatement
+from .dialect import Dialect, executor_dialect, get_dialect
+from .executor import Executor
+from .instrument import QueryEvent, QueryHooks
+from .pydoo import Pydoo
+from .result_cache import MISS, ResultCache
+from .result_parser import AsyncResultParser
+from .sql_cache import SqlCache
+from .transaction import AsyncTransaction, current
+
+
+class AsyncPydoo(object):
+    """
+    asyncio counterpart of Pydoo.
+    A blocking connection or Executor is offloaded to threads by ThreadedAsyncExecutor,
+    native asyncio drivers are used through NativeAsyncExecutor.
+    """
+    ResultType = Pydoo.ResultType
+
+    ResultParse = {
+        ResultType.FETCH_CURSOR_RAW: AsyncResultParser.result_raw,
+        ResultType.FETCH_ITERATE: AsyncResultParser.result_iterate,
+        ResultType.FETCH_ALL: AsyncResultParser.result_all,
+        ResultType.FETCH_ALL_AS_DICT: AsyncResultParser.result_all,
+        ResultType.FETCH_CHUNK: AsyncResultParser.result_chunk,
+        ResultType.FETCH_STREAM: AsyncResultParser.result_stream,
+        ResultType.FETCH_COLUMNAR: AsyncResultParser.result_columnar,
+    }
+
+    EagerResultTypes = Pydoo.EagerResultTypes
+
+    def __init__(self, conn: Connection | Executor | AsyncExecutor, sql_cache_size: int = 256, dialect: str | Dialect | None = None):
+        if isinstance(conn, AsyncExecutor):
+            self.executor = conn
+        elif isinstance(conn, Executor):
+            self.executor = ThreadedAsyncExecutor(conn)
+        else:
+            self.executor = ThreadedAsyncExecutor(Executor(conn))
+
+        self.sql_cache = SqlCache(sql_cache_size)
+        self.result_cache = ResultCache()
+        # See Pydoo.dialect
+        self._dialect = executor_dialect(self.executor) if dialect is None else get_dialect(dialect)
+
+        self.hooks = QueryHooks()
+        self.logs = []
+        self.logging = False
+
+        self.result_type = AsyncPydoo.ResultType.FETCH_CURSOR_RAW
+        self.chunk_size = 100
+        self.chunk_transforms = []
+        self.chunk_prefetch = False
+
+        # See Pydoo.max_in_values, only the "batch" strategy is supported.
+        self.max_in_values = 10000
+        self.in_list_strategy = "batch"
+
+        self.error = None
+
+    dialect = Pydoo.dialect
+
+    async def _parse(self, cursor):
+        if self.result_type == AsyncPydoo.ResultType.FETCH_CHUNK:
+            return self.ResultParse[self.result_type](cursor, self.chunk_size, self.chunk_transforms, self.chunk_prefetch)
+        if self.result_type == AsyncPydoo.ResultType.FETCH_STREAM:
+            return self.ResultParse[self.result_type](cursor, self.chunk_size)
+        if self.result_type not in self.EagerResultTypes:
+            return await self.ResultParse[self.result_type](cursor)
+        try:
+            if self.result_type == AsyncPydoo.ResultType.FETCH_COLUMNAR:
+                return await self.ResultParse[self.result_type](cursor, self.chunk_size)
+            return await self.ResultParse[self.result_type](cursor)
+        finally:
+            await cursor.close()
+
+    def _instrumented(self) -> bool:
+        return self.logging or bool(self.hooks)
+
+    def _event(self, kind: str, query: str, args, render_time: float) -> QueryEvent:
+        event = QueryEvent(kind, query, args, self.result_type.name, render_time)
+        if self.logging:
+            self.logs.append(event)
+        return event
+
+    async def _parse_timed(self, cursor, event: QueryEvent):
+        if self.result_type == AsyncPydoo.ResultType.FETCH_CURSOR_RAW:
+            self.hooks.fetched(event, QueryHooks.affected_rows(cursor) if event.kind != "query" else None, 0.0)
+            return cursor
+        if self.result_type not in self.EagerResultTypes:
+            return self.hooks.timed_aiter(await self._parse(cursor), event, self.result_type == AsyncPydoo.ResultType.FETCH_CHUNK)
+        affected = QueryHooks.affected_rows(cursor) if event.kind != "query" else None
+        start = time.perf_counter()
+        try:
+            result = await self._parse(cursor)
+        except BaseException as e:
+            self.hooks.failed(event, e, time.perf_counter() - start)
+            raise
+        self.hooks.fetched(event, affected if affected is not None else QueryHooks.row_count(result), time.perf_counter() - start)
+        return result
+
+    def _check_result_type(self):
+        if self.result_type == AsyncPydoo.ResultType.FETCH_LAZY:
+            raise ValueError("FETCH_LAZY is not supported by AsyncPydoo, use FETCH_STREAM")
+        self._check_dict_rows()
+
+    def _check_dict_rows(self):
+        if self.result_type == AsyncPydoo.ResultType.FETCH_ALL_AS_DICT:
+            self.executor.use_dict_cursor()
+
+    async def query(self, query: str, args=None, render_time: float = 0.0):
+        self._check_result_type()
+        stream = self.result_type == AsyncPydoo.ResultType.FETCH_STREAM
+        if not self._instrumented():
+            return await self._parse(await self.executor.query(query, args, stream=stream))
+        event = self._event("query", query, args, render_time)
+        return await self._parse_timed(await self.hooks.execute_async(event, self.executor.query, query, args, stream), event)
+
+    async def fetch_page(self, query: str, args=None, render_time: float = 0.0) -> tuple[tuple, list]:
+        """
+        Cursor description and all rows of a query whatever result_type is, like Pydoo.fetch_page().
+        """
+        self._check_dict_rows()
+        if not self._instrumented():
+            cursor = await self.executor.query(query, args)
+            try:
+                return cursor.description, await cursor.fetchall()
+            finally:
+                await cursor.close()
+        event = self._event("query", query, args, render_time)
+        cursor = await self.hooks.execute_async(event, self.executor.query, query, args, False)
+        start = time.perf_counter()
+        try:
+            rows = await cursor.fetchall()
+        except BaseException as e:
+            self.hooks.failed(event, e, time.perf_counter() - start)
+            raise
+        finally:
+            await cursor.close()
+        self.hooks.fetched(event, rows.__len__(), time.perf_counter() - start)
+        return cursor.description, rows
+
+    async def cached_query(self, query: str, args=None, tables: tuple[str, ...] = (), ttl: float | None = None, render_time: float = 0.0,
+                           page: bool = False):
+        if self.result_type not in self.EagerResultTypes:
+            raise ValueError(f"Result cache needs a fully fetched result type, not {self.result_type.name}")
+        key = self.result_cache.key(f"{self.result_type.name}_PAGE" if page else self.result_type.name, query, args)
+        result = self.result_cache.get(key)
+        if result is not MISS:
+            return result
+        version = self.result_cache.version(tables)
+        result = await (self.fetch_page if page else self.query)(query, args, render_time)
+        self.result_cache.set(key, result, ttl, tables, version)
+        return result
+
+    async def execute(self, query: str, args=None):
+        self._check_result_type()
+        if not self._instrumented():
+            result = await self._parse(await self.executor.execute(query, args))
+        else:
+            event = self._event("execute", query, args, 0.0)
+            result = await self._parse_timed(await self.hooks.execute_async(event, self.executor.execute, query, args), event)
+        tables = self.result_cache.write_tables(query)
+        if tables:
+            await self._wrote(tables)
+        return result
+
+    async def _wrote(self, tables: tuple[str, ...]):
+        self.result_cache.invalidate(tables)
+        transaction = current(self.executor)
+        if transaction is not None:
+            await transaction.wrote(tables)
+
+    def transaction(self, commit_every: int | None = None, commit_interval_ms: float | None = None) -> AsyncTransaction:
+        """
+        `async with` transaction, see Pydoo.transaction().
+        """
+        return AsyncTransaction(self, commit_every, commit_interval_ms)
+
+    async def execute_cursor(self, query: str, args=None, render_time: float = 0.0):
+        """
+        Execute a write and return its cursor whatever result_type is, like Pydoo.execute_cursor().
+        """
+        if not self._instrumented():
+            return await self.executor.execute(query, args)
+        event = QueryEvent("execute", query, args, AsyncPydoo.ResultType.FETCH_CURSOR_RAW.name, render_time)
+        if self.logging:
+            self.logs.append(event)
+        cursor = await self.hooks.execute_async(event, self.executor.execute, query, args)
+        self.hooks.fetched(event, QueryHooks.affected_rows(cursor), 0.0)
+        return cursor
+
+    def table(self, table: str):
+        return AsyncStatement(table, self)
+
+    async def close(self):
+        await self.executor.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import time
+from typing import Callable, Iterable, TYPE_CHECKING
+
+from .part.in_list_part import InListPart
+from .part.where_part import ValueType
+from .statement import Statement, Result
+
+if TYPE_CHECKING:
+    from .async_pydoo import AsyncPydoo
+
+
+class AsyncStatement(Statement):
+    """
+    Statement of AsyncPydoo, building methods are inherited from Statement and the executing methods are awaitable.
+    """
+
+    def __init__(self, table: str | None = None, doo: "AsyncPydoo | None" = None):
+        super().__init__(table, None, doo)
+
+    async def select(self, fields: str | list[str] | None = None, parallel: int | None = None) -> Result:
+        """
+        :param parallel: split the largest IN list condition into this many chunks and run them concurrently,
+                         up to the concurrency of the executor
+        """
+        self._set_select_fields(fields)
+        return await self._execute(parallel)
+
+    async def find(self, fields: str | list[str] | None = None) -> Result:
+        self._set_select_fields(fields)
+        self._own('limit').set_limit(1)
+        return await self._execute()
+
+    async def insert(self, data: dict[str, ValueType]) -> int:
+        start = time.perf_counter()
+        sql, values = self._insert_sql(data)
+        return await self._write_count(self.part['from'].tables[0].get_table(), sql, values, render_time=time.perf_counter() - start)
+
+    async def insert_many(self, rows: Iterable[dict[str, ValueType]], batch_size: int = 1000) -> int:
+        """
+        Like Statement.insert_many(), every batch is a multi-row Values statement (no executemany).
+        """
+        table = self._get_table("Insert")
+        total = 0
+        for sql, values, many, render_time in self._insert_writes(table, rows, batch_size, self._get_doo().executor, False):
+            total += await self._write_count(table, sql, values, many, render_time)
+        return total
+
+    async def upsert_many(self, rows: Iterable[dict[str, ValueType]], keys: str | list[str], update: list[str] | None = None,
+                          batch_size: int = 1000) -> int:
+        """
+        Awaitable Statement.upsert_many().
+        """
+        table = self._get_table("Upsert")
+        total = 0
+        for sql, values, many, render_time in self._upsert_writes(table, rows, keys, update, batch_size, self._get_doo().executor):
+            total += await self._write_count(table, sql, values, many, render_time)
+        return total
+
+    async def update_many_by_key(self, rows: Iterable[dict[str, ValueType]], key: str | list[str], batch_size: int = 500) -> int:
+        """
+        Awaitable Statement.update_many_by_key().
+        """
+        table = self._get_table("Update")
+        total = 0
+        for sql, values, many, render_time in self._update_by_key_writes(table, rows, key, batch_size, self._get_doo().executor):
+            total += await self._write_count(table, sql, values, many, render_time)
+        return total
+
+    async def _write_count(self, table: str, sql: str, values: list, many: bool = False, render_time: float = 0.0) -> int:
+        cursor = await self._get_doo().execute_cursor(sql, values, render_time)
+        try:
+            return cursor.rowcount
+        finally:
+            await cursor.close()
+            await self.doo._wrote((table,))
+
+    async def seek_iterate(self, order_columns: str | list[str], page_size: int = 1000, order_type: str = 'asc'):
+        """
+        Async iterator of Statement.seek_iterate(), pages are fetched by AsyncPydoo.fetch_page().
+        """
+        columns = self._seek_columns(order_columns)
+        base = self._seek_base(columns, page_size, order_type)
+        get_key = None
+        last_values = None
+        while True:
+            page = self._seek_page(base, columns, last_values, order_type)
+            start = time.perf_counter()
+            sql = page.to_sql()
+            description, rows = await self._get_doo().fetch_page(sql, page.values, time.perf_counter() - start)
+            if get_key is None:
+                get_key = self._key_getter(description, columns)
+            for row in rows:
+                yield row
+            if rows.__len__() < page_size:
+                return
+            last_values = get_key(rows[-1])
+
+    def writer(self, *args, **kwargs):
+        raise ValueError("AsyncStatement has no write-behind writer, use Statement.writer() of Pydoo")
+
+    async def _run(self) -> Result:
+        start = time.perf_counter()
+        sql = self.to_sql()
+        render_time = time.perf_counter() - start
+        if self._cache is not None:
+            return await self._get_doo().cached_query(sql, self.values, self._cached_tables(), self._cache[0], render_time)
+        return await self._get_doo().query(sql, self.values, render_time)
+
+    async def _execute(self, parallel: int | None = None) -> Result:
+        in_list = self._in_list_to_split(parallel)
+        if in_list is not None:
+            return await self._execute_split(in_list, parallel)
+        return await self._run()
+
+    async def _chain(self, statements: list["AsyncStatement"]):
+        limit = self.part['limit']
+        start, stop = (limit.offset, limit.offset + limit.limit) if limit._is_valid() else (0, None)
+        index = 0
+        for statement in statements:
+            rows = await statement._run()
+            try:
+                async for row in rows:
+                    if stop is not None and index >= stop:
+                        return
+                    if index >= start:
+                        yield row
+                    index += 1
+            finally:
+                if hasattr(rows, "aclose"):
+                    await rows.aclose()
+
+    async def _run_page(self) -> tuple[tuple | None, list]:
+        start = time.perf_counter()
+        sql = self.to_sql()
+        render_time = time.perf_counter() - start
+        if self._cache is not None:
+            return await self._get_doo().cached_query(sql, self.values, self._cached_tables(), self._cache[0], render_time, page=True)
+        return await self._get_doo().fetch_page(sql, self.values, render_time)
+
+    async def _run_chunks(self, statements: list["AsyncStatement"], parallel: int | None, run: Callable = None) -> list:
+        run = AsyncStatement._run if run is None else run
+        if parallel is None or parallel <= 1:
+            return [await run(statement) for statement in statements]
+        slots = asyncio.Semaphore(parallel)
+
+        async def limited(statement: "AsyncStatement"):
+            async with slots:
+                return await run(statement)
+        return list(await asyncio.gather(*(limited(statement) for statement in statements)))
+
+    async def _execute_split(self, in_list: InListPart, parallel: int | None = None) -> Result:
+        doo = self._get_doo()
+        if doo.result_type == doo.ResultType.FETCH_CURSOR_RAW:
+            raise ValueError("Split IN list needs a result type other than FETCH_CURSOR_RAW")
+        if doo.in_list_strategy != "batch":
+            raise ValueError(f"AsyncPydoo supports the \"batch\" IN list strategy only, not {doo.in_list_strategy!r}")
+        statements = self._split_in_list(in_list, parallel)
+        if doo.result_type in doo.EagerResultTypes:
+            if self._ordered_merge():
+                pages = await self._run_chunks(statements, parallel, AsyncStatement._run_page)
+                return self._merge([rows for _, rows in pages], pages[0][0])
+            return self._merge(await self._run_chunks(statements, parallel))
+        self._check_lazy_split()
+        return self._chain(statements)
+
+    def _get_doo(self) -> "AsyncPydoo":
+        if self.doo is None:
+            raise ValueError("Statement has no executor")
+        return self.doo
@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+import datetime
+import decimal
+
+
+class ColumnarBuilder(object):
+    """
+    Collect fetched chunks into a dict of column arrays, without keeping a list of rows.
+
+    Column types come from `cursor.description` type codes of MySQL (PyMySQL, aiomysql) when known,
+    otherwise they are inferred from the first non-null value of the column (e.g. sqlite3 has no type codes).
+    Integer, float, bool and date/time columns are NumPy arrays, others are object arrays.
+    DECIMAL columns become float64, an integer column with NULL becomes float64 with NaN,
+    NULL of date/time columns is NaT, and a column whose values do not fit its type falls back to object.
+    NumPy is optional, it is imported when a builder is made.
+    """
+
+    # MySQL field type codes (pymysql.constants.FIELD_TYPE)
+    MYSQL_TYPE_KINDS = {
+        0: "float",  # DECIMAL
+        1: "int",  # TINY
+        2: "int",  # SHORT
+        3: "int",  # LONG
+        4: "float",  # FLOAT
+        5: "float",  # DOUBLE
+        7: "datetime",  # TIMESTAMP
+        8: "int",  # LONGLONG
+        9: "int",  # INT24
+        10: "date",  # DATE
+        11: "timedelta",  # TIME
+        12: "datetime",  # DATETIME
+        13: "int",  # YEAR
+        246: "float",  # NEWDECIMAL
+    }
+
+    KIND_DTYPES = {
+        "int": "int64",
+        "float": "float64",
+        "bool": "bool",
+        "datetime": "datetime64[us]",
+        "date": "datetime64[D]",
+        "timedelta": "timedelta64[us]",
+        "object": "object",
+    }
+
+    # Python types of inferred kinds, checked on every chunk since nothing guarantees them.
+    KIND_TYPES = {
+        "int": (int,),
+        "float": (float, int, decimal.Decimal),
+        "bool": (bool,),
+        "datetime": (datetime.datetime,),
+        "date": (datetime.date,),
+        "timedelta": (datetime.timedelta,),
+    }
+
+    def __init__(self, description, capacity: int = 1024):
+        try:
+            import numpy
+        except ImportError as e:
+            raise ImportError("Columnar results need numpy, install it by `pip install numpy`") from e
+        self.np = numpy
+        self.names = [desc[0] for desc in description]
+        self.kinds = [self.MYSQL_TYPE_KINDS.get(desc[1]) if isinstance(desc[1], int) else None for desc in description]
+        self.inferred = [kind is None for kind in self.kinds]
+        self.arrays = [None] * self.names.__len__()
+        self.capacity = capacity
+        self.length = 0
+
+    @staticmethod
+    def _infer_kind(values) -> str | None:
+        for value in values:
+            if value is None:
+                continue
+            if isinstance(value, bool):
+                return "bool"
+            if isinstance(value, int):
+                return "int"
+            if isinstance(value, (float, decimal.Decimal)):
+                return "float"
+            if isinstance(value, datetime.datetime):
+                return "datetime"
+            if isinstance(value, datetime.date):
+                return "date"
+            if isinstance(value, datetime.timedelta):
+                return "timedelta"
+            return "object"
+        return None
+
+    def _convert(self, index: int, kind: str):
+        array = self.np.empty(self.capacity, dtype=self.KIND_DTYPES[kind])
+        if self.arrays[index] is not None:
+            array[:self.length] = self.arrays[index][:self.length]
+        self.arrays[index] = array
+        self.kinds[index] = kind
+
+    def _fits(self, index: int, values) -> bool:
+        kind = self.kinds[index]
+        if kind == "object":
+            return True
+        if kind in ("int", "bool") and None in values:
+            return False
+        if not self.inferred[index]:
+            return True
+        types = self.KIND_TYPES[kind]
+        return all(value is None or (isinstance(value, types) and (kind != "int" or not isinstance(value, bool))) for value in values)
+
+    def _add_column(self, index: int, values):
+        if self.kinds[index] is None:
+            kind = self._infer_kind(values)
+            if kind is None:
+                # All null so far, keep them in an object array and decide the type on a later chunk.
+                if self.arrays[index] is None:
+                    self.arrays[index] = self.np.empty(self.capacity, dtype=object)
+                self.arrays[index][self.length:self.length + values.__len__()] = values
+                return
+            if self.arrays[index] is not None and self.length > 0 and kind in ("int", "bool"):
+                # Earlier chunks were null, which int and bool arrays cannot hold.
+                kind = "float" if kind == "int" else "object"
+            self._convert(index, kind)
+        elif self.arrays[index] is None:
+            self._convert(index, self.kinds[index])
+
+        if not self._fits(index, values):
+            kind = self.kinds[index]
+            self._convert(index, "float" if kind == "int" and self._fits_float(values) else "object")
+        try:
+            self.arrays[index][self.length:self.length + values.__len__()] = values
+        except (TypeError, ValueError, OverflowError):
+            self._convert(index, "object")
+            self.arrays[index][self.length:self.length + values.__len__()] = values
+
+    @staticmethod
+    def _fits_float(values) -> bool:
+        return all(value is None or (isinstance(value, (int, float, decimal.Decimal)) and not isinstance(value, bool)) for value in values)
+
+    def _grow(self, needed: int):
+        if needed <= self.capacity:
+            return
+        capacity = self.capacity
+        while capacity < needed:
+            capacity *= 2
+        for index, array in enumerate(self.arrays):
+            if array is not None:
+                grown = self.np.empty(capacity, dtype=array.dtype)
+                grown[:self.length] = array[:self.length]
+                self.arrays[index] = grown
+        self.capacity = capacity
+
+    def add(self, rows):
+        """
+        Append one fetched chunk, rows are tuples or dicts.
+        """
+        if not rows:
+            return
+        if isinstance(rows[0], dict):
+            columns = [tuple(row[name] for row in rows) for name in self.names]
+        else:
+            columns = list(zip(*rows))
+        self._grow(self.length + rows.__len__())
+        for index, values in enumerate(columns):
+            self._add_column(index, values)
+        self.length += rows.__len__()
+
+    def build(self) -> dict:
+        result = {}
+        for index, name in enumerate(self.names):
+            array = self.arrays[index]
+            if array is None:
+                array = self.np.empty(0, dtype=self.KIND_DTYPES[self.kinds[index] or "object"])
+            result[name] = array[:self.length].copy() if array.__len__() != self.length else array
+        return result
+
+    @staticmethod
+    def concat(results: list[dict]) -> dict:
+        """
+        Concatenate columnar results of the same columns, e.g. of the chunks of a split query.
+        Columns of different dtypes are promoted by NumPy, to object when they have nothing in common.
+        """
+        import numpy
+        if results.__len__() == 1:
+            return results[0]
+        merged = {}
+        for name in results[0]:
+            arrays = [result[name] for result in results]
+            try:
+                merged[name] = numpy.concatenate(arrays)
+            except TypeError:
+                merged[name] = numpy.concatenate([array.astype(object) for array in arrays])
+        return merged
@@ -0,0 +1,226 @@
+# -*- coding: utf-8 -*-
+from typing import TYPE_CHECKING
+
+from src.pydoo.dialect import DIALECTS, Dialect
+from src.pydoo.part.field_part import FieldPart
+from src.pydoo.part.from_part import From
+from src.pydoo.part.having_part import HavingPart
+from src.pydoo.part.order_by_part import OrderBy
+from src.pydoo.part.part_base import PartBase, PartContainerBase
+from src.pydoo.part.where_part import WhereAnd, WhereOr
+
+if TYPE_CHECKING:
+    from src.pydoo.statement import Statement
+
+
+class SqlCompiler(object):
+    """
+    Renders a select Statement by walking its parts once into a single buffer.
+
+    The compact mode gives the same SQL as the to_sql() methods of the parts, whitespace included,
+    the pretty mode puts every clause and item on its own line, indented by `indent` spaces.
+    Parts of unknown classes are rendered by their own to_sql().
+    The limit clause is rendered by the dialect, the rest is canonical SQL left to Dialect.translate().
+    """
+
+    WHERE_TYPES = (WhereAnd, WhereOr, HavingPart)
+
+    DEFAULT_DIALECT = DIALECTS["mysql"]
+
+    def __init__(self, pretty: bool = False, indent: int = 4):
+        if not isinstance(indent, int) or indent < 0:
+            raise ValueError("indent must be an integer greater than or equal to 0")
+        self.pretty = pretty
+        self.pad = ' ' * indent
+
+    def compile(self, statement: "Statement", dialect: Dialect | None = None) -> str:
+        dialect = self.DEFAULT_DIALECT if dialect is None else dialect
+        buf = []
+        if self.pretty:
+            self._pretty_statement(statement, dialect, buf)
+            return '\n'.join(buf)
+        self._statement(statement, dialect, buf)
+        return ''.join(buf)
+
+    # Compact mode
+
+    @staticmethod
+    def _strip(buf: list[str], start: int):
+        # Same as str.strip() of ''.join(buf[start:]), the region must be at the end of buf.
+        while start < buf.__len__():
+            s = buf[start].lstrip()
+            if s:
+                buf[start] = s
+                break
+            del buf[start]
+        while buf.__len__() > start:
+            s = buf[-1].rstrip()
+            if s:
+                buf[-1] = s
+                break
+            buf.pop()
+
+    def _statement(self, statement: "Statement", dialect: Dialect, buf: list[str]):
+        part = statement.part
+        select = part['select']
+        if select.__len__() > 0:
+            self._container(select.parts, "Select Distinct" if select.distinct else "Select", ", ", buf)
+        else:
+            buf.append("Select Distinct *" if select.distinct else "Select *")
+        if part['from'].__len__() > 0:
+            buf.append(' ')
+            self._from_part(part['from'].parts, buf)
+        if part['where'].__len__() > 0:
+            buf.append(' ')
+            self._where(part['where'], "Where", buf)
+        if part['group'].__len__() > 0:
+            buf.append(' ')
+            self._container(part['group'].parts, "Group By", ", ", buf)
+        if part['having'].__len__() > 0:
+            buf.append(' ')
+            self._where(part['having'], "Having", buf)
+        if part['order'].__len__() > 0:
+            buf.append(' ')
+            self._container(part['order'].parts, "Order By", ", ", buf)
+        limit = part['limit']
+        if limit._is_valid():
+            buf.append(' ')
+            if limit.limit != 0:
+                buf.append(dialect.limit(limit.limit, limit.offset, part['order'].__len__() > 0))
+        if part['lock']:
+            buf.append(' ')
+            buf.append(part['lock'])
+
+    @staticmethod
+    def _item(part) -> str:
+        if type(part) is FieldPart and part._is_valid():
+            return part.expression
+        if type(part) is OrderBy and part._is_valid():
+            return f"{part.expression} {part.order.value}"
+        if isinstance(part, PartBase):
+            return part.to_sql("", indent=0)
+        return part if isinstance(part, str) else str(part)
+
+    def _container(self, parts: list, header: str, sep: str, buf: list[str]):
+        start = buf.__len__()
+        buf.append(header)
+        buf.append(' ')
+        for index, part in enumerate(parts):
+            if index:
+                buf.append(sep)
+            buf.append(self._item(part))
+        self._strip(buf, start)
+
+    def _from_part(self, tables: list, buf: list[str]):
+        start = buf.__len__()
+        buf.append("From ")
+        for index, table in enumerate(tables):
+            if index:
+                buf.append(' ')
+            if type(table) is From:
+                self._from(table, buf)
+            else:
+                buf.append(self._item(table))
+        self._strip(buf, start)
+
+    def _from(self, table: From, buf: list[str]):
+        if table.join_type != From.JoinType.NoJoin:
+            buf.append(table.join_type.value)
+            buf.append(' ')
+        buf.append(table.table)
+        if table.alias:
+            buf.append(' ')
+            buf.append(table.alias)
+        if table.on is not None and table.on.__len__() > 0:
+            buf.append(' ')
+            self._where(table.on, "On", buf)
+
+    def _where(self, where: WhereAnd, title: str, buf: list[str]):
+        start = buf.__len__()
+        buf.append(title)
+        buf.append(' ')
+        sep = where.sep + ' '
+        for index, part in enumerate(where.parts):
+            if index:
+                buf.append(sep)
+            if isinstance(part, FieldPart):
+                buf.append(self._item(part))
+            elif type(part) in self.WHERE_TYPES:
+                if part.__len__() > 1:
+                    buf.append('( ')
+                    self._where(part, "", buf)
+                    buf.append(' )')
+                else:
+                    self._where(part, "", buf)
+            elif isinstance(part, PartContainerBase):
+                buf.append(f"( {part.to_sql('', indent=0)} )" if part.__len__() > 1 else part.to_sql("", indent=0))
+            else:
+                buf.append(str(part))
+        self._strip(buf, start)
+
+    # Pretty mode, one line per clause header and per item
+
+    def _pretty_statement(self, statement: "Statement", dialect: Dialect, lines: list[str]):
+        part = statement.part
+        select = part['select']
+        lines.append("Select Distinct" if select.distinct else "Select")
+        if select.__len__() > 0:
+            self._pretty_items(select.parts, lines)
+        else:
+            lines.append(f"{self.pad}*")
+        if part['from'].__len__() > 0:
+            lines.append("From")
+            for table in part['from'].parts:
+                if type(table) is From:
+                    join = f"{table.join_type.value} " if table.join_type != From.JoinType.NoJoin else ""
+                    lines.append(f"{self.pad}{join}{table.table}{f' {table.alias}' if table.alias else ''}")
+                    if table.on is not None and table.on.__len__() > 0:
+                        lines.append(f"{self.pad * 2}On")
+                        self._pretty_where(table.on, 3, lines)
+                else:
+                    lines.append(f"{self.pad}{self._item(table)}")
+        if part['where'].__len__() > 0:
+            lines.append("Where")
+            self._pretty_where(part['where'], 1, lines)
+        if part['group'].__len__() > 0:
+            lines.append("Group By")
+            self._pretty_items(part['group'].parts, lines)
+        if part['having'].__len__() > 0:
+            lines.append("Having")
+            self._pretty_where(part['having'], 1, lines)
+        if part['order'].__len__() > 0:
+            lines.append("Order By")
+            self._pretty_items(part['order'].parts, lines)
+        limit = part['limit']
+        if limit._is_valid() and limit.limit != 0:
+            lines.append(dialect.limit(limit.limit, limit.offset, part['order'].__len__() > 0))
+        if part['lock']:
+            lines.append(part['lock'])
+
+    def _pretty_items(self, parts: list, lines: list[str]):
+        last = parts.__len__() - 1
+        for index, part in enumerate(parts):
+            lines.append(f"{self.pad}{self._item(part).strip()}{',' if index < last else ''}")
+
+    def _pretty_where(self, where: WhereAnd, level: int, lines: list[str]):
+        pad = self.pad * level
+        op = where.sep.strip()
+        for index, part in enumerate(where.parts):
+            prefix = f"{op} " if index else ""
+            if type(part) in self.WHERE_TYPES and part.__len__() > 1:
+                lines.append(f"{pad}{prefix}(")
+                self._pretty_where(part, level + 1, lines)
+                lines.append(f"{pad})")
+            elif type(part) in self.WHERE_TYPES:
+                buf = []
+                self._where(part, "", buf)
+                lines.append(f"{pad}{prefix}{''.join(buf)}")
+            elif isinstance(part, FieldPart):
+                lines.append(f"{pad}{prefix}{self._item(part).strip()}")
+            elif isinstance(part, PartContainerBase):
+                lines.append(f"{pad}{prefix}({part.to_sql('', indent=0)})")
+            else:
+                lines.append(f"{pad}{prefix}{part}")
+
+
+compact_compiler = SqlCompiler()
@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+import re
+import sqlite3
+
+
+class Dialect(object):
+    """
+    SQL syntax of a database engine, chosen once per Pydoo (see Pydoo.dialect).
+
+    Statements are rendered in the canonical syntax of MySQL: `%s` placeholders, `backtick` quoted identifiers and
+    `%%` for a literal percent sign outside string literals. translate() rewrites the canonical SQL to the engine,
+    which Statement does once per statement shape before the SQL is kept in Pydoo.sql_cache.
+    Clauses differing in structure (limit / offset, upsert) are rendered by the dialect itself.
+    """
+    name = "mysql"
+    # DB-API paramstyle of the usual driver, "format" (%s) or "qmark" (?)
+    placeholder = "%s"
+    quote_open = "`"
+    quote_close = "`"
+    # Bind parameters one statement can take
+    max_bind_params = 65535
+    # Row values `(a, b) In ((%s, %s), ...)` and `(a, b) > (%s, %s)` are supported
+    row_values = True
+
+    # String literals, quoted identifiers and percent signs of canonical SQL
+    TOKEN = re.compile(r"'(?:[^'\\]|\\.|'')*'|\"(?:[^\"\\]|\\.|\"\")*\"|`((?:[^`]|``)*)`|%[s%]")
+
+    def __init__(self, placeholder: str | None = None):
+        """
+        :param placeholder: "%s" or "?" when the driver differs from the usual one, e.g. MSSQLDialect("%s") for pymssql
+        """
+        if placeholder is not None:
+            if placeholder not in ("%s", "?"):
+                raise ValueError(f"Invalid placeholder: {placeholder}, expect '%s' or '?'")
+            self.placeholder = placeholder
+        # Nothing to rewrite when the canonical syntax is the engine's own
+        self.native = self.placeholder == "%s" and self.quote_open == "`"
+
+    def __repr__(self):
+        return f"{type(self).__name__}()"
+
+    def _token(self, match: re.Match) -> str:
+        token = match.group(0)
+        if token == "%s":
+            return self.placeholder
+        if token == "%%":
+            return "%%" if self.placeholder == "%s" else "%"
+        if match.group(1) is not None:
+            name = match.group(1).replace("``", "`")
+            return self.quote_open + name.replace(self.quote_close, self.quote_close * 2) + self.quote_close
+        return token
+
+    def translate(self, sql: str) -> str:
+        """
+        Canonical SQL in the syntax of the engine, string literals are kept as they are.
+        """
+        if self.native:
+            return sql
+        return self.TOKEN.sub(self._token, sql)
+
+    def limit(self, limit: int, offset: int = 0, ordered: bool = True) -> str:
+        """
+        Limit clause of a select statement.
+        :param ordered: the statement has an Order By
+        """
+        return f"Limit {limit}" if offset == 0 else f"Limit {offset}, {limit}"
+
+    def row_compare(self, columns: list[str], op: str, values: list | tuple) -> tuple[str, list]:
+        """
+        Canonical condition comparing the row of `columns` with the row of `values` by `op`, '<' or '>', and its values.
+        Without row values it is expanded to `(`a` > %s Or (`a` = %s And `b` > %s))`.
+        """
+        if self.row_values:
+            return '({columns}) {op} ({values})'.format(
+                columns=', '.join(f'`{column}`' for column in columns), op=op, values=', '.join(('%s',) * columns.__len__())), list(values)
+        sql = f'`{columns[-1]}` {op} %s'
+        expanded = [values[-1]]
+        for column, value in zip(reversed(columns[:-1]), reversed(values[:-1])):
+            sql = f'(`{column}` {op} %s Or (`{column}` = %s And {sql}))'
+            expanded[:0] = [value, value]
+        return sql, expanded
+
+    def _assignments(self, table: str, update: tuple[tuple[str, str], ...], new: str) -> str:
+        # `col` = <table>.`col` <op> <new value> of every update column, op "" sets the new value.
+        return ', '.join(f"`{column}` = " + (f"{table}.`{column}` {op} " if op else "") + new.format(column=column)
+                         for column, op in update)
+
+    def _insert(self, table: str, columns: tuple[str, ...], rows: int) -> str:
+        row = f"({', '.join(('%s',) * columns.__len__())})"
+        return "Insert Into {table} ({columns}) Values {rows}".format(
+            table=table, columns=', '.join(f'`{column}`' for column in columns), rows=', '.join((row,) * rows))
+
+    def upsert(self, table: str, columns: tuple[str, ...], keys: tuple[str, ...], update: tuple[tuple[str, str], ...],
+               rows: int) -> str:
+        """
+        Canonical SQL inserting `rows` rows, updating the conflicting rows on `keys` instead.
+        :param update: (column, operator) to update, operator "" sets the new value, "+" adds it and so on
+        """
+        insert = self._insert(table, columns, rows)
+        if not update:
+            # Assigning the key to itself keeps the existing row
+            return f"{insert} On Duplicate Key Update `{keys[0]}` = `{keys[0]}`"
+        return f"{insert} On Duplicate Key Update " + ', '.join(
+            f"`{column}` = " + (f"`{column}` {op} " if op else "") + f"Values(`{column}`)" for column, op in update)
+
+
+class MySQLDialect(Dialect):
+    ...
+
+
+class SQLiteDialect(Dialect):
+    """
+    sqlite3, `?` placeholders. Backticks are accepted by sqlite and kept.
+    """
+    name = "sqlite"
+    placeholder = "?"
+    # SQLITE_MAX_VARIABLE_NUMBER, 999 before sqlite 3.32
+    max_bind_params = 32766 if sqlite3.sqlite_version_info >= (3, 32) else 999
+
+    def limit(self, limit: int, offset: int = 0, ordered: bool = True) -> str:
+        return f"Limit {limit}" if offset == 0 else f"Limit {limit} Offset {offset}"
+
+    def upsert(self, table: str, columns: tuple[str, ...], keys: tuple[str, ...], update: tuple[tuple[str, str], ...],
+               rows: int) -> str:
+        target = ', '.join(f'`{key}`' for key in keys)
+        insert = f"{self._insert(table, columns, rows)} On Conflict ({target}) Do"
+        if not update:
+            return f"{insert} Nothing"
+        return f"{insert} Update Set {self._assignments(table, update, 'excluded.`{column}`')}"
+
+
+class PostgreSQLDialect(SQLiteDialect):
+    """
+    PostgreSQL by psycopg, `%s` placeholders and "double quoted" identifiers.
+    """
+    name = "postgresql"
+    placeholder = "%s"
+    quote_open = '"'
+    quote_close = '"'
+    max_bind_params = 65535
+
+
+class MSSQLDialect(Dialect):
+    """
+    SQL Server by pyodbc, `?` placeholders and [bracket] quoted identifiers, MSSQLDialect("%s") for pymssql.
+    Offset / Fetch needs an Order By, one ordering by nothing is added without it.
+    """
+    name = "mssql"
+    placeholder = "?"
+    quote_open = "["
+    quote_close = "]"
+    max_bind_params = 2100
+    row_values = False
+
+    def limit(self, limit: int, offset: int = 0, ordered: bool = True) -> str:
+        return ("" if ordered else "Order By (Select Null) ") + f"Offset {offset} Rows Fetch Next {limit} Rows Only"
+
+    def upsert(self, table: str, columns: tuple[str, ...], keys: tuple[str, ...], update: tuple[tuple[str, str], ...],
+               rows: int) -> str:
+        row = f"({', '.join(('%s',) * columns.__len__())})"
+        names = ', '.join(f'`{column}`' for column in columns)
+        on = ' And '.join(f"target.`{key}` = source.`{key}`" for key in keys)
+        sql = f"Merge Into {table} As target Using (Values {', '.join((row,) * rows)}) As source ({names}) On {on}"
+        if update:
+            sql += " When Matched Then Update Set " + ', '.join(
+                f"target.`{column}` = " + (f"target.`{column}` {op} " if op else "") + f"source.`{column}`" for column, op in update)
+        values = ', '.join(f'source.`{column}`' for column in columns)
+        return f"{sql} When Not Matched Then Insert ({names}) Values ({values});"
+
+
+DIALECTS: dict[str, Dialect] = {
+    dialect.name: dialect for dialect in (MySQLDialect(), SQLiteDialect(), PostgreSQLDialect(), MSSQLDialect())
+}
+
+
+# Dialects with the placeholder of a driver other than the usual one, by (name, placeholder)
+_DRIVER_DIALECTS: dict[tuple[str, str], Dialect] = {}
+
+
+def executor_dialect(executor) -> Dialect:
+    """
+    Dialect of the engine and driver placeholder detected by an executor (Executor.type / placeholder), MySQL if unknown.
+    """
+    engine = getattr(executor, "type", None)
+    dialect = DIALECTS.get(engine, DIALECTS["mysql"]) if isinstance(engine, str) else DIALECTS["mysql"]
+    placeholder = getattr(executor, "placeholder", None)
+    if not isinstance(placeholder, str) or placeholder not in ("%s", "?") or placeholder == dialect.placeholder:
+        return dialect
+    key = (dialect.name, placeholder)
+    if key not in _DRIVER_DIALECTS:
+        _DRIVER_DIALECTS[key] = type(dialect)(placeholder)
+    return _DRIVER_DIALECTS[key]
+
+
+def get_dialect(dialect: str | Dialect) -> Dialect:
+    """
+    Dialect by its name: "mysql", "sqlite", "postgresql" or "mssql", a Dialect is returned as is.
+    """
+    if isinstance(dialect, Dialect):
+        return dialect
+    found = DIALECTS.get(dialect)
+    if found is None:
+        raise ValueError(f"Unknown SQL dialect: {dialect}, expect one of {', '.join(DIALECTS)}")
+    return found
@@ -6,3 +6,27 @@ class SQLSyntaxError(SyntaxError):
 
 class SQLPartNotValidError(SQLSyntaxError):
     ...
+
+
+class PoolError(Exception):
+    ...
+
+
+class PoolTimeoutError(PoolError):
+    ...
+
+
+class PoolClosedError(PoolError):
+    ...
+
+
+class WriterError(Exception):
+    ...
+
+
+class WriterFullError(WriterError):
+    ...
+
+
+class WriterClosedError(WriterError):
+    ...
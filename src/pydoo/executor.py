@@ -1,37 +1,443 @@
 # -*- coding: utf-8 -*-
+import contextlib
+import datetime
+import decimal
+import sys
+import threading
+import weakref
 
 from .api.db_api import DBAPI as Connection
+from .api.sqlite_api import SQLiteConnection
+from .pool import ConnectionPool
+from .prepared import PreparedCache, PreparedCursor
 
 
 class Executor(object):
     def __init__(self, conn: Connection):
         self.conn = conn
+        # Database engine, a name of dialect.DIALECTS, detected from the connection when empty
         self.type = ""
+        # Placeholder of the driver, "%s" or "?", detected from the paramstyle of the driver module when empty
+        self.placeholder = ""
 
         self.logs = []
         self.logging = False
 
+        # Limits of one statement sent to the server, used to split bulk writes.
+        # 65535 is the placeholder limit of MySQL prepared statements, 4 MiB the default max_allowed_packet of MySQL 5.x.
+        self.max_bind_params = 65535
+        self.max_packet_size = 4 * 1024 * 1024
+        # Send bulk inserts by cursor.executemany() instead of multi-row Values, for drivers which batch it themselves.
+        self.prefer_executemany = False
+
+        # Cursor class of unbuffered (server side) cursors used by streaming queries, e.g. MySQLProfile.stream_cursor().
+        # Detected from the connection when None, the default cursor is used if the driver is unknown.
+        self.stream_cursor_class = None
+
+        # Prepared statements, disabled when 0. Every connection keeps an LRU of this many prepared SQL texts,
+        # a SQL text is prepared when it has run `prepare_threshold` times on the connection.
+        self.prepared_cache_size = 0
+        self.prepare_threshold = 2
+        # Makes the cursor of a prepared handle, e.g. `lambda conn: conn.cursor(prepared=True)` for server side
+        # prepared statements of mysql-connector. The default cursor is kept open and executed again otherwise,
+        # which reuses the statement compiled by drivers caching them per cursor or connection (sqlite3).
+        self.prepared_cursor_factory = None
+        self.prepared: weakref.WeakKeyDictionary[Connection, PreparedCache] = weakref.WeakKeyDictionary()
+
         self.check_conn()
 
     def connection(self):
         return self.conn
 
-    def check_conn(self):
-        if not hasattr(self.conn, "cursor"):
+    @contextlib.contextmanager
+    def spare_connection(self):
+        """
+        Connection for side statements of hooks, like the EXPLAIN of SlowQueryLog, never waits for one.
+        """
+        yield self.conn
+
+    def use_dict_cursor(self):
+        """
+        Rows of later statements are dicts, by the DictCursor of the connection, used by Pydoo for FETCH_ALL_AS_DICT.
+        """
+        self._set_dict_cursor(self.conn)
+
+    @staticmethod
+    def _set_dict_cursor(conn: Connection):
+        conn.cursorclass = conn.DictCursor
+
+    def check_conn(self, conn: Connection | None = None):
+        conn = self.conn if conn is None else conn
+        if not hasattr(conn, "cursor"):
             raise Exception("Connection object must have a cursor method.")
-        if not hasattr(self.conn, "begin"):
+        if not hasattr(conn, "begin"):
             raise Exception("Connection object must have a query method.")
-        if not hasattr(self.conn, "commit"):
+        if not hasattr(conn, "commit"):
             raise Exception("Connection object must have a commit method.")
-        if not hasattr(self.conn, "rollback"):
+        if not hasattr(conn, "rollback"):
             raise Exception("Connection object must have a rollback method.")
+        if not self.type:
+            self.type = self._detect_type(conn)
+        if not self.placeholder:
+            self.placeholder = self._detect_placeholder(conn)
 
-    def query(self, query: str, args=None):
-        cursor = self.conn.cursor()
-        cursor.query(query, args)
+    # Driver module prefixes of the engines besides MySQL
+    DRIVER_TYPES = (
+        (("sqlite3", "aiosqlite"), "sqlite"),
+        (("psycopg", "psycopg2", "pg8000"), "postgresql"),
+        (("pyodbc", "pymssql"), "mssql"),
+    )
+
+    @classmethod
+    def _detect_type(cls, conn) -> str:
+        if isinstance(conn, SQLiteConnection):
+            return "sqlite"
+        module = type(conn).__module__.partition('.')[0]
+        for modules, engine in cls.DRIVER_TYPES:
+            if module in modules:
+                return engine
+        return "mysql"
+
+    # DB-API paramstyle of a driver module to its placeholder
+    PARAMSTYLES = {"format": "%s", "pyformat": "%s", "qmark": "?"}
+
+    @classmethod
+    def _detect_placeholder(cls, conn) -> str:
+        if isinstance(conn, SQLiteConnection):
+            return "?"
+        module = sys.modules.get(type(conn).__module__.partition('.')[0])
+        return cls.PARAMSTYLES.get(getattr(module, "paramstyle", None), "")
+
+    @staticmethod
+    def _cursor_execute(cursor, query: str, args=None):
+        # Some drivers (sqlite3) refuse None as parameters.
+        if args is None:
+            cursor.execute(query)
+        else:
+            cursor.execute(query, args)
+
+    @staticmethod
+    def _detect_stream_cursor(conn: Connection):
+        if type(conn).__module__.startswith("pymysql"):
+            from .api.mysql_profile import MySQLProfile
+            return MySQLProfile.stream_cursor()
+        return None
+
+    def _cursor(self, conn: Connection, stream: bool = False):
+        if not stream:
+            return conn.cursor()
+        if self.stream_cursor_class is None:
+            self.stream_cursor_class = self._detect_stream_cursor(conn)
+        return conn.cursor() if self.stream_cursor_class is None else conn.cursor(self.stream_cursor_class)
+
+    @staticmethod
+    def _session(conn: Connection):
+        # Server side id of the session, it changes when the driver reconnects (PyMySQL thread_id()).
+        thread_id = getattr(conn, "thread_id", None)
+        return thread_id() if callable(thread_id) else None
+
+    def _prepared_cache(self, conn: Connection) -> PreparedCache | None:
+        try:
+            cache = self.prepared.get(conn)
+        except TypeError:
+            # Connection cannot be weakly referenced.
+            return None
+        session = self._session(conn)
+        if cache is None:
+            cache = self.prepared[conn] = PreparedCache(self.prepared_cache_size, session)
+        elif cache.session != session:
+            # Reconnected, statements prepared in the old session are gone.
+            cache.clear()
+            cache.session = session
+        return cache
+
+    def _execute_prepared(self, conn: Connection, query: str, args) -> PreparedCursor | None:
+        """
+        Execute by the prepared handle of the query on the connection.
+        :return: PreparedCursor, or None when prepared statements are disabled or the query is not prepared
+        """
+        if self.prepared_cache_size <= 0:
+            return None
+        cache = self._prepared_cache(conn)
+        if cache is None:
+            return None
+        factory = self.prepared_cursor_factory
+        handle = cache.acquire(query, self.prepare_threshold, (lambda: factory(conn)) if factory is not None else conn.cursor)
+        if handle is None:
+            return None
+        try:
+            self._cursor_execute(handle.cursor, query, args)
+        except BaseException:
+            cache.discard(handle)
+            raise
+        return PreparedCursor(handle, cache)
+
+    def invalidate_prepared(self, conn: Connection | None = None):
+        """
+        Close the prepared handles of a connection, or of all connections.
+        Reconnects are detected by Executor._session(), call this when the driver reconnects silently otherwise.
+        """
+        caches = list(self.prepared.values()) if conn is None else [self.prepared.get(conn)]
+        for cache in caches:
+            if cache is not None:
+                cache.clear()
+
+    def prepared_stats(self) -> dict[str, int]:
+        """
+        Sum of the prepared caches of all connections.
+        """
+        stats = {"connections": 0, "length": 0, "hits": 0, "misses": 0, "prepares": 0, "evictions": 0}
+        for cache in list(self.prepared.values()):
+            stats["connections"] += 1
+            for name, value in cache.stats().items():
+                if name != "size":
+                    stats[name] += value
+        return stats
+
+    def query(self, query: str, args=None, stream: bool = False):
+        """
+        :param stream: use an unbuffered cursor, rows stay on the server until fetched
+        """
+        if not stream:
+            cursor = self._execute_prepared(self.conn, query, args)
+            if cursor is not None:
+                return cursor
+        cursor = self._cursor(self.conn, stream)
+        self._cursor_execute(cursor, query, args)
         return cursor
 
     def execute(self, query: str, args=None):
+        cursor = self._execute_prepared(self.conn, query, args)
+        if cursor is not None:
+            return cursor
+        cursor = self.conn.cursor()
+        self._cursor_execute(cursor, query, args)
+        return cursor
+
+    def execute_many(self, query: str, args_list: list):
         cursor = self.conn.cursor()
-        cursor.execute(query, args)
+        cursor.executemany(query, args_list)
         return cursor
+
+    # Transactions, see Pydoo.transaction()
+
+    def begin(self):
+        self.conn.begin()
+
+    def commit(self):
+        self.conn.commit()
+
+    def rollback(self):
+        self.conn.rollback()
+
+    def savepoint(self, name: str):
+        self.execute(f"Savepoint {name}").close()
+
+    def release_savepoint(self, name: str):
+        self.execute(f"Release Savepoint {name}").close()
+
+    def rollback_to_savepoint(self, name: str):
+        self.execute(f"Rollback To Savepoint {name}").close()
+
+    @staticmethod
+    def literal(value) -> str:
+        if value is None:
+            return "NULL"
+        if isinstance(value, bool):
+            return "1" if value else "0"
+        if isinstance(value, (int, float, decimal.Decimal)):
+            return str(value)
+        if isinstance(value, (bytes, bytearray)):
+            return f"X'{value.hex()}'"
+        if isinstance(value, (datetime.date, datetime.time, datetime.timedelta)):
+            return f"'{value}'"
+        return "'" + str(value).replace("\\", "\\\\").replace("'", "\\'") + "'"
+
+    @classmethod
+    def render_literals(cls, query: str, args=None) -> str:
+        """
+        SQL with `%s` (or `?`) placeholders replaced by literals of args, for logs only, never execute the result.
+        """
+        if not args:
+            return query
+        if "%s" not in query and "?" in query and not isinstance(args, dict):
+            query = query.replace("%", "%%").replace("?", "%s")
+        try:
+            if isinstance(args, dict):
+                return query % {name: cls.literal(value) for name, value in args.items()}
+            return query % tuple(cls.literal(value) for value in args)
+        except (TypeError, ValueError, KeyError):
+            return f"{query} -- {args!r}"
+
+    def _mogrify(self, conn: Connection, query: str, args=None) -> str:
+        cursor = conn.cursor()
+        try:
+            mogrify = getattr(cursor, "mogrify", None)
+            if callable(mogrify):
+                return mogrify(query, args)
+        finally:
+            cursor.close()
+        return self.render_literals(query, args)
+
+    def mogrify(self, query: str, args=None) -> str:
+        """
+        The SQL the driver sends for the query and args, by cursor.mogrify() (PyMySQL) or Executor.render_literals().
+        """
+        return self._mogrify(self.conn, query, args)
+
+
+class PooledCursor(object):
+    """
+    Cursor checked out together with a pooled connection.
+    The connection goes back to the pool when the cursor is closed, exhausted by iteration or collected.
+    """
+
+    def __init__(self, cursor, conn: Connection, pool: ConnectionPool):
+        self.cursor = cursor
+        self.conn = conn
+        self.pool = pool
+
+    def __getattr__(self, name):
+        return getattr(self.cursor, name)
+
+    def __iter__(self):
+        try:
+            yield from self.cursor
+        finally:
+            self.close()
+
+    def close(self):
+        if self.conn is None:
+            return
+        conn, self.conn = self.conn, None
+        try:
+            self.cursor.close()
+        finally:
+            self.pool.release(conn)
+
+    def __del__(self):
+        self.close()
+
+
+class PooledExecutor(Executor):
+    """
+    Executor over a ConnectionPool, so one Pydoo can be shared by worker threads.
+    Each query() / execute() checks out a connection and returns a PooledCursor which gives it back on close().
+    execute() commits before returning, a pooled connection is reset when released.
+    begin() pins a connection to the calling thread until commit() / rollback(), statements of the thread run on it
+    and are not committed one by one.
+    """
+
+    def __init__(self, pool: ConnectionPool):
+        self.pool = pool
+        # Connection of the transaction of each thread
+        self.local = threading.local()
+        # Set by use_dict_cursor(), applied to every connection a statement runs on
+        self.dict_cursor = False
+        super().__init__(None)
+
+    def connection(self):
+        """
+        Context manager checking out a connection of the pool, there is no single connection to configure.
+        """
+        return self.pool.connection()
+
+    @contextlib.contextmanager
+    def spare_connection(self):
+        """
+        The transaction connection of the thread, else an idle connection of the pool,
+        PoolTimeoutError at once when all are in use instead of waiting or taking one a statement waits for.
+        """
+        pinned = self._pinned()
+        if pinned is not None:
+            yield pinned
+            return
+        with self.pool.connection(timeout=0) as conn:
+            yield conn
+
+    def use_dict_cursor(self):
+        self.dict_cursor = True
+
+    def check_conn(self, conn: Connection | None = None):
+        if conn is not None:
+            return super().check_conn(conn)
+        with self.pool.connection() as conn:
+            super().check_conn(conn)
+
+    def _pinned(self) -> Connection | None:
+        return getattr(self.local, "conn", None)
+
+    def _run_on(self, conn: Connection, query: str, args, many: bool = False, stream: bool = False):
+        if self.dict_cursor:
+            self._set_dict_cursor(conn)
+        cursor = None if many or stream else self._execute_prepared(conn, query, args)
+        if cursor is None:
+            cursor = self._cursor(conn, stream)
+            if many:
+                cursor.executemany(query, args)
+            else:
+                self._cursor_execute(cursor, query, args)
+        return cursor
+
+    def _run(self, query: str, args, commit: bool, many: bool = False, stream: bool = False) -> PooledCursor:
+        pinned = self._pinned()
+        if pinned is not None:
+            return self._run_on(pinned, query, args, many, stream)
+        conn = self.pool.acquire()
+        try:
+            cursor = self._run_on(conn, query, args, many, stream)
+            if commit:
+                conn.commit()
+        except BaseException:
+            self.pool.release(conn)
+            raise
+        return PooledCursor(cursor, conn, self.pool)
+
+    def query(self, query: str, args=None, stream: bool = False):
+        return self._run(query, args, commit=False, stream=stream)
+
+    def execute(self, query: str, args=None):
+        return self._run(query, args, commit=True)
+
+    def execute_many(self, query: str, args_list: list):
+        return self._run(query, args_list, commit=True, many=True)
+
+    def mogrify(self, query: str, args=None) -> str:
+        pinned = self._pinned()
+        if pinned is not None:
+            return self._mogrify(pinned, query, args)
+        with self.pool.connection() as conn:
+            return self._mogrify(conn, query, args)
+
+    def begin(self):
+        if self._pinned() is not None:
+            raise ValueError("A transaction is already open in this thread")
+        conn = self.pool.acquire()
+        try:
+            conn.begin()
+        except BaseException:
+            self.pool.release(conn)
+            raise
+        self.local.conn = conn
+
+    def _end(self, commit: bool):
+        conn = self._pinned()
+        if conn is None:
+            raise ValueError("No transaction is open in this thread")
+        try:
+            if commit:
+                conn.commit()
+            else:
+                conn.rollback()
+        finally:
+            self.local.conn = None
+            self.pool.release(conn)
+
+    def commit(self):
+        self._end(True)
+
+    def rollback(self):
+        self._end(False)
+
+    def close(self):
+        self.pool.close()
@@ -0,0 +1,278 @@
+# -*- coding: utf-8 -*-
+import threading
+import time
+from collections import deque
+from typing import Callable
+
+
+class QueryEvent(object):
+    """
+    One statement sent by Pydoo, passed to every hook.
+    `sql` is the rendered SQL with placeholders, so it is the shape of the statement, `args` its bound values.
+    Times are in seconds, `rows` is None when unknown (FETCH_CURSOR_RAW, writes report cursor.rowcount).
+    """
+    __slots__ = ("kind", "sql", "args", "params", "result_type", "render_time", "execute_time", "fetch_time", "rows", "error")
+
+    def __init__(self, kind: str, sql: str, args, result_type: str, render_time: float = 0.0):
+        self.kind = kind
+        self.sql = sql
+        self.args = args
+        self.params = args.__len__() if isinstance(args, (list, tuple, dict)) else 0
+        self.result_type = result_type
+        self.render_time = render_time
+        self.execute_time = 0.0
+        self.fetch_time = 0.0
+        self.rows: int | None = None
+        self.error: BaseException | None = None
+
+    @property
+    def total_time(self) -> float:
+        return self.render_time + self.execute_time + self.fetch_time
+
+    def __repr__(self):
+        return (f"QueryEvent({self.kind} {self.sql!r} params={self.params} rows={self.rows} "
+                f"render={self.render_time:.6f} execute={self.execute_time:.6f} fetch={self.fetch_time:.6f}"
+                f"{f' error={self.error!r}' if self.error is not None else ''})")
+
+
+class QueryHooks(object):
+    """
+    Callbacks of Pydoo statements, each takes a QueryEvent:
+    * before_execute: the statement is about to be sent
+    * after_execute: the server accepted it, execute_time is set
+    * on_error: executing failed, error is set
+    * on_fetch: the result is consumed, fetch_time and rows are set.
+      Fully fetched result types fire it before returning, generators when exhausted or closed,
+      FETCH_CURSOR_RAW right after executing since the caller fetches by itself.
+    Hooks run in the calling thread and must not raise.
+    """
+    NAMES = ("before_execute", "after_execute", "on_error", "on_fetch")
+
+    def __init__(self):
+        self.before_execute: list[Callable[[QueryEvent], None]] = []
+        self.after_execute: list[Callable[[QueryEvent], None]] = []
+        self.on_error: list[Callable[[QueryEvent], None]] = []
+        self.on_fetch: list[Callable[[QueryEvent], None]] = []
+
+    def __bool__(self):
+        return bool(self.before_execute or self.after_execute or self.on_error or self.on_fetch)
+
+    def attach(self, listener):
+        """
+        Register the methods of `listener` named like the hooks, e.g. a QueryStats.
+        """
+        for name in self.NAMES:
+            method = getattr(listener, name, None)
+            if callable(method):
+                getattr(self, name).append(method)
+        return listener
+
+    def detach(self, listener):
+        for name in self.NAMES:
+            method = getattr(listener, name, None)
+            hooks = getattr(self, name)
+            if method in hooks:
+                hooks.remove(method)
+
+    @staticmethod
+    def _fire(hooks: list, event: QueryEvent):
+        for hook in hooks:
+            hook(event)
+
+    def execute(self, event: QueryEvent, func: Callable, *args):
+        self._fire(self.before_execute, event)
+        start = time.perf_counter()
+        try:
+            result = func(*args)
+        except BaseException as e:
+            event.execute_time = time.perf_counter() - start
+            event.error = e
+            self._fire(self.on_error, event)
+            raise
+        event.execute_time = time.perf_counter() - start
+        self._fire(self.after_execute, event)
+        return result
+
+    async def execute_async(self, event: QueryEvent, func: Callable, *args):
+        self._fire(self.before_execute, event)
+        start = time.perf_counter()
+        try:
+            result = await func(*args)
+        except BaseException as e:
+            event.execute_time = time.perf_counter() - start
+            event.error = e
+            self._fire(self.on_error, event)
+            raise
+        event.execute_time = time.perf_counter() - start
+        self._fire(self.after_execute, event)
+        return result
+
+    def fetched(self, event: QueryEvent, rows: int | None, fetch_time: float):
+        event.rows = rows
+        event.fetch_time = fetch_time
+        self._fire(self.on_fetch, event)
+
+    def failed(self, event: QueryEvent, error: BaseException, fetch_time: float):
+        event.error = error
+        event.fetch_time = fetch_time
+        self._fire(self.on_error, event)
+
+    @staticmethod
+    def row_count(result) -> int:
+        # Rows of a fully fetched result, a list of rows or a FETCH_COLUMNAR dict of columns.
+        if isinstance(result, dict):
+            return next(iter(result.values()), ()).__len__()
+        return result.__len__()
+
+    @staticmethod
+    def affected_rows(cursor) -> int | None:
+        rowcount = getattr(cursor, "rowcount", -1)
+        return rowcount if isinstance(rowcount, int) and rowcount >= 0 else None
+
+    @staticmethod
+    def _count(item, chunked: bool) -> int:
+        return item.__len__() if chunked else 1
+
+    def timed_iter(self, iterator, event: QueryEvent, chunked: bool = False):
+        """
+        Generator over a lazy result timing only the fetching, on_fetch fires when it ends.
+        """
+        rows = 0
+        fetch_time = 0.0
+        try:
+            while True:
+                start = time.perf_counter()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    fetch_time += time.perf_counter() - start
+                    break
+                fetch_time += time.perf_counter() - start
+                rows += self._count(item, chunked)
+                yield item
+        except GeneratorExit:
+            close = getattr(iterator, "close", None)
+            if close is not None:
+                close()
+            self.fetched(event, rows, fetch_time)
+            raise
+        except BaseException as e:
+            self.failed(event, e, fetch_time)
+            raise
+        self.fetched(event, rows, fetch_time)
+
+    async def timed_aiter(self, iterator, event: QueryEvent, chunked: bool = False):
+        rows = 0
+        fetch_time = 0.0
+        try:
+            while True:
+                start = time.perf_counter()
+                try:
+                    item = await iterator.__anext__()
+                except StopAsyncIteration:
+                    fetch_time += time.perf_counter() - start
+                    break
+                fetch_time += time.perf_counter() - start
+                rows += self._count(item, chunked)
+                yield item
+        except GeneratorExit:
+            close = getattr(iterator, "aclose", None)
+            if close is not None:
+                await close()
+            self.fetched(event, rows, fetch_time)
+            raise
+        except BaseException as e:
+            self.failed(event, e, fetch_time)
+            raise
+        self.fetched(event, rows, fetch_time)
+
+
+class ShapeStats(object):
+    """
+    Timings of one query shape, the latest `samples` of each kept for percentiles.
+    """
+    __slots__ = ("count", "errors", "rows", "total", "render", "execute", "fetch")
+
+    def __init__(self, samples: int):
+        self.count = 0
+        self.errors = 0
+        self.rows = 0
+        self.total: deque[float] = deque(maxlen=samples)
+        self.render: deque[float] = deque(maxlen=samples)
+        self.execute: deque[float] = deque(maxlen=samples)
+        self.fetch: deque[float] = deque(maxlen=samples)
+
+    def add(self, event: QueryEvent):
+        self.count += 1
+        if event.error is not None:
+            self.errors += 1
+        if event.rows is not None:
+            self.rows += event.rows
+        self.total.append(event.total_time)
+        self.render.append(event.render_time)
+        self.execute.append(event.execute_time)
+        self.fetch.append(event.fetch_time)
+
+    @staticmethod
+    def percentiles(samples, points: tuple[int, ...] = (50, 95, 99)) -> dict[str, float]:
+        # Nearest rank
+        ordered = sorted(samples)
+        if not ordered:
+            return {f"p{point}": 0.0 for point in points}
+        return {f"p{point}": ordered[max(0, -(-point * ordered.__len__() // 100) - 1)] for point in points}
+
+    def report(self) -> dict:
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "rows": self.rows,
+            **self.percentiles(self.total),
+            "render": self.percentiles(self.render),
+            "execute": self.percentiles(self.execute),
+            "fetch": self.percentiles(self.fetch),
+        }
+
+
+class QueryStats(object):
+    """
+    In-memory aggregator of QueryEvents by query shape, attach it by `doo.hooks.attach(QueryStats())`.
+    report() gives count, errors, rows and p50/p95/p99 of total time (seconds) per shape,
+    plus the percentiles of the render, execute and fetch phases.
+    At most `max_shapes` shapes are tracked, later shapes are counted under OTHER.
+    """
+    OTHER = "<other>"
+
+    def __init__(self, samples: int = 1024, max_shapes: int = 1000):
+        if not isinstance(samples, int) or samples <= 0:
+            raise ValueError("samples must be an integer greater than 0")
+        self.samples = samples
+        self.max_shapes = max_shapes
+        self.shapes: dict[str, ShapeStats] = {}
+        self.lock = threading.Lock()
+
+    def _add(self, event: QueryEvent):
+        with self.lock:
+            stats = self.shapes.get(event.sql)
+            if stats is None:
+                key = event.sql if self.shapes.__len__() < self.max_shapes else self.OTHER
+                stats = self.shapes.get(key)
+                if stats is None:
+                    stats = self.shapes[key] = ShapeStats(self.samples)
+            stats.add(event)
+
+    def on_fetch(self, event: QueryEvent):
+        self._add(event)
+
+    def on_error(self, event: QueryEvent):
+        self._add(event)
+
+    def report(self) -> dict[str, dict]:
+        with self.lock:
+            return {shape: stats.report() for shape, stats in self.shapes.items()}
+
+    def slowest(self, n: int = 10, percentile: str = "p95") -> list[tuple[str, dict]]:
+        return sorted(self.report().items(), key=lambda item: item[1][percentile], reverse=True)[:n]
+
+    def reset(self):
+        with self.lock:
+            self.shapes.clear()
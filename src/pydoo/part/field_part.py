@@ -4,6 +4,8 @@ from ..part.part_base import PartBase
 
 
 class FieldPart(PartBase):
+    __slots__ = ("expression",)
+
     def __init__(self):
         super().__init__()
         self.expression: str = ""
@@ -19,5 +21,8 @@ class FieldPart(PartBase):
             raise SQLPartNotValidError(f"{self} is not valid.")
         return f"{' ' * incr}{' ' * indent}{self.expression}"
 
+    def shape(self) -> tuple:
+        return (self.__class__.__name__, self.expression)
+
     def __str__(self):
         return self.to_sql("", 0)
@@ -6,6 +6,8 @@ from src.pydoo.part.where_part import WhereAnd, WhereOr
 
 
 class From(PartBase):
+    __slots__ = ("table", "alias", "join_type", "on")
+
     class JoinType(Enum):
         NoJoin = ""
         Join = "Join"
@@ -22,7 +24,12 @@ class From(PartBase):
         self.on: WhereAnd = WhereAnd()
 
     def set_table(self, table: str):
-        t, _, a = table.partition(' ')
+        if table.startswith('('):
+            # Subquery, the alias follows its closing parenthesis
+            end = table.rfind(')') + 1
+            t, a = table[:end], table[end:]
+        else:
+            t, _, a = table.partition(' ')
         self.table = t.strip()
         self.alias = a.strip()
         if self.table.__len__() > 0:
@@ -46,6 +53,9 @@ class From(PartBase):
     def set_join_type(self, join_type: JoinType):
         self.join_type = join_type
 
+    def shape(self) -> tuple:
+        return (self.__class__.__name__, self.table, self.alias, self.join_type, self.on.shape() if self.on is not None else None)
+
     def to_sql(self, title: str = "", indent=4, incr=0) -> str:
         string = []
 
@@ -66,10 +76,12 @@ class From(PartBase):
 
 
 class FromPart(PartContainerBase):
-    def __init__(self):
-        super().__init__()
-        self.tables: list[str | From] = self.parts
-        self.sep = ""
+    __slots__ = ()
+    sep = ""
+
+    @property
+    def tables(self) -> list[str | From]:
+        return self.parts
 
     def __len__(self):
         return self.tables.__len__()
@@ -4,10 +4,12 @@ from src.pydoo.part.part_base import PartContainerBase
 
 
 class GroupByPart(PartContainerBase):
-    def __init__(self):
-        super().__init__()
-        self.groups: list[str | FieldPart] = self.parts
-        self.sep = ","
+    __slots__ = ()
+    sep = ","
+
+    @property
+    def groups(self) -> list[str | FieldPart]:
+        return self.parts
 
     def add_group(self, group: str | FieldPart):
         if isinstance(group, str):
@@ -3,8 +3,7 @@ from src.pydoo.part.where_part import WhereAnd
 
 
 class HavingPart(WhereAnd):
-    def __init__(self):
-        super().__init__()
+    __slots__ = ()
 
     def to_sql(self, title="Having", indent=0, incr=0) -> str:
         return super().to_sql(title, indent, incr)
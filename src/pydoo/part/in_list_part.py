@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+from src.pydoo.part.field_part import FieldPart
+
+
+class InListPart(FieldPart):
+    """
+    `col` In (%s, %s, ...) condition with one placeholder per value, made by Statement.where({'col': [...]}).
+    Its values are Statement.values[offset:offset + count], so an oversized list can be found and split when executed.
+    An empty list is rendered as a condition that never holds.
+    """
+    __slots__ = ("column", "offset", "count")
+
+    def __init__(self, column: str, offset: int, count: int):
+        super().__init__()
+        self.column = column
+        self.offset = offset
+        self.count = count
+        self.set_expression(f"`{column}` In ({self.placeholders(count)})" if count > 0 else "1 = 0")
+
+    @staticmethod
+    def placeholders(count: int) -> str:
+        return "%s, " * (count - 1) + "%s"
+
+    def resized(self, count: int) -> "InListPart":
+        """
+        The same condition with `count` values, at the same offset.
+        """
+        return InListPart(self.column, self.offset, count)
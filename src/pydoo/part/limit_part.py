@@ -4,6 +4,8 @@ from src.pydoo.part.part_base import PartBase
 
 
 class LimitPart(PartBase):
+    __slots__ = ("limit", "offset")
+
     def __init__(self):
         super().__init__()
         self.limit: int = 0
@@ -32,6 +34,9 @@ class LimitPart(PartBase):
     def set_offset(self, offset: int):
         self.offset = LimitPart._check_offset(offset)
 
+    def shape(self) -> tuple:
+        return (self.__class__.__name__, self._valid, self.limit, self.offset)
+
     def to_sql(self, title="Limit", indent=0, incr=0) -> str:
         if not self._is_valid():
             raise SQLSyntaxError("LimitPart is not valid")
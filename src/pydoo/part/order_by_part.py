@@ -7,6 +7,7 @@ from src.pydoo.part.part_base import PartContainerBase, PartBase
 
 
 class OrderBy(FieldPart):
+    __slots__ = ("order",)
 
     class OrderEnum(Enum):
         ASC = "Asc"
@@ -30,6 +31,9 @@ class OrderBy(FieldPart):
         else:
             raise SQLSyntaxError(f"{order} is not supported.")
 
+    def shape(self) -> tuple:
+        return (self.__class__.__name__, self.expression, self.order)
+
     def to_sql(self, title="", indent=4) -> str:
         if title.__len__() > 0:
             raise SQLSyntaxError("title is not supported.")
@@ -39,10 +43,12 @@ class OrderBy(FieldPart):
 
 
 class OrderByPart(PartContainerBase):
-    def __init__(self):
-        super().__init__()
-        self.orders: list[str | OrderBy] = self.parts
-        self.sep = ","
+    __slots__ = ()
+    sep = ","
+
+    @property
+    def orders(self) -> list[str | OrderBy]:
+        return self.parts
 
     def add_order(self, order: str | OrderBy, order_type: str | OrderBy.OrderEnum = 'asc'):
         if isinstance(order, str):
@@ -1,8 +1,12 @@
 # -*- coding: utf-8 -*-
+import copy
 from abc import ABCMeta, abstractmethod
 
 
 class PartBase(object, metaclass=ABCMeta):
+    # Parts are made for every field and condition of every statement, so they have no __dict__.
+    __slots__ = ("_valid",)
+
     def __init__(self):
         self._valid = False
 
@@ -13,12 +17,24 @@ class PartBase(object, metaclass=ABCMeta):
     def _is_valid(self):
         return self._valid
 
+    def copy(self) -> "PartBase":
+        return copy.copy(self)
+
+    def shape(self) -> tuple:
+        """
+        Hashable description of everything in this part that affects the rendered SQL.
+        Bound values are not part of the shape, so statements with the same shape render the same SQL.
+        """
+        return (self.__class__.__name__, self._valid)
+
 
 class PartContainerBase(PartBase):
+    __slots__ = ("parts",)
+    sep = '\n'
+
     def __init__(self):
         super().__init__()
         self.parts: list[str | PartBase] = []
-        self.sep = '\n'
 
     def __len__(self):
         return len(self.parts)
@@ -29,14 +45,25 @@ class PartContainerBase(PartBase):
     def clear_part(self):
         self.parts.clear()
 
+    def copy(self) -> "PartContainerBase":
+        """
+        Copy with its own list of parts, the parts themselves are shared.
+        """
+        part = copy.copy(self)
+        part.parts = list(self.parts)
+        return part
+
+    def shape(self) -> tuple:
+        return (self.__class__.__name__, tuple(part.shape() if isinstance(part, PartBase) else str(part) for part in self.parts))
+
     def cal_sep(self, indent: int, incr = 0):
         if indent == 0:
-            self.sep = self.sep + " "
+            return self.sep + " "
         else:
-            self.sep = self.sep + "\n"
+            return self.sep + "\n"
 
     def to_sql(self, header="", indent=0, incr=0):
-        self.cal_sep(indent)
+        sep = self.cal_sep(indent)
         strings = []
         for part in self.parts:
             if isinstance(part, PartBase):
@@ -45,4 +72,4 @@ class PartContainerBase(PartBase):
                 strings.append("{incr}{indent}{part}".format(incr=' ' * incr, indent=' ' * indent, part=part))
             else:
                 strings.append("{incr}{indent}{part}".format(incr=' ' * incr, indent=' ' * indent, part=str(part)))
-        return "{header}{sep}{strings}".format(header=header, sep=' ' if indent == 0 else '\n', strings=self.sep.join(strings)).strip()
+        return "{header}{sep}{strings}".format(header=header, sep=' ' if indent == 0 else '\n', strings=sep.join(strings)).strip()
@@ -7,6 +7,8 @@ from src.pydoo.part.part_base import PartContainerBase
 
 
 class Field(FieldPart):
+    __slots__ = ("alias",)
+
     def __init__(self):
         super().__init__()
         self.alias: str = ""
@@ -23,19 +25,26 @@ class Field(FieldPart):
             return f"{self.expression} AS {self.alias}"
         return self.expression
 
+    def shape(self) -> tuple:
+        return (self.__class__.__name__, self.expression, self.alias)
+
     def __str__(self):
         return self.to_sql("", 0)
 
 
 class SelectPart(PartContainerBase):
+    __slots__ = ("distinct",)
     All = Literal['*']
+    sep = ","
 
     def __init__(self):
         super().__init__()
-        self.fields: list[str | Field] = self.parts
-        self.sep = ","
         self.distinct = False
 
+    @property
+    def fields(self) -> list[str | Field]:
+        return self.parts
+
     def add_field(self, field: Field | str):
         self.add_part(field)
 
@@ -45,6 +54,9 @@ class SelectPart(PartContainerBase):
     def set_distinct(self, b: bool):
         self.distinct = b
 
+    def shape(self) -> tuple:
+        return (*super().shape(), self.distinct)
+
     def to_sql(self, title="Select", indent=0, incr=0):
         if self.distinct:
             title = title + " Distinct"
@@ -9,10 +9,12 @@ ValueType = Union[str | int | float | None | datetime.datetime | datetime.date]
 
 
 class WhereAnd(PartContainerBase):
-    def __init__(self):
-        super().__init__()
-        self.exps: list[str | FieldPart | PartContainerBase] = self.parts
-        self.sep = " And"
+    __slots__ = ()
+    sep = " And"
+
+    @property
+    def exps(self) -> list[str | FieldPart | PartContainerBase]:
+        return self.parts
 
     def add_exp(self, exp: str | FieldPart | PartContainerBase):
         if isinstance(exp, str):
@@ -23,7 +25,7 @@ class WhereAnd(PartContainerBase):
             self.add_part(exp)
 
     def to_sql(self, title="Where", indent=0, incr=0):
-        self.cal_sep(indent)
+        sep = self.cal_sep(indent)
         strings = []
         for part in self.parts:
             if isinstance(part, FieldPart):
@@ -36,16 +38,15 @@ class WhereAnd(PartContainerBase):
             else:
                 strings.append("{indent}{part}".format(indent=' ' * indent, part=str(part)))
                 # raise Exception("Invalid Where Expression")
-        return "{title}{sep}{strings}".format(title=title, sep=' ' if indent == 0 else '\n', strings=self.sep.join(strings)).strip()
+        return "{title}{sep}{strings}".format(title=title, sep=' ' if indent == 0 else '\n', strings=sep.join(strings)).strip()
 
     def __len__(self):
         return len(self.parts)
 
 
 class WhereOr(WhereAnd):
-    def __init__(self):
-        super().__init__()
-        self.sep = " Or"
+    __slots__ = ()
+    sep = " Or"
 
 
 if __name__ == '__main__':
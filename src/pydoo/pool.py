@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+import contextlib
+import threading
+import time
+from collections import deque
+from typing import Callable
+
+from .api.db_api import DBAPI as Connection
+from .exception import PoolTimeoutError, PoolClosedError
+
+
+class ConnectionPool(object):
+    """
+    Thread safe pool of DB-API connections.
+
+    Connections are made by `creator` on demand up to `max_size`, and `min_size` of them are made at once and kept open.
+    Idle connections above `min_size` are closed after `idle_timeout` seconds.
+    A connection idle for at least `ping_interval` seconds is checked by its `ping()` before checkout (None disables),
+    a broken one is discarded and replaced.
+    Checkout waits `wait_timeout` seconds at most when all connections are in use (None waits forever).
+    When `reset` is set, connections are rolled back on release, so no transaction leaks into the next checkout.
+    """
+
+    def __init__(self, creator: Callable[[], Connection], min_size: int = 1, max_size: int = 10,
+                 idle_timeout: float | None = 300.0, wait_timeout: float | None = 10.0,
+                 ping_interval: float | None = 0.0, reset: bool = True):
+        if not callable(creator):
+            raise ValueError("Connection creator must be callable")
+        if not isinstance(min_size, int) or min_size < 0:
+            raise ValueError("min_size must be an integer greater than or equal to 0")
+        if not isinstance(max_size, int) or max_size <= 0:
+            raise ValueError("max_size must be an integer greater than 0")
+        if min_size > max_size:
+            raise ValueError("min_size must be less than or equal to max_size")
+
+        self.creator = creator
+        self.min_size = min_size
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.wait_timeout = wait_timeout
+        self.ping_interval = ping_interval
+        self.reset = reset
+
+        # (connection, last released time), the most recently released at the right.
+        self.idle: deque[tuple[Connection, float]] = deque()
+        self.size = 0
+        self.closed = False
+        self.cond = threading.Condition()
+
+        for _ in range(min_size):
+            self.idle.append((self.creator(), time.monotonic()))
+            self.size += 1
+
+    def __len__(self):
+        return self.size
+
+    def _evict_idle(self, now: float):
+        # Oldest idle connections are at the left.
+        if self.idle_timeout is None:
+            return
+        while self.idle and self.size > self.min_size and now - self.idle[0][1] >= self.idle_timeout:
+            conn, _ = self.idle.popleft()
+            self.size -= 1
+            self._close(conn)
+
+    @staticmethod
+    def _close(conn: Connection):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def _healthy(self, conn: Connection, idle_since: float) -> bool:
+        if self.ping_interval is None or time.monotonic() - idle_since < self.ping_interval:
+            return True
+        if not hasattr(conn, "ping"):
+            return True
+        try:
+            conn.ping()
+        except Exception:
+            return False
+        return True
+
+    def acquire(self, timeout: float | None = None) -> Connection:
+        """
+        Check out a connection, the caller must give it back by release().
+        :param timeout: seconds to wait for a free connection, default to wait_timeout
+        :return: Connection
+        """
+        timeout = self.wait_timeout if timeout is None else timeout
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self.cond:
+                conn, idle_since = None, 0.0
+                while True:
+                    if self.closed:
+                        raise PoolClosedError("Connection pool is closed")
+                    now = time.monotonic()
+                    self._evict_idle(now)
+                    if self.idle:
+                        # LIFO keeps the hot connections in use and lets the cold ones time out.
+                        conn, idle_since = self.idle.pop()
+                        break
+                    if self.size < self.max_size:
+                        self.size += 1
+                        break
+                    if deadline is not None and now >= deadline:
+                        raise PoolTimeoutError(f"No connection available in {timeout} seconds")
+                    self.cond.wait(None if deadline is None else deadline - now)
+
+            if conn is None:
+                try:
+                    return self.creator()
+                except BaseException:
+                    with self.cond:
+                        self.size -= 1
+                        self.cond.notify()
+                    raise
+            if self._healthy(conn, idle_since):
+                return conn
+            self.discard(conn)
+
+    def release(self, conn: Connection):
+        if self.reset:
+            try:
+                conn.rollback()
+            except Exception:
+                self.discard(conn)
+                return
+        with self.cond:
+            if self.closed:
+                self.size -= 1
+                self._close(conn)
+            else:
+                self.idle.append((conn, time.monotonic()))
+            self.cond.notify()
+
+    def discard(self, conn: Connection):
+        """
+        Close a broken connection and free its slot.
+        """
+        self._close(conn)
+        with self.cond:
+            self.size -= 1
+            self.cond.notify()
+
+    @contextlib.contextmanager
+    def connection(self, timeout: float | None = None):
+        conn = self.acquire(timeout)
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def close(self):
+        """
+        Close idle connections, connections in use are closed when released.
+        """
+        with self.cond:
+            self.closed = True
+            while self.idle:
+                conn, _ = self.idle.popleft()
+                self.size -= 1
+                self._close(conn)
+            self.cond.notify_all()
+
+    def stats(self) -> dict[str, int]:
+        with self.cond:
+            return {
+                "size": self.size,
+                "idle": self.idle.__len__(),
+                "in_use": self.size - self.idle.__len__(),
+            }
@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+from collections import OrderedDict
+from typing import Callable
+
+
+class PreparedStatement(object):
+    """
+    Prepared handle of one SQL text on one connection, a cursor kept open to execute it again.
+    """
+    __slots__ = ("sql", "cursor", "in_use", "evicted", "executions")
+
+    def __init__(self, sql: str, cursor):
+        self.sql = sql
+        self.cursor = cursor
+        self.in_use = False
+        self.evicted = False
+        self.executions = 0
+
+    def close(self):
+        try:
+            self.cursor.close()
+        except Exception:
+            pass
+
+
+class PreparedCache(object):
+    """
+    LRU of prepared handles of one connection, keyed by SQL text.
+
+    A SQL text is prepared when it has been seen `threshold` times, so statements run once do not take a handle.
+    A handle executes one statement at a time, while its cursor is still held by the caller the SQL runs unprepared.
+    Evicted handles are closed, or when they are in use, as soon as they are released.
+    `session` identifies the server session the handles were prepared in, see Executor._session().
+    """
+
+    def __init__(self, size: int, session=None):
+        if not isinstance(size, int) or size <= 0:
+            raise ValueError("Prepared cache size must be an integer greater than 0")
+        self.size = size
+        self.session = session
+        self.handles: OrderedDict[str, PreparedStatement] = OrderedDict()
+        # SQL text -> times seen before it is prepared
+        self.seen: OrderedDict[str, int] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.prepares = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return self.handles.__len__()
+
+    def __contains__(self, sql: str):
+        return sql in self.handles
+
+    def acquire(self, sql: str, threshold: int, open_cursor: Callable[[], object]) -> PreparedStatement | None:
+        """
+        Handle of the SQL text for one execution, the caller must give it back by release().
+        :return: PreparedStatement, or None when the SQL is not prepared (yet) or its handle is in use
+        """
+        handle = self.handles.get(sql)
+        if handle is not None:
+            self.handles.move_to_end(sql)
+            if handle.in_use:
+                self.misses += 1
+                return None
+            self.hits += 1
+            handle.in_use = True
+            handle.executions += 1
+            return handle
+
+        self.misses += 1
+        count = self.seen.pop(sql, 0) + 1
+        if count < threshold:
+            self.seen[sql] = count
+            while self.seen.__len__() > self.size:
+                self.seen.popitem(last=False)
+            return None
+
+        handle = PreparedStatement(sql, open_cursor())
+        handle.in_use = True
+        handle.executions = 1
+        self.prepares += 1
+        self.handles[sql] = handle
+        while self.handles.__len__() > self.size:
+            _, evicted = self.handles.popitem(last=False)
+            self.evictions += 1
+            self._drop(evicted)
+        return handle
+
+    @staticmethod
+    def _drop(handle: PreparedStatement):
+        if handle.in_use:
+            handle.evicted = True
+        else:
+            handle.close()
+
+    def release(self, handle: PreparedStatement):
+        handle.in_use = False
+        if handle.evicted:
+            handle.close()
+
+    def discard(self, handle: PreparedStatement):
+        """
+        Drop a handle whose execution failed, the SQL is prepared again on next use.
+        """
+        if self.handles.get(handle.sql) is handle:
+            del self.handles[handle.sql]
+        handle.in_use = False
+        handle.close()
+
+    def clear(self):
+        for handle in self.handles.values():
+            self._drop(handle)
+        self.handles.clear()
+        self.seen.clear()
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "size": self.size,
+            "length": self.handles.__len__(),
+            "hits": self.hits,
+            "misses": self.misses,
+            "prepares": self.prepares,
+            "evictions": self.evictions,
+        }
+
+
+class PreparedCursor(object):
+    """
+    Cursor of a prepared handle, closing it gives the handle back instead of closing the cursor.
+    """
+
+    def __init__(self, handle: PreparedStatement, cache: PreparedCache):
+        self.handle = handle
+        self.cache = cache
+
+    def __getattr__(self, name):
+        return getattr(self.handle.cursor, name)
+
+    def __iter__(self):
+        try:
+            yield from self.handle.cursor
+        finally:
+            self.close()
+
+    def close(self):
+        if self.cache is None:
+            return
+        cache, self.cache = self.cache, None
+        cache.release(self.handle)
+
+    def __del__(self):
+        self.close()
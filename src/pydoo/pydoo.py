@@ -1,10 +1,16 @@
 # -*- coding: utf-8 -*-
 import enum
+import time
 
 from .api.db_api import DBAPI as Connection
+from .dialect import Dialect, executor_dialect, get_dialect
 from .executor import Executor
+from .instrument import QueryEvent, QueryHooks
+from .result_cache import MISS, ResultCache
 from .result_parser import ResultParser
-from .statement import Statement
+from .sql_cache import SqlCache
+from .statement import Result, Statement
+from .transaction import Transaction, current
 
 class Pydoo(object):
     class ResultType(enum.Enum):
@@ -20,20 +26,55 @@ class Pydoo(object):
         # This mode will fetch all data every query and return a list of dicts (use DictCursor).
         FETCH_ALL_AS_DICT = 3
 
-        # This mode will fetch data in chunks. Supporting set chunk size (default 100).
+        # This mode will return a generator of chunks (lists of rows), each fetched by fetchmany(chunk size, default 100).
+        # Chunks are passed through chunk transforms, and can be prefetched in background (chunk prefetch).
         FETCH_CHUNK = 4
 
+        # This mode will iterate the result set with an unbuffered (server side) cursor, fetching chunk size rows at a time.
+        # Memory is bounded by chunk size, the cursor is closed when the iterator is exhausted or closed.
+        FETCH_STREAM = 5
+
+        # This mode will fetch all data chunk by chunk into a dict of column name to array (needs numpy).
+        # Numeric and date/time columns are NumPy arrays typed by cursor description, others are object arrays.
+        FETCH_COLUMNAR = 6
+
+        # This mode will return a Result, the query runs on first use of the Result, which fetches chunk size rows at a time
+        # as they are consumed. The Result has first(), scalar(), column(name) and to_dicts(), see statement.Result.
+        FETCH_LAZY = 7
+
     ResultParse = {
         ResultType.FETCH_CURSOR_RAW: ResultParser.result_raw,
         ResultType.FETCH_ITERATE: ResultParser.result_iterate,
         ResultType.FETCH_ALL: ResultParser.result_all,
         ResultType.FETCH_ALL_AS_DICT: ResultParser.result_all,
         ResultType.FETCH_CHUNK: ResultParser.result_chunk,
+        ResultType.FETCH_STREAM: ResultParser.result_stream,
+        ResultType.FETCH_COLUMNAR: ResultParser.result_columnar,
     }
 
-    def __init__(self, conn: Connection):
-        self.executor = Executor(conn)
+    # Result types which consume the whole cursor, the cursor is closed after parsing.
+    EagerResultTypes = (ResultType.FETCH_ALL, ResultType.FETCH_ALL_AS_DICT, ResultType.FETCH_COLUMNAR)
+
+    def __init__(self, conn: Connection | Executor, sql_cache_size: int = 256, dialect: str | Dialect | None = None):
+        """
+        :param dialect: SQL syntax of the database, "mysql", "sqlite", "postgresql", "mssql" or a Dialect,
+                        default to the engine and placeholder of the driver detected by the executor
+        """
+        # A ready executor (e.g. PooledExecutor) is used as is, otherwise the single connection is wrapped.
+        self.executor = conn if isinstance(conn, Executor) else Executor(conn)
+
+        # Compiled SQL of statements created by table(), keyed by statement shape.
+        self.sql_cache = SqlCache(sql_cache_size)
+
+        self._dialect = executor_dialect(self.executor) if dialect is None else get_dialect(dialect)
 
+        # Results of statements marked by Statement.cache().
+        self.result_cache = ResultCache()
+
+        # Callbacks of every statement sent, see QueryHooks.
+        self.hooks = QueryHooks()
+
+        # With logging, the QueryEvent of every statement sent is appended to logs.
         self.logs = []
         self.logging = False
 
@@ -44,18 +85,178 @@ class Pydoo(object):
 
         self.result_type = Pydoo.ResultType.FETCH_CURSOR_RAW
         self.chunk_size = 100
+        # Callbacks applied to every chunk in order by FETCH_CHUNK, each takes and returns a chunk.
+        self.chunk_transforms = []
+        # Fetch the next chunk in background while the current chunk is processed.
+        self.chunk_prefetch = False
+
+        # IN lists of Statement.where({'col': [...]}) longer than this are split when selecting, by in_list_strategy:
+        # "batch" runs one statement per max_in_values values and merges the results,
+        # "temp_table" inserts the values into a temporary table selected by a subquery (single connection only).
+        self.max_in_values = 10000
+        self.in_list_strategy = "batch"
 
         self.error = None
 
-    def query(self, query: str, args=None):
+    @property
+    def dialect(self) -> Dialect:
+        """
+        SQL syntax statements are compiled to, raw SQL given to query() / execute() is sent as it is.
+        """
+        return self._dialect
+
+    @dialect.setter
+    def dialect(self, dialect: str | Dialect):
+        # Cached SQL was compiled to the previous dialect.
+        self._dialect = get_dialect(dialect)
+        self.sql_cache.clear()
+
+    def _parse(self, cursor):
+        if self.result_type == self.ResultType.FETCH_LAZY:
+            return Result(None, None, lambda: (cursor.description, ResultParser.result_chunk(cursor, self.chunk_size)))
+        if self.result_type == self.ResultType.FETCH_CHUNK:
+            return self.ResultParse[self.result_type](cursor, self.chunk_size, self.chunk_transforms, self.chunk_prefetch)
+        if self.result_type == self.ResultType.FETCH_STREAM:
+            return self.ResultParse[self.result_type](cursor, self.chunk_size)
+        if self.result_type not in self.EagerResultTypes:
+            return self.ResultParse[self.result_type](cursor)
+        try:
+            if self.result_type == self.ResultType.FETCH_COLUMNAR:
+                return self.ResultParse[self.result_type](cursor, self.chunk_size)
+            return self.ResultParse[self.result_type](cursor)
+        finally:
+            cursor.close()
+
+    def _instrumented(self) -> bool:
+        return self.logging or bool(self.hooks)
+
+    def _event(self, kind: str, query: str, args, render_time: float) -> QueryEvent:
+        event = QueryEvent(kind, query, args, self.result_type.name, render_time)
+        if self.logging:
+            self.logs.append(event)
+        return event
+
+    def _parse_timed(self, cursor, event: QueryEvent):
+        # _parse() timing the fetching into event, on_fetch fires once the result is consumed.
+        if self.result_type == self.ResultType.FETCH_CURSOR_RAW:
+            self.hooks.fetched(event, QueryHooks.affected_rows(cursor) if event.kind != "query" else None, 0.0)
+            return cursor
+        if self.result_type == self.ResultType.FETCH_LAZY:
+            return Result(None, None, lambda: (cursor.description, self.hooks.timed_iter(
+                ResultParser.result_chunk(cursor, self.chunk_size), event, True)))
+        if self.result_type not in self.EagerResultTypes:
+            return self.hooks.timed_iter(self._parse(cursor), event, self.result_type == self.ResultType.FETCH_CHUNK)
+        affected = QueryHooks.affected_rows(cursor) if event.kind != "query" else None
+        start = time.perf_counter()
+        try:
+            result = self._parse(cursor)
+        except BaseException as e:
+            self.hooks.failed(event, e, time.perf_counter() - start)
+            raise
+        self.hooks.fetched(event, affected if affected is not None else QueryHooks.row_count(result), time.perf_counter() - start)
+        return result
+
+    def query(self, query: str, args=None, render_time: float = 0.0):
+        """
+        :param render_time: seconds spent rendering the SQL, reported to hooks
+        """
         if self.result_type in (self.ResultType.FETCH_ALL_AS_DICT, ):
-            self.executor.connection().cursorclass = self.executor.connection().DictCursor
-        return self.ResultParse[self.result_type](self.executor.query(query, args))
+            self.executor.use_dict_cursor()
+        if self.result_type == self.ResultType.FETCH_LAZY:
+            # The args of a statement change with it, the Result keeps the args of its SQL.
+            if isinstance(args, (list, dict)):
+                args = args.copy()
+            return Result(query, args, lambda: self._open_lazy(query, args, render_time))
+        stream = self.result_type == self.ResultType.FETCH_STREAM
+        if not self._instrumented():
+            return self._parse(self.executor.query(query, args, stream=stream))
+        event = self._event("query", query, args, render_time)
+        return self._parse_timed(self.hooks.execute(event, self.executor.query, query, args, stream), event)
+
+    def _open_lazy(self, query: str, args, render_time: float) -> tuple:
+        # Run the query of a FETCH_LAZY Result on its first use, return its description and chunks.
+        if not self._instrumented():
+            cursor = self.executor.query(query, args)
+            return cursor.description, ResultParser.result_chunk(cursor, self.chunk_size)
+        event = self._event("query", query, args, render_time)
+        cursor = self.hooks.execute(event, self.executor.query, query, args, False)
+        return cursor.description, self.hooks.timed_iter(ResultParser.result_chunk(cursor, self.chunk_size), event, True)
+
+    def fetch_page(self, query: str, args=None, render_time: float = 0.0) -> tuple[tuple, list]:
+        """
+        Cursor description and all rows of a query whatever result_type is, rows are dicts with FETCH_ALL_AS_DICT.
+        Reported to hooks like query(), used by Statement.seek_iterate().
+        """
+        if self.result_type in (self.ResultType.FETCH_ALL_AS_DICT, ):
+            self.executor.use_dict_cursor()
+        description, chunks = self._open_lazy(query, args, render_time)
+        return description, [row for chunk in chunks for row in chunk]
+
+    def cached_query(self, query: str, args=None, tables: tuple[str, ...] = (), ttl: float | None = None, render_time: float = 0.0,
+                     page: bool = False):
+        """
+        query() through result_cache, writes to `tables` invalidate the cached result.
+        Hits do not reach the database and are not reported to hooks.
+        :param ttl: seconds, default to result_cache.default_ttl
+        :param page: cache fetch_page() instead, the cursor description with the rows
+        """
+        if self.result_type not in self.EagerResultTypes:
+            raise ValueError(f"Result cache needs a fully fetched result type, not {self.result_type.name}")
+        key = self.result_cache.key(f"{self.result_type.name}_PAGE" if page else self.result_type.name, query, args)
+        result = self.result_cache.get(key)
+        if result is not MISS:
+            return result
+        version = self.result_cache.version(tables)
+        result = (self.fetch_page if page else self.query)(query, args, render_time)
+        self.result_cache.set(key, result, ttl, tables, version)
+        return result
 
     def execute(self, query: str, args=None):
         if self.result_type in (self.ResultType.FETCH_ALL_AS_DICT, ):
-            self.executor.connection().cursorclass = self.executor.connection().DictCursor
-        return self.ResultParse[self.result_type](self.executor.execute(query, args))
+            self.executor.use_dict_cursor()
+        if not self._instrumented():
+            result = self._parse(self.executor.execute(query, args))
+        else:
+            event = self._event("execute", query, args, 0.0)
+            result = self._parse_timed(self.hooks.execute(event, self.executor.execute, query, args), event)
+        tables = self.result_cache.write_tables(query)
+        if tables:
+            self._wrote(tables)
+        return result
+
+    def _wrote(self, tables: tuple[str, ...]):
+        # A write to tables was sent: invalidate their cached results and count it in the open transaction.
+        self.result_cache.invalidate(tables)
+        transaction = current(self.executor)
+        if transaction is not None:
+            transaction.wrote(tables)
+
+    def transaction(self, commit_every: int | None = None, commit_interval_ms: float | None = None) -> Transaction:
+        """
+        Transaction context manager, nested ones are savepoints.
+        :param commit_every: commit and begin again after this many write statements
+        :param commit_interval_ms: commit and begin again at the first write after this long, it is checked at writes only,
+            not on a timer, so writes left idle are committed at the next write or when the transaction exits
+        """
+        return Transaction(self, commit_every, commit_interval_ms)
+
+    def execute_cursor(self, query: str, args=None, many: bool = False, render_time: float = 0.0):
+        """
+        Execute a write and return its cursor whatever result_type is, reported to hooks with cursor.rowcount.
+        Used by Statement.insert() / insert_many().
+        :param many: args is a list of parameter rows for executor.execute_many()
+        """
+        run = self.executor.execute_many if many else self.executor.execute
+        if not self._instrumented():
+            return run(query, args)
+        event = QueryEvent("execute_many" if many else "execute", query, args, self.ResultType.FETCH_CURSOR_RAW.name, render_time)
+        if many:
+            event.params = sum(row.__len__() for row in args)
+        if self.logging:
+            self.logs.append(event)
+        cursor = self.hooks.execute(event, run, query, args)
+        self.hooks.fetched(event, QueryHooks.affected_rows(cursor), 0.0)
+        return cursor
 
     def table(self, table: str):
-        return Statement(table, self.executor)
+        return Statement(table, self.executor, self)
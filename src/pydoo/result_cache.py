@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+import abc
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Iterable
+
+# Returned by CacheBackend.get() when the key is not cached.
+MISS = object()
+
+
+class CacheBackend(object, metaclass=abc.ABCMeta):
+    """
+    Store of cached query results, implement it for an external store (Redis, Memcached...).
+    Every entry records the tables it was read from, invalidate() drops the entries of the given tables.
+    """
+
+    @abc.abstractmethod
+    def get(self, key: str):
+        """
+        :return: cached value, or MISS
+        """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def set(self, key: str, value, ttl: float | None, tables: tuple[str, ...]):
+        """
+        :param ttl: seconds to keep the value, None keeps it until evicted or invalidated
+        """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def invalidate(self, tables: Iterable[str]):
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def clear(self):
+        raise NotImplementedError
+
+    def stats(self) -> dict[str, int]:
+        return {}
+
+
+class MemoryCacheBackend(CacheBackend):
+    """
+    In-process LRU with TTL, at most `size` entries.
+    """
+
+    def __init__(self, size: int = 1024):
+        if not isinstance(size, int) or size <= 0:
+            raise ValueError("Cache size must be an integer greater than 0")
+        self.size = size
+        # key -> (expire time or None, value, tables)
+        self.entries: OrderedDict[str, tuple[float | None, object, tuple[str, ...]]] = OrderedDict()
+        # table -> keys of entries read from it
+        self.table_keys: dict[str, set[str]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return self.entries.__len__()
+
+    def _remove(self, key: str):
+        _, _, tables = self.entries.pop(key)
+        for table in tables:
+            keys = self.table_keys.get(table)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self.table_keys[table]
+
+    def get(self, key: str):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return MISS
+            if entry[0] is not None and entry[0] <= time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return MISS
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: str, value, ttl: float | None, tables: tuple[str, ...]):
+        with self.lock:
+            if key in self.entries:
+                self._remove(key)
+            self.entries[key] = (None if ttl is None else time.monotonic() + ttl, value, tables)
+            for table in tables:
+                self.table_keys.setdefault(table, set()).add(key)
+            while self.entries.__len__() > self.size:
+                self._remove(next(iter(self.entries)))
+                self.evictions += 1
+
+    def invalidate(self, tables: Iterable[str]):
+        with self.lock:
+            for table in tables:
+                for key in self.table_keys.pop(table, ()):
+                    if key in self.entries:
+                        self._remove(key)
+                        self.invalidations += 1
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.table_keys.clear()
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "size": self.size,
+            "length": self.entries.__len__(),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
+
+
+class ResultCache(object):
+    """
+    Cache of query results keyed by result type, rendered SQL and bound values, see Statement.cache().
+
+    Only results which are fully fetched (Pydoo.EagerResultTypes) are cached, list results are copied on every hit,
+    rows themselves are shared so they must not be changed.
+    Writes by Statement and Pydoo.execute() invalidate the tables they change,
+    a result fetched while one of its tables was invalidated is not stored.
+    """
+
+    # Table written by Insert / Replace / Update / Delete / Truncate statements.
+    WRITE_TABLE = re.compile(r"^\s*(?:(?:Insert|Replace)(?:\s+(?:Ignore|Low_Priority|Delayed|High_Priority))*\s+Into"
+                             r"|Update(?:\s+(?:Ignore|Low_Priority))*|Delete(?:\s+(?:Ignore|Low_Priority|Quick))*\s+From"
+                             r"|Truncate(?:\s+Table)?)\s+([`\"\[\]\w.]+)", re.IGNORECASE)
+
+    def __init__(self, backend: CacheBackend | None = None, default_ttl: float | None = 60.0):
+        self.backend = backend if backend is not None else MemoryCacheBackend()
+        self.default_ttl = default_ttl
+        # table -> times invalidated, to detect writes racing with a query being cached
+        self.versions: dict[str, int] = {}
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def table_name(table: str) -> str:
+        return table.strip().strip('`"[]')
+
+    @staticmethod
+    def key(result_type: str, sql: str, values) -> str:
+        return f"{result_type}\n{sql}\n{values!r}"
+
+    def version(self, tables: tuple[str, ...]) -> tuple[int, ...]:
+        return tuple(self.versions.get(table, 0) for table in tables)
+
+    def get(self, key: str):
+        value = self.backend.get(key)
+        return list(value) if isinstance(value, list) else value
+
+    def set(self, key: str, value, ttl: float | None, tables: tuple[str, ...], version: tuple[int, ...]):
+        """
+        :param version: ResultCache.version() of the tables taken before the query ran
+        """
+        with self.lock:
+            if self.version(tables) != version:
+                return
+            self.backend.set(key, list(value) if isinstance(value, list) else value, self.default_ttl if ttl is None else ttl, tables)
+
+    def invalidate(self, tables: Iterable[str]):
+        tables = [self.table_name(table) for table in tables]
+        with self.lock:
+            for table in tables:
+                self.versions[table] = self.versions.get(table, 0) + 1
+            self.backend.invalidate(tables)
+
+    def write_tables(self, sql: str) -> tuple[str, ...]:
+        """
+        Table written by a raw SQL statement, none when it is not a write.
+        """
+        match = self.WRITE_TABLE.match(sql)
+        return (self.table_name(match.group(1)),) if match is not None else ()
+
+    def invalidate_sql(self, sql: str):
+        """
+        Invalidate the table written by a raw SQL statement, if it is a write.
+        """
+        tables = self.write_tables(sql)
+        if tables:
+            self.invalidate(tables)
+
+    def clear(self):
+        self.backend.clear()
+
+    def stats(self) -> dict[str, int]:
+        return self.backend.stats()
@@ -1,4 +1,11 @@
 # -*- coding: utf-8 -*-
+import asyncio
+import concurrent.futures
+import inspect
+from typing import Callable, Iterable
+
+from .columnar import ColumnarBuilder
+
 
 class ResultParser(object):
     @staticmethod
@@ -14,5 +21,118 @@ class ResultParser(object):
         return cursor.fetchall()
 
     @staticmethod
-    def result_chunk(cursor, size):
-        return cursor.fetchmany(size=size)
+    def result_chunk(cursor, size, transforms: Iterable[Callable] = (), prefetch: bool = False):
+        """
+        Generator of `fetchmany(size)` chunks, each chunk is passed through `transforms` in order.
+        With prefetch, the next chunk is fetched in a background thread while the current one is processed.
+        The cursor is closed when exhausted or when the generator is closed early.
+        """
+        transforms = tuple(transforms)
+        try:
+            if prefetch:
+                with concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="pydoo-prefetch") as fetcher:
+                    future = fetcher.submit(cursor.fetchmany, size)
+                    while True:
+                        rows = future.result()
+                        if not rows:
+                            break
+                        future = fetcher.submit(cursor.fetchmany, size)
+                        for transform in transforms:
+                            rows = transform(rows)
+                        yield rows
+            else:
+                while True:
+                    rows = cursor.fetchmany(size)
+                    if not rows:
+                        break
+                    for transform in transforms:
+                        rows = transform(rows)
+                    yield rows
+        finally:
+            cursor.close()
+
+    @staticmethod
+    def result_columnar(cursor, size):
+        builder = ColumnarBuilder(cursor.description)
+        while True:
+            rows = cursor.fetchmany(size)
+            if not rows:
+                break
+            builder.add(rows)
+        return builder.build()
+
+    @staticmethod
+    def result_stream(cursor, size):
+        # Rows are fetched `size` at a time, the cursor is closed when exhausted or when the generator is closed early.
+        try:
+            while True:
+                rows = cursor.fetchmany(size)
+                if not rows:
+                    break
+                yield from rows
+        finally:
+            cursor.close()
+
+
+class AsyncResultParser(object):
+    @staticmethod
+    async def result_raw(cursor):
+        return cursor
+
+    @staticmethod
+    async def result_iterate(cursor):
+        return cursor.__aiter__()
+
+    @staticmethod
+    async def result_all(cursor):
+        return await cursor.fetchall()
+
+    @staticmethod
+    async def result_chunk(cursor, size, transforms: Iterable[Callable] = (), prefetch: bool = False):
+        """
+        Async generator of chunks like ResultParser.result_chunk, transforms may return awaitables.
+        With prefetch, fetching the next chunk is scheduled as a task before the current one is yielded.
+        """
+        transforms = tuple(transforms)
+        pending = None
+        try:
+            rows = await cursor.fetchmany(size)
+            while rows:
+                if prefetch:
+                    pending = asyncio.ensure_future(cursor.fetchmany(size))
+                for transform in transforms:
+                    rows = transform(rows)
+                    if inspect.isawaitable(rows):
+                        rows = await rows
+                yield rows
+                if pending is not None:
+                    rows, pending = await pending, None
+                else:
+                    rows = await cursor.fetchmany(size)
+        finally:
+            if pending is not None:
+                # Let the running fetch finish before closing the cursor under it.
+                await asyncio.gather(pending, return_exceptions=True)
+            await cursor.close()
+
+    @staticmethod
+    async def result_columnar(cursor, size):
+        builder = ColumnarBuilder(cursor.description)
+        while True:
+            rows = await cursor.fetchmany(size)
+            if not rows:
+                break
+            builder.add(rows)
+        return builder.build()
+
+    @staticmethod
+    async def result_stream(cursor, size):
+        try:
+            while True:
+                rows = await cursor.fetchmany(size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield row
+        finally:
+            await cursor.close()
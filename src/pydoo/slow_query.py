@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+import datetime
+import json
+import logging
+import logging.handlers
+
+from .exception import PoolTimeoutError
+from .executor import Executor
+from .instrument import QueryEvent
+
+
+class SlowQueryLog(object):
+    """
+    Hook listener writing statements slower than `threshold_ms` as JSON lines to a rotating file,
+    attach it by `doo.hooks.attach(SlowQueryLog(doo.executor, "slow.log"))`.
+
+    Each line has the time, the SQL shape, the SQL rendered with its values by Executor.mogrify(),
+    the render / execute / fetch / total durations in milliseconds, the row count and the error if any.
+    With `explain`, selects are run again as `{explain_prefix} {sql}` and its rows are added,
+    e.g. explain_prefix="Explain Query Plan" for sqlite3.
+    Mogrify and EXPLAIN run on Executor.spare_connection(), they never wait for a pooled connection:
+    when none is idle the SQL is rendered by Executor.render_literals() and EXPLAIN is skipped.
+    FETCH_CURSOR_RAW queries are not explained, their cursor is still open in the caller.
+    The file is rotated at `max_bytes`, keeping `backup_count` old files.
+    """
+
+    def __init__(self, executor: Executor, path: str, threshold_ms: float = 1000.0, explain: bool = False,
+                 explain_prefix: str = "Explain", max_bytes: int = 10 * 1024 * 1024, backup_count: int = 5):
+        if threshold_ms < 0:
+            raise ValueError("threshold_ms must be greater than or equal to 0")
+        self.executor = executor
+        self.threshold_ms = threshold_ms
+        self.explain = explain
+        self.explain_prefix = explain_prefix
+        self.handler = logging.handlers.RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8", delay=True)
+        self.handler.setFormatter(logging.Formatter("%(message)s"))
+        self.logged = 0
+
+    def _render(self, event: QueryEvent) -> str:
+        if event.kind == "execute_many":
+            return event.sql
+        try:
+            with self.executor.spare_connection() as conn:
+                return self.executor._mogrify(conn, event.sql, event.args)
+        except Exception:
+            return Executor.render_literals(event.sql, event.args)
+
+    def _explain(self, event: QueryEvent) -> list[dict]:
+        with self.executor.spare_connection() as conn:
+            cursor = conn.cursor()
+            try:
+                Executor._cursor_execute(cursor, f"{self.explain_prefix} {event.sql}", event.args)
+                names = [column[0] for column in cursor.description or ()]
+                return [dict(zip(names, row)) if not isinstance(row, dict) else row for row in cursor.fetchall()]
+            finally:
+                cursor.close()
+
+    def record(self, event: QueryEvent) -> dict:
+        """
+        JSON line of an event, explained if enabled.
+        """
+        ms = 1000
+        record = {
+            "time": datetime.datetime.now().isoformat(timespec="milliseconds"),
+            "kind": event.kind,
+            "shape": event.sql,
+            "sql": self._render(event),
+            "params": event.params,
+            "duration_ms": round(event.total_time * ms, 3),
+            "render_ms": round(event.render_time * ms, 3),
+            "execute_ms": round(event.execute_time * ms, 3),
+            "fetch_ms": round(event.fetch_time * ms, 3),
+            "rows": event.rows,
+            "error": repr(event.error) if event.error is not None else None,
+        }
+        if self.explain and event.kind == "query" and event.error is None:
+            if event.result_type == "FETCH_CURSOR_RAW":
+                record["explain_skipped"] = "cursor open"
+            else:
+                try:
+                    record["explain"] = self._explain(event)
+                except PoolTimeoutError:
+                    record["explain_skipped"] = "no idle connection"
+                except Exception as e:
+                    record["explain_error"] = repr(e)
+        return record
+
+    def _write(self, event: QueryEvent):
+        if event.total_time * 1000 < self.threshold_ms:
+            return
+        line = json.dumps(self.record(event), ensure_ascii=False, default=str)
+        self.handler.handle(logging.makeLogRecord({"msg": line, "levelno": logging.WARNING, "levelname": "WARNING"}))
+        self.logged += 1
+
+    def on_fetch(self, event: QueryEvent):
+        self._write(event)
+
+    def on_error(self, event: QueryEvent):
+        self._write(event)
+
+    def close(self):
+        self.handler.close()
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+import threading
+from collections import OrderedDict
+from typing import Callable, Hashable
+
+
+class SqlCache(object):
+    """
+    LRU cache of compiled SQL strings keyed by statement shape.
+
+    A statement shape (see Statement.shape()) describes the structure of a query without its bound values,
+    so statements sharing a shape render the same SQL text and only have to rebind Statement.values.
+    Setting size to 0 disables the cache.
+    """
+
+    def __init__(self, size: int = 256):
+        self.size = SqlCache._check_size(size)
+        self.cache: OrderedDict[Hashable, str] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def _check_size(size: int):
+        if not isinstance(size, int):
+            raise ValueError("Cache size must be an integer")
+        if size < 0:
+            raise ValueError("Cache size must be greater than or equal to 0")
+        return size
+
+    def __len__(self):
+        return self.cache.__len__()
+
+    def __contains__(self, key: Hashable):
+        return key in self.cache
+
+    def get(self, key: Hashable) -> str | None:
+        with self.lock:
+            sql = self.cache.get(key)
+            if sql is None:
+                self.misses += 1
+                return None
+            self.cache.move_to_end(key)
+            self.hits += 1
+            return sql
+
+    def put(self, key: Hashable, sql: str):
+        if self.size <= 0:
+            return
+        with self.lock:
+            self.cache[key] = sql
+            self.cache.move_to_end(key)
+            while self.cache.__len__() > self.size:
+                self.cache.popitem(last=False)
+
+    def get_or_render(self, key: Hashable, render: Callable[[], str]) -> str:
+        sql = self.get(key)
+        if sql is None:
+            sql = render()
+            self.put(key, sql)
+        return sql
+
+    def resize(self, size: int):
+        with self.lock:
+            self.size = SqlCache._check_size(size)
+            while self.cache.__len__() > self.size:
+                self.cache.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.cache.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "size": self.size,
+            "length": self.cache.__len__(),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
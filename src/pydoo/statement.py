@@ -1,41 +1,245 @@
 # -*- coding: utf-8 -*-
-from typing import Literal, Union
+import concurrent.futures
+import datetime
+import heapq
+import itertools
+import re
+import time
+from typing import Callable, Iterable, Iterator, Literal, Union, TYPE_CHECKING
 
-from src.pydoo.executor import Executor
+from src.pydoo.columnar import ColumnarBuilder
+from src.pydoo.compiler import SqlCompiler, compact_compiler
+from src.pydoo.dialect import Dialect, executor_dialect
+from src.pydoo.executor import Executor, PooledExecutor
 from src.pydoo.part.field_part import FieldPart
 from src.pydoo.part.from_part import FromPart, From
 from src.pydoo.part.group_by_part import GroupByPart
+from src.pydoo.part.having_part import HavingPart
+from src.pydoo.part.in_list_part import InListPart
 from src.pydoo.part.limit_part import LimitPart
-from src.pydoo.part.order_by_part import OrderByPart
-from src.pydoo.part.select_part import SelectPart
+from src.pydoo.part.order_by_part import OrderBy, OrderByPart
+from src.pydoo.part.part_base import PartBase
+from src.pydoo.part.select_part import Field, SelectPart
 from src.pydoo.part.where_part import WhereAnd, ValueType
+from src.pydoo.writer import BufferedWriter
+
+if TYPE_CHECKING:
+    from src.pydoo.pydoo import Pydoo
 
 
 class Result(object):
-    ...
+    """
+    Lazy result of a query with Pydoo.ResultType.FETCH_LAZY.
+    The SQL is compiled when the Result is made, the query runs on first use: iteration, len(), indexing, first() ...
+    Rows are fetched by chunks as they are consumed and kept, so the Result can be iterated again.
+    The cursor is closed once every row is fetched, or by close() / leaving a with block.
+    """
+
+    def __init__(self, sql: str | None, values: list | None, opener: Callable[[], tuple[tuple | None, Iterator[list]]]):
+        """
+        :param opener: run the query, return the cursor description and a generator of row chunks
+        """
+        self.sql = sql
+        self.values = values
+        self._opener = opener
+        self._description = None
+        self._chunks: Iterator[list] | None = None
+        self._rows = []
+        self._executed = False
+        self._done = False
+
+    def __repr__(self):
+        if not self._executed:
+            state = "pending"
+        else:
+            state = f"{self._rows.__len__()} rows" + ("" if self._done else " fetched")
+        return f"<Result {state}: {self.sql}>"
+
+    @property
+    def executed(self) -> bool:
+        return self._executed
+
+    def _execute(self):
+        if not self._executed:
+            self._description, self._chunks = self._opener()
+            self._executed = True
+
+    def _fetch(self, count: int | None = None):
+        # Fetch chunks until `count` rows are kept, every row when None.
+        self._execute()
+        while not self._done and (count is None or self._rows.__len__() < count):
+            rows = next(self._chunks, None)
+            if rows is None:
+                self._done = True
+                self._chunks = None
+            else:
+                self._rows.extend(rows)
+
+    def close(self):
+        """
+        Stop fetching and close the cursor, rows fetched so far are kept.
+        """
+        if self._chunks is not None:
+            self._chunks.close()
+            self._chunks = None
+        self._done = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __iter__(self):
+        index = 0
+        while True:
+            if index >= self._rows.__len__():
+                self._fetch(index + 1)
+                if index >= self._rows.__len__():
+                    return
+            yield self._rows[index]
+            index += 1
+
+    def __len__(self):
+        self._fetch()
+        return self._rows.__len__()
+
+    def __bool__(self):
+        self._fetch(1)
+        return self._rows.__len__() > 0
+
+    def __getitem__(self, index: int | slice):
+        if isinstance(index, int) and index >= 0:
+            self._fetch(index + 1)
+        else:
+            self._fetch()
+        return self._rows[index]
+
+    @property
+    def description(self) -> tuple | None:
+        """
+        DB-API cursor description, runs the query.
+        """
+        self._execute()
+        return self._description
+
+    @property
+    def columns(self) -> list[str]:
+        """
+        Column names, runs the query.
+        """
+        return [column[0] for column in self.description or ()]
+
+    def first(self):
+        """
+        The first row or None, only the first chunk is fetched.
+        """
+        self._fetch(1)
+        return self._rows[0] if self._rows else None
+
+    def scalar(self):
+        """
+        The first column of the first row or None.
+        """
+        row = self.first()
+        if row is None:
+            return None
+        if isinstance(row, dict):
+            return next(iter(row.values()), None)
+        return row[0]
+
+    def column(self, name: str | int) -> list:
+        """
+        Values of a column by its name or position.
+        """
+        if isinstance(name, str):
+            columns = self.columns
+            if name not in columns:
+                raise ValueError(f"Unknown column: {name}, expect one of {', '.join(columns)}")
+            index = columns.index(name)
+        else:
+            index = name
+        self._fetch()
+        if self._rows and isinstance(self._rows[0], dict):
+            key = name if isinstance(name, str) else self.columns[index]
+            return [row[key] for row in self._rows]
+        return [row[index] for row in self._rows]
+
+    def to_dicts(self) -> list[dict]:
+        """
+        Rows as dicts of column name to value.
+        """
+        columns = self.columns
+        self._fetch()
+        return [dict(row) if isinstance(row, dict) else dict(zip(columns, row)) for row in self._rows]
+
+
+class DescendingKey(object):
+    """
+    Sort key of a descending order column, compares the other way round.
+    """
+    __slots__ = ("value",)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __lt__(self, other):
+        return other.value < self.value
+
+    def __eq__(self, other):
+        return self.value == other.value
+
+
+class ShapeKey(object):
+    """
+    Statement shape with its hash computed once, equal to the shape tuple itself as a cache key.
+    """
+    __slots__ = ("shape", "hash")
+
+    def __init__(self, shape: tuple):
+        self.shape = shape
+        self.hash = hash(shape)
+
+    def __hash__(self):
+        return self.hash
+
+    def __eq__(self, other):
+        if isinstance(other, ShapeKey):
+            return self.hash == other.hash and self.shape == other.shape
+        return self.shape == other
 
 
 class Statement(object):
-    def __init__(self, table: str | None = None, executor: Executor | None = None):
+    def __init__(self, table: str | None = None, executor: Executor | None = None, doo: Union["Pydoo", None] = None):
         self.part = {
             "select": SelectPart(),
             "from": FromPart(),
             "where": WhereAnd(),
             "group": GroupByPart(),
+            "having": HavingPart(),
             "order": OrderByPart(),
             "limit": LimitPart(),
             "lock": "",
         }
         self.values = []
+        # Parts shared copy-on-write with forks (see copy()), part name -> cached shape or None.
+        self._shared: dict[str, tuple | str | None] = {}
+        # Shape key of the frozen Query this statement was forked from, while no part is changed.
+        self._key: ShapeKey | None = None
+        # (ttl, extra tables) set by cache()
+        self._cache: tuple[float | None, tuple[str, ...]] | None = None
         if isinstance(table, str):
             self.part['from'].add_table(table)
-        if isinstance(executor, Executor):
-            self.executor = executor
+        self.executor = executor if isinstance(executor, Executor) else None
+        self.doo = doo
 
     def alias(self, name: str) -> "Statement":
         if self.part['from'].__len__() <= 0:
             raise ValueError('Statement has no table')
-        self.part['from'].set_table_alias(0, name)
+        from_part = self._own('from')
+        # From objects are shared with forks of the statement, alias a copy.
+        from_part.tables[0] = from_part.tables[0].copy()
+        from_part.set_table_alias(0, name)
         return self
 
     def field(self, fields: Union[str, list[str | FieldPart], SelectPart.All], distinct: bool | None = None) -> "Statement":
@@ -53,7 +257,7 @@ class Statement(object):
         :return: Statement
         """
         if isinstance(fields, str):
-            self.part['select'].add_field(fields)
+            self._own('select').add_field(fields)
         elif isinstance(fields, list):
             for field in fields:
                 self.field(field)
@@ -62,25 +266,23 @@ class Statement(object):
         return self
 
     def distinct(self, enable: bool) -> "Statement":
-        self.part['select'].set_distinct(enable)
+        self._own('select').set_distinct(enable)
         return self
 
     def where(self, name: str | WhereAnd | dict[str, ValueType | "Statement" | list] | list[tuple[str, str, ValueType] | tuple[str, ValueType]], op: str | None = None, value: ValueType | None = None) -> "Statement":
         if isinstance(name, str):
             if op is None and value is None:
                 # state.where(condstr: str)
-                self.part['where'].add_exp(name)
+                self._own('where').add_exp(name)
                 return self
             elif isinstance(op, str) and value is None:
                 # state.where(name: str, value: ValueType)
-                # TODO: placeholder every SQL engine
-                self.part['where'].add_exp(f'`{name}` = %s')
+                self._own('where').add_exp(f'`{name}` = %s')
                 self.values.append(op)
                 return self
             elif isinstance(op, str) and isinstance(value, ValueType):
                 # state.where(name: str, op: str, value: ValueType)
-                # TODO: placeholder every SQL engine
-                self.part['where'].add_exp(f'`{name}` {op} %s')
+                self._own('where').add_exp(f'`{name}` {op} %s')
                 self.values.append(value)
                 return self
             else:
@@ -88,24 +290,25 @@ class Statement(object):
         elif isinstance(name, WhereAnd):
             if op is not None or value is not None:
                 raise ValueError(f"Other arguments must be None when type of first argument is 'WhereAnd'")
+            self._own('where')
             self.part['where'] = name
         elif isinstance(name, dict):
             if op is not None or value is not None:
                 raise ValueError(f"Other arguments must be None when type of first argument is 'dict'")
             for key, value in name.items():
                 if isinstance(value, ValueType):
-                    self.part['where'].add_exp(f'`{key}` = %s')
+                    self._own('where').add_exp(f'`{key}` = %s')
                     self.values.append(value)
                     continue
                 elif isinstance(value, Statement):
-                    self.part['where'].add_exp(f'`{key}` in ({value.select()})')
+                    self._own('where').add_exp(f'`{key}` in {self._subquery(value)}')
                     self.values.extend(value.values)
                     continue
                 elif isinstance(value, list):
-                    self.part['where'].add_exp(f'`{key}` in (%s)')
-                    self.values.append(value)
+                    self._own('where').add_exp(InListPart(key, self.values.__len__(), value.__len__()))
+                    self.values.extend(value)
                 elif isinstance(value, str):
-                    self.part['where'].add_exp(f'`{key}` = %s')
+                    self._own('where').add_exp(f'`{key}` = %s')
                     self.values.append(value)
                 else:
                     raise ValueError(f"Invalid where `value` condition: ({type(value)}):{value}. value can only support ValueType, Statement, list(in) and str.")
@@ -135,13 +338,34 @@ class Statement(object):
         else:
             raise ValueError(f"Invalid on statement type: {type(on_statement)}")
         if isinstance(name, str):
-            self.part['from'].add_table(f"{name} {alias}", i_on_statement, join_type)
+            self._own('from').add_table(f"{name} {alias}", i_on_statement, join_type)
         elif isinstance(name, Statement):
-            self.part['from'].add_table(f"({name.select()}) {alias}", i_on_statement, join_type)
+            # Values of the subquery follow those of the tables joined before it and precede those of Where.
+            position = sum(self._placeholder_count(table.table) for table in self.part['from'].tables if isinstance(table, From))
+            self._own('from').add_table(f"{self._subquery(name)} {alias}", i_on_statement, join_type)
+            if name.values:
+                self.values[position:position] = name.values
+                self._shift_in_lists(position, name.values.__len__())
         else:
             raise ValueError(f"Invalid join table type: {type(name)}")
         return self
 
+    def _subquery(self, statement: "Statement") -> str:
+        # Canonical SQL of a subquery in parentheses, translated to the dialect together with this statement.
+        return f"({compact_compiler.compile(statement, self._dialect())})"
+
+    @staticmethod
+    def _placeholder_count(sql: str) -> int:
+        return sum(1 for match in Dialect.TOKEN.finditer(sql) if match.group(0) == '%s')
+
+    def _shift_in_lists(self, position: int, count: int):
+        # IN lists of Where find their values `count` further when values are inserted before them.
+        if not any(type(part) is InListPart and part.offset >= position for part in self.part['where'].parts):
+            return
+        where = self._own('where')
+        where.parts = [InListPart(part.column, part.offset + count, part.count) if type(part) is InListPart and part.offset >= position else part
+                       for part in where.parts]
+
     def inner_join(self, name: Union[str, "Statement"], alias: str, on_statement: str | WhereAnd) -> "Statement":
         return self.x_join(From.JoinType.InnerJoin, name, alias, on_statement)
 
@@ -159,38 +383,137 @@ class Statement(object):
 
     def group_by(self, fields: str | list[str]) -> "Statement":
         if isinstance(fields, str):
-            self.part['group_by'].add_group(fields)
+            self._own('group').add_group(fields)
         elif isinstance(fields, list):
+            group = self._own('group')
             for field in fields:
-                self.part['group_by'].add_group(field)
+                group.add_group(field)
         else:
             raise ValueError(f"Invalid group by field type: {type(fields)}")
         return self
 
     def order_by(self, fields: str, order_type: str = 'asc') -> "Statement":
-        self.part['order_by'].add_order(fields, order_type)
+        self._own('order').add_order(fields, order_type)
         return self
 
     def having(self, cond: str) -> "Statement":
-        self.part['having'].add_exp(cond)
+        self._own('having').add_exp(cond)
         return self
 
     def limit(self, rows: int, offset: int = 0) -> "Statement":
-        self.part['limit'].set_limit(rows)
+        self._own('limit').set_limit(rows)
         if offset > 0:
             self.offset(offset)
         return self
 
     def offset(self, rows: int) -> "Statement":
-        self.part['limit'].set_offset(rows)
+        self._own('limit').set_offset(rows)
         return self
 
     def page(self, page_index: int, page_size: int) -> "Statement":
-        self.part['limit'].set_limit(page_size)
-        self.part['limit'].set_offset((page_index - 1) * page_size)
+        self._own('limit').set_limit(page_size)
+        self._own('limit').set_offset((page_index - 1) * page_size)
+        return self
+
+    @staticmethod
+    def _seek_columns(order_columns: str | list[str]) -> list[str]:
+        columns = [order_columns] if isinstance(order_columns, str) else list(order_columns)
+        if columns.__len__() <= 0 or not all(isinstance(column, str) and column for column in columns):
+            raise ValueError(f"Invalid seek order columns: {order_columns}")
+        return columns
+
+    def _add_seek_condition(self, columns: list[str], last_values: list | tuple, order_type: str):
+        if len(last_values) != columns.__len__():
+            raise ValueError(f"Seek values {last_values} do not match order columns {columns}")
+        op = '<' if order_type.lower() == 'desc' else '>'
+        if columns.__len__() == 1:
+            self._own('where').add_exp(f'`{columns[0]}` {op} %s')
+            self.values.extend(last_values)
+        else:
+            condition, values = self._dialect().row_compare(columns, op, last_values)
+            self._own('where').add_exp(condition)
+            self.values.extend(values)
+
+    def seek_after(self, order_columns: str | list[str], last_values: list | tuple | None, rows: int | None = None, order_type: str = 'asc') -> "Statement":
+        """
+        Keyset (seek) pagination, the next page starts right after the row whose order columns are `last_values`.
+        Generates `Where (a, b) > (%s, %s) Order By a, b Limit rows`, the order columns should be unique together,
+        so the cost of a page does not grow with its depth like `Limit offset, rows`.
+        Engines without row values (SQL Server) get the comparison expanded by Dialect.row_compare().
+        :param order_columns: column or columns of the key, in order
+        :param last_values: key values of the last row of the previous page, None for the first page
+        :param rows: page size
+        :param order_type: 'asc' or 'desc' for all order columns
+        :return: Statement
+        """
+        columns = self._seek_columns(order_columns)
+        if last_values is not None:
+            self._add_seek_condition(columns, last_values, order_type)
+        for column in columns:
+            self._own('order').add_order(column, order_type)
+        if rows is not None:
+            self._own('limit').set_limit(rows)
         return self
 
+    @staticmethod
+    def _key_getter(description: tuple, columns: list[str]):
+        names = [desc[0] for desc in description]
+        indexes = []
+        for column in columns:
+            name = column.rpartition('.')[2]
+            if name not in names:
+                raise ValueError(f"Seek order column '{column}' must be selected")
+            indexes.append(names.index(name))
+        return lambda row: [row[name.rpartition('.')[2]] for name in columns] if isinstance(row, dict) else [row[index] for index in indexes]
+
+    def _seek_base(self, columns: list[str], page_size: int, order_type: str) -> "Statement":
+        # Copy of the statement ordered by the key and limited to a page, the statement itself is not changed.
+        base = self.copy()
+        for column in columns:
+            base._own('order').add_order(column, order_type)
+        base._own('limit').set_limit(page_size)
+        return base
+
+    @staticmethod
+    def _seek_page(base: "Statement", columns: list[str], last_values: list | None, order_type: str) -> "Statement":
+        page = base.copy()
+        if last_values is not None:
+            page._add_seek_condition(columns, last_values, order_type)
+        return page
+
+    def _fetch_page(self, page: "Statement") -> tuple[tuple, list]:
+        # Cursor description and rows of a page, through Pydoo to be reported to its hooks.
+        start = time.perf_counter()
+        sql = page.to_sql()
+        if self.doo is not None:
+            return self.doo.fetch_page(sql, page.values, time.perf_counter() - start)
+        cursor = self._get_executor().query(sql, page.values)
+        try:
+            return cursor.description, cursor.fetchall()
+        finally:
+            cursor.close()
+
+    def seek_iterate(self, order_columns: str | list[str], page_size: int = 1000, order_type: str = 'asc') -> Iterator:
+        """
+        Walk all rows of the statement in key order page by page with seek_after(), one page is held at a time.
+        Pages run on copies, the statement is not changed. The order columns must be selected and unique together.
+        :return: iterator of rows
+        """
+        columns = self._seek_columns(order_columns)
+        base = self._seek_base(columns, page_size, order_type)
+        get_key = None
+        last_values = None
+        while True:
+            description, rows = self._fetch_page(self._seek_page(base, columns, last_values, order_type))
+            if get_key is None:
+                get_key = self._key_getter(description, columns)
+            yield from rows
+            if rows.__len__() < page_size:
+                return
+            last_values = get_key(rows[-1])
+
     def lock(self, b: bool | str) -> "Statement":
+        self._own('lock')
         if isinstance(lock, bool):
             if lock:
                 self.part['lock'] = "for update"
@@ -200,22 +523,726 @@ class Statement(object):
             self.part['lock'] = b
         return self
 
-    def to_sql(self) -> str:
-        # TODO: imp
-        ...
+    def _own(self, name: str):
+        """
+        Part to be changed, a part shared with forks is replaced by a copy first.
+        """
+        part = self.part[name]
+        if name in self._shared:
+            del self._shared[name]
+            self._key = None
+            if isinstance(part, PartBase):
+                part = self.part[name] = part.copy()
+        return part
+
+    def copy(self) -> "Statement":
+        """
+        Fork the statement, the fork can be extended without changing this statement and the other way round.
+        Parts are shared until either side changes them through the building methods, then that side copies the part,
+        so a fork costs a dict of parts and the list of values.
+        Parts changed directly through `Statement.part` are not copied, do not change shared parts that way.
+        :return: Statement of the same class, executor and Pydoo
+        """
+        for name in self.part:
+            self._shared.setdefault(name, None)
+        statement = object.__new__(type(self))
+        statement.__dict__.update(self.__dict__)
+        statement.part = dict(self.part)
+        statement.values = list(self.values)
+        statement._shared = dict(self._shared)
+        return statement
+
+    def freeze(self) -> "Query":
+        """
+        Immutable snapshot of the statement, see Query.
+        """
+        return Query(self)
+
+    @staticmethod
+    def _part_shape(part: PartBase | str) -> tuple | str:
+        return part.shape() if not isinstance(part, str) else part
+
+    def cache(self, ttl: float | None = None, tables: str | list[str] | None = None) -> "Statement":
+        """
+        Cache the result of select() / find() in Pydoo.result_cache, keyed by the SQL and bound values.
+        Writes through Statement or Pydoo.execute() to a table in From invalidate the result.
+        :param ttl: seconds, default to result_cache.default_ttl
+        :param tables: other tables the result depends on, e.g. tables of subqueries
+        :return: Statement
+        """
+        if self.doo is None:
+            raise ValueError("Statement has no Pydoo to cache results")
+        extra = (tables,) if isinstance(tables, str) else tuple(tables or ())
+        self._cache = (ttl, extra)
+        return self
+
+    def _cached_tables(self) -> tuple[str, ...]:
+        tables = []
+        for table in self.part['from'].tables:
+            name = table.get_table() if isinstance(table, From) else str(table)
+            # Subqueries in From are not parsed, their tables are given by cache(tables=...).
+            if not name.startswith('('):
+                tables.append(name)
+        tables.extend(self._cache[1])
+        return tuple(dict.fromkeys(self.doo.result_cache.table_name(table) for table in tables))
+
+    def _invalidate(self, table: str):
+        # Reported to Pydoo, which invalidates the cached results and counts the write in the open transaction.
+        if self.doo is not None:
+            self.doo._wrote((table,))
+
+    def shape(self) -> tuple:
+        """
+        Hashable structure of the statement, bound values excluded.
+        Statements with the same shape render the same SQL, so the shape is the key of the compiled SQL cache.
+        Shapes of shared parts are computed once.
+        """
+        shapes = []
+        for name, part in self.part.items():
+            if name in self._shared:
+                shape = self._shared[name]
+                if shape is None:
+                    shape = self._shared[name] = self._part_shape(part)
+            else:
+                shape = self._part_shape(part)
+            shapes.append((name, shape))
+        return tuple(shapes)
+
+    def to_sql(self, pretty: bool = False) -> str:
+        """
+        Render the select statement, placeholders are left for Statement.values.
+        When the statement belongs to a Pydoo, rendered SQL is looked up in Pydoo.sql_cache by shape first.
+        :param pretty: one line per clause and item, for reading only, it is not cached
+        :return: SQL string
+        """
+        if pretty:
+            dialect = self._dialect()
+            return dialect.translate(SqlCompiler(pretty=True).compile(self, dialect))
+        key = self._key
+        # The shape is only computed to look the SQL up in the cache
+        if key is None and self._sql_cached():
+            key = self.shape()
+        return self._compile(key, self._render)
+
+    def _dialect(self) -> Dialect:
+        # Dialect of the Pydoo, of the executor for statements without one.
+        dialect = getattr(self.doo, "dialect", None)
+        return dialect if isinstance(dialect, Dialect) else executor_dialect(self.executor)
+
+    def _compile(self, key: tuple, render) -> str:
+        """
+        Canonical SQL by render() translated to the dialect, through Pydoo.sql_cache by key.
+        """
+        dialect = self._dialect()
+        if not dialect.native:
+            canonical = render
+            render = lambda: dialect.translate(canonical())
+        if self._sql_cached():
+            return self.doo.sql_cache.get_or_render(key, render)
+        return render()
+
+    def _sql_cached(self) -> bool:
+        return self.doo is not None and self.doo.sql_cache.size > 0
 
-    def select(self, fields: str | list[str] | None = None) -> Result:
+    def _render(self) -> str:
+        return compact_compiler.compile(self, self._dialect())
+
+    def _max_bind_params(self, executor: Executor) -> int:
+        # Bind parameters of one statement, limited by both the executor and the dialect.
+        dialect = self._dialect()
+        return min(getattr(executor, "max_bind_params", dialect.max_bind_params), dialect.max_bind_params)
+
+    def _used_parts(self) -> set[str]:
+        used = set()
+        for name in ("select", "where", "group", "having", "order"):
+            if self.part[name].__len__() > 0:
+                used.add(name)
+        if self.part['from'].__len__() > 1:
+            used.add("join")
+        if self.part['limit']._is_valid():
+            used.add("limit")
+        if self.part['lock']:
+            used.add("lock")
+        return used
+
+    def _get_table(self, action: str, allowed: tuple[str, ...] = ()) -> str:
+        if self.part['from'].__len__() <= 0:
+            raise ValueError('Statement has no table')
+        used = self._used_parts().difference(allowed)
+        if used:
+            raise ValueError(f"{action} statement cannot set {', '.join(sorted(used))}")
+        return self.part['from'].tables[0].get_table()
+
+    def _insert_sql(self, data: dict[str, ValueType]) -> tuple[str, list]:
+        if not isinstance(data, dict) or data.__len__() <= 0:
+            raise ValueError(f"Invalid insert data: {data}, expect a non-empty dict")
+        table = self._get_table("Insert")
+        return self._insert_values_sql(table, tuple(data.keys())), list(data.values())
+
+    def _insert_values_sql(self, table: str, keys: tuple[str, ...], rows: int = 1) -> str:
+        def render():
+            row = "({values})".format(values=', '.join(('%s',) * keys.__len__()))
+            return "Insert Into {table} ({columns}) Values {rows}".format(
+                table=table, columns=', '.join(f'`{key}`' for key in keys), rows=', '.join((row,) * rows))
+        return self._compile(("Insert", table, keys, rows), render)
+
+    @staticmethod
+    def _estimate_size(value) -> int:
+        # Rough size of a literal value in the statement sent to the server.
+        if value is None:
+            return 4
+        if isinstance(value, str):
+            return value.__len__() + 2
+        if isinstance(value, (bytes, bytearray)):
+            return value.__len__() * 2 + 3
+        if isinstance(value, (datetime.date, datetime.datetime)):
+            return 28
+        return str(value).__len__()
+
+    def _insert_batches(self, rows: Iterable[dict[str, ValueType]], batch_size: int, executor: Executor) -> Iterator[tuple[tuple[str, ...], list[list]]]:
+        """
+        Group rows into batches limited by batch_size, the bind parameters (see _max_bind_params()) and executor.max_packet_size.
+        :return: iterator of (column names, list of row values)
+        """
+        if not isinstance(batch_size, int) or batch_size <= 0:
+            raise ValueError("batch_size must be an integer greater than 0")
+        keys = None
+        rows_limit = batch_size
+        batch = []
+        batch_bytes = 0
+        for row in rows:
+            if not isinstance(row, dict) or row.__len__() <= 0:
+                raise ValueError(f"Invalid insert row: {row}, expect a non-empty dict")
+            if keys is None:
+                keys = tuple(row.keys())
+                rows_limit = min(batch_size, max(1, self._max_bind_params(executor) // keys.__len__()))
+            elif row.keys() != set(keys):
+                raise ValueError(f"Insert row columns {tuple(row.keys())} differ from {keys}")
+            values = [row[key] for key in keys]
+            # Values plus ", " and "(...), " separators.
+            row_bytes = sum(map(self._estimate_size, values)) + 2 * keys.__len__() + 4
+            if batch and (batch.__len__() >= rows_limit or batch_bytes + row_bytes > executor.max_packet_size):
+                yield keys, batch
+                batch = []
+                batch_bytes = 0
+            batch.append(values)
+            batch_bytes += row_bytes
+        if batch:
+            yield keys, batch
+
+    def _get_executor(self) -> Executor:
+        executor = self.doo.executor if self.doo is not None else self.executor
+        if executor is None:
+            raise ValueError("Statement has no executor")
+        return executor
+
+    def _set_select_fields(self, fields: str | list[str] | None):
         if fields is not None:
-            self.part['select'].clear_field()
-            self.part['select'].add_field(fields)
-        return self._execute()
+            self._own('select').clear_field()
+            self._own('select').add_field(fields)
+
+    def select(self, fields: str | list[str] | None = None, parallel: int | None = None) -> Result:
+        """
+        :param parallel: split the largest IN list condition into this many chunks and run them concurrently,
+                         over a PooledExecutor, results are merged in Order By order, see Statement._execute_split()
+        """
+        self._set_select_fields(fields)
+        return self._execute(parallel)
 
     def find(self, fields: str | list[str] | None = None) -> Result:
-        if fields is not None:
-            self.part['select'].clear_field()
-            self.part['select'].add_field(fields)
-        self.part['limit'].set_limit(1)
+        self._set_select_fields(fields)
+        self._own('limit').set_limit(1)
         return self._execute()
 
-    def _execute(self) -> Result:
-        ...
+    def insert(self, data: dict[str, ValueType]) -> int:
+        """
+        Insert one row, only the table can be set on the statement.
+        :param data: column name to value
+        :return: affected rows
+        """
+        start = time.perf_counter()
+        sql, values = self._insert_sql(data)
+        return self._write_count(self.part['from'].tables[0].get_table(), sql, values, render_time=time.perf_counter() - start)
+
+    def insert_many(self, rows: Iterable[dict[str, ValueType]], batch_size: int = 1000) -> int:
+        """
+        Insert rows in batches of multi-row `Insert Into ... Values (...), (...)` statements.
+        Batches are also split to stay under the bind parameters limit of the executor and the dialect
+        and executor.max_packet_size, with executor.prefer_executemany every batch is sent by cursor.executemany() instead.
+        All rows must have the same columns, only the table can be set on the statement.
+        :param rows: iterable of dicts, column name to value
+        :param batch_size: max rows in one statement
+        :return: total affected rows
+        """
+        table = self._get_table("Insert")
+        executor = self._get_executor()
+        total = 0
+        for sql, values, many, render_time in self._insert_writes(table, rows, batch_size, executor, executor.prefer_executemany):
+            total += self._write_count(table, sql, values, many, render_time)
+        return total
+
+    def _insert_writes(self, table: str, rows: Iterable[dict[str, ValueType]], batch_size: int, executor,
+                       executemany: bool) -> Iterator[tuple[str, list, bool, float]]:
+        # (sql, values, many, render time) of every batch of insert_many().
+        for keys, batch in self._insert_batches(rows, batch_size, executor):
+            start = time.perf_counter()
+            if executemany:
+                yield self._insert_values_sql(table, keys), batch, True, time.perf_counter() - start
+            else:
+                sql = self._insert_values_sql(table, keys, batch.__len__())
+                yield sql, [value for values in batch for value in values], False, time.perf_counter() - start
+
+    def _write_count(self, table: str, sql: str, values: list, many: bool = False, render_time: float = 0.0) -> int:
+        # Affected rows of a write to table, which is invalidated once the write is sent.
+        cursor = self._write(sql, values, many, render_time)
+        try:
+            return cursor.rowcount
+        finally:
+            cursor.close()
+            self._invalidate(table)
+
+    # Upsert and update by key
+
+    # `col+=` style update columns, see update()
+    UPDATE_OP = re.compile(r"^(\w+)\s*([-+*/%])=$")
+
+    @classmethod
+    def _update_columns(cls, update: Iterable[str], columns: tuple[str, ...]) -> tuple[tuple[str, str], ...]:
+        # (column, operator) of the update columns, operator "" sets the new value.
+        parsed = []
+        for item in update:
+            match = cls.UPDATE_OP.match(item.strip())
+            column, op = (match.group(1), match.group(2)) if match is not None else (item.strip(), "")
+            if column not in columns:
+                raise ValueError(f"Update column {column} is not a column of the rows {columns}")
+            parsed.append((column, op))
+        return tuple(parsed)
+
+    def _upsert_sql(self, table: str, columns: tuple[str, ...], keys: tuple[str, ...], update: tuple[tuple[str, str], ...],
+                    rows: int) -> str:
+        dialect = self._dialect()
+        return self._compile(("Upsert", table, columns, keys, update, rows), lambda: dialect.upsert(table, columns, keys, update, rows))
+
+    def upsert_many(self, rows: Iterable[dict[str, ValueType]], keys: str | list[str], update: list[str] | None = None,
+                    batch_size: int = 1000) -> int:
+        """
+        Insert rows, updating the existing rows with the same unique key instead, in batches like insert_many().
+        Rendered by the dialect: `Insert ... On Duplicate Key Update` on MySQL, `Insert ... On Conflict (keys) Do Update`
+        on sqlite and PostgreSQL, `Merge Into` on SQL Server. All rows must have the same columns, only the table can be set on the statement.
+        :param keys: columns of the primary or unique key the rows conflict on
+        :param update: columns to update on conflict, `col+=` adds the new value (also -=, *=, /=, %=),
+                       default to all the columns except keys, an empty list keeps the existing rows
+        :return: total affected rows, MySQL counts an updated row as 2
+        """
+        table = self._get_table("Upsert")
+        total = 0
+        for sql, values, many, render_time in self._upsert_writes(table, rows, keys, update, batch_size, self._get_executor()):
+            total += self._write_count(table, sql, values, many, render_time)
+        return total
+
+    def _upsert_writes(self, table: str, rows: Iterable[dict[str, ValueType]], keys: str | list[str], update: list[str] | None,
+                       batch_size: int, executor) -> Iterator[tuple[str, list, bool, float]]:
+        # (sql, values, many, render time) of every batch of upsert_many().
+        keys = (keys,) if isinstance(keys, str) else tuple(keys)
+        if not keys:
+            raise ValueError("Upsert needs the key columns")
+        for columns, batch in self._insert_batches(rows, batch_size, executor):
+            missing = set(keys).difference(columns)
+            if missing:
+                raise ValueError(f"Upsert key columns {', '.join(sorted(missing))} are not in the rows")
+            parsed = self._update_columns([column for column in columns if column not in keys] if update is None else update, columns)
+            start = time.perf_counter()
+            sql = self._upsert_sql(table, columns, keys, parsed, batch.__len__())
+            yield sql, [value for values in batch for value in values], False, time.perf_counter() - start
+
+    def _update_by_key_sql(self, table: str, columns: tuple[str, ...], keys: tuple[str, ...], rows: int) -> str:
+        row_values = self._dialect().row_values
+
+        def render():
+            if keys.__len__() == 1:
+                case = f"Case `{keys[0]}`" + " When %s Then %s" * rows
+                where = f"`{keys[0]}` In ({InListPart.placeholders(rows)})"
+            else:
+                match = ' And '.join(f'`{key}` = %s' for key in keys)
+                case = "Case" + f" When {match} Then %s" * rows
+                if row_values:
+                    row = f"({InListPart.placeholders(keys.__len__())})"
+                    where = f"({', '.join(f'`{key}`' for key in keys)}) In ({', '.join((row,) * rows)})"
+                else:
+                    where = ' Or '.join((f"({match})",) * rows)
+            assignments = ', '.join(f"`{column}` = {case} Else `{column}` End" for column in columns)
+            return f"Update {table} Set {assignments} Where {where}"
+        return self._compile(("UpdateByKey", table, columns, keys, rows), render)
+
+    def update_many_by_key(self, rows: Iterable[dict[str, ValueType]], key: str | list[str], batch_size: int = 500) -> int:
+        """
+        Update rows with different values each, found by the key columns, in batches of one statement:
+        Update t Set `a` = Case `id` When %s Then %s ... Else `a` End, ... Where `id` In (%s, ...)
+        Batches are also split to stay under the bind parameters limit and executor.max_packet_size.
+        All rows must have the same columns, only the table can be set on the statement.
+        :param rows: iterable of dicts, the key columns and the columns to set
+        :param key: column or columns identifying a row, a row matching no row of the table is ignored
+        :param batch_size: max rows in one statement
+        :return: total affected rows
+        """
+        table = self._get_table("Update")
+        total = 0
+        for sql, values, many, render_time in self._update_by_key_writes(table, rows, key, batch_size, self._get_executor()):
+            total += self._write_count(table, sql, values, many, render_time)
+        return total
+
+    def _update_by_key_writes(self, table: str, rows: Iterable[dict[str, ValueType]], key: str | list[str], batch_size: int,
+                              executor) -> Iterator[tuple[str, list, bool, float]]:
+        # (sql, values, many, render time) of every statement of update_many_by_key().
+        keys = (key,) if isinstance(key, str) else tuple(key)
+        if not keys:
+            raise ValueError("Update by key needs the key columns")
+        for columns, batch in self._insert_batches(rows, batch_size, executor):
+            missing = set(keys).difference(columns)
+            if missing:
+                raise ValueError(f"Update key columns {', '.join(sorted(missing))} are not in the rows")
+            positions = [columns.index(key) for key in keys]
+            updates = [index for index, column in enumerate(columns) if column not in keys]
+            if not updates:
+                raise ValueError("Update by key rows have no column to set")
+            # Every row takes its keys once per set column and once more in the Where, batches are cut again by that.
+            size = max(1, self._max_bind_params(executor) // ((keys.__len__() + 1) * updates.__len__() + keys.__len__()))
+            for start in range(0, batch.__len__(), size):
+                chunk = batch[start:start + size]
+                values = []
+                for index in updates:
+                    for row in chunk:
+                        values.extend(row[position] for position in positions)
+                        values.append(row[index])
+                values.extend(row[position] for row in chunk for position in positions)
+                render_start = time.perf_counter()
+                sql = self._update_by_key_sql(table, tuple(columns[index] for index in updates), keys, chunk.__len__())
+                yield sql, values, False, time.perf_counter() - render_start
+
+    def writer(self, max_rows: int = 1000, max_latency_ms: float = 1000.0, max_pending: int | None = None,
+               block_timeout: float | None = None, batch_size: int = 1000, on_error=None) -> BufferedWriter:
+        """
+        Write-behind buffer inserting its rows by insert_many() from a background thread, see BufferedWriter.
+        Only the table can be set on the statement, the executor must be usable from another thread.
+        :param max_rows: flush when this many rows are buffered
+        :param max_latency_ms: flush when the oldest buffered row has waited this long
+        :param max_pending: write() blocks when this many rows are not inserted yet, default to 10 * max_rows
+        """
+        self._get_table("Insert")
+        return BufferedWriter(self, max_rows, max_latency_ms, max_pending, block_timeout, batch_size, on_error)
+
+    def _write(self, sql: str, values: list, many: bool = False, render_time: float = 0.0):
+        # Cursor of a write, through Pydoo to be reported to its hooks.
+        if self.doo is not None:
+            return self.doo.execute_cursor(sql, values, many, render_time)
+        executor = self._get_executor()
+        return executor.execute_many(sql, values) if many else executor.execute(sql, values)
+
+    def _run(self) -> Result:
+        start = time.perf_counter()
+        sql = self.to_sql()
+        render_time = time.perf_counter() - start
+        if self.doo is not None and self._cache is not None:
+            return self.doo.cached_query(sql, self.values, self._cached_tables(), self._cache[0], render_time)
+        if self.doo is not None:
+            return self.doo.query(sql, self.values, render_time)
+        return self._get_executor().query(sql, self.values)
+
+    def _execute(self, parallel: int | None = None) -> Result:
+        in_list = self._in_list_to_split(parallel)
+        if in_list is not None:
+            return self._execute_split(in_list, parallel)
+        return self._run()
+
+    # Large IN lists
+
+    # Temporary table holding the values of an IN list with Pydoo.in_list_strategy "temp_table".
+    IN_LIST_TABLE = "pydoo_in_list"
+
+    ALIAS = re.compile(r"\s+as\s+`?(\w+)`?\s*$", re.IGNORECASE)
+
+    def _in_list_limit(self, in_list: InListPart) -> int:
+        # Values of the IN list one statement can take, the other values of the statement take bind parameters too.
+        limit = self.doo.max_in_values
+        limit = min(limit, self._max_bind_params(self._get_executor()) - (self.values.__len__() - in_list.count))
+        if limit <= 0:
+            raise ValueError("No bind parameters left for the IN list, raise Pydoo.max_in_values or executor.max_bind_params")
+        return limit
+
+    def _in_list_to_split(self, parallel: int | None = None) -> InListPart | None:
+        """
+        The largest IN list condition of the top level Where, when it is over the limit of one statement
+        (see Pydoo.max_in_values) or the statement is to be run in parallel chunks.
+        """
+        if parallel is not None and (not isinstance(parallel, int) or parallel <= 0):
+            raise ValueError("parallel must be an integer greater than 0")
+        if self.doo is None or type(self.part['where']) is not WhereAnd:
+            return None
+        largest = None
+        for part in self.part['where'].parts:
+            if type(part) is InListPart and (largest is None or part.count > largest.count):
+                largest = part
+        if largest is None or largest.count <= 1 or (not parallel and largest.count <= self._in_list_limit(largest)):
+            return None
+        return largest
+
+    def _in_list_values(self, in_list: InListPart) -> list:
+        # IN is a set, duplicated values are sent once.
+        return list(dict.fromkeys(self.values[in_list.offset:in_list.offset + in_list.count]))
+
+    def _replace_in_list(self, in_list: InListPart, condition: FieldPart, values: list) -> "Statement":
+        statement = self.copy()
+        where = statement._own('where')
+        where.parts[where.parts.index(in_list)] = condition
+        statement.values[in_list.offset:in_list.offset + in_list.count] = values
+        return statement
+
+    def _split_in_list(self, in_list: InListPart, chunks: int | None = None) -> list["Statement"]:
+        """
+        Statements taking the values of the IN list in chunks, rows of every value are selected by exactly one of them.
+        A Limit is applied again to the merged rows, so every chunk selects the first offset + limit rows.
+        Offsets of the other IN lists are not updated in the chunks, they are not split again.
+        :param chunks: number of chunks, default to as few as the limit of one statement allows
+        """
+        used = self._used_parts().intersection(("group", "having"))
+        if self.part['select'].distinct:
+            used.add("distinct")
+        if used:
+            raise ValueError(f"IN list of {in_list.count} values cannot be split in a statement with {', '.join(sorted(used))}")
+        values = self._in_list_values(in_list)
+        limit = self._in_list_limit(in_list)
+        size = limit if chunks is None else min(limit, max(1, -(-values.__len__() // chunks)))
+        statements = []
+        for start in range(0, values.__len__(), size):
+            chunk = values[start:start + size]
+            if start > 0 and chunk.__len__() < size:
+                # Padded by its last value, so every chunk renders the same SQL.
+                chunk.extend(chunk[-1:] * (size - chunk.__len__()))
+            statement = self._replace_in_list(in_list, in_list.resized(chunk.__len__()), chunk)
+            if self.part['limit']._is_valid() and self.part['limit'].offset > 0:
+                statement._own('limit').set_limit(self.part['limit'].limit + self.part['limit'].offset)
+                statement._own('limit').set_offset(0)
+            statements.append(statement)
+        return statements
+
+    @classmethod
+    def _result_name(cls, field: str | FieldPart) -> str:
+        # Column name of a selected field or order expression in result rows, `t`.`col` AS `name` -> name.
+        if isinstance(field, Field) and field.alias:
+            return field.alias
+        expression = field.expression if isinstance(field, FieldPart) else str(field)
+        alias = cls.ALIAS.search(expression)
+        if alias is not None:
+            return alias.group(1)
+        return expression.strip().rpartition('.')[2].strip('`')
+
+    def _order_key(self, row, description: tuple | None = None) -> Callable | None:
+        """
+        Sort key of result rows by the Order By of the statement, NULL first as MySQL and sqlite do.
+        Tuple rows are matched to the order columns by the names of the cursor description.
+        """
+        orders = [order for order in self.part['order'].parts if isinstance(order, OrderBy)]
+        if not orders:
+            return None
+        if isinstance(row, dict):
+            getters = [self._result_name(order) for order in orders]
+        else:
+            names = [column[0] for column in description or ()]
+            getters = []
+            for order in orders:
+                name = self._result_name(order)
+                if name not in names:
+                    raise ValueError(f"Order column '{order.expression}' must be selected to merge split results")
+                getters.append(names.index(name))
+        descending = [order.order == OrderBy.OrderEnum.DESC for order in orders]
+
+        def key(row):
+            keys = []
+            for getter, desc in zip(getters, descending):
+                value = row[getter]
+                value = (0,) if value is None else (1, value)
+                keys.append(DescendingKey(value) if desc else value)
+            return keys
+        return key
+
+    def _merge(self, results: list, description: tuple | None = None) -> Result:
+        """
+        Fully fetched results of chunks, lists of rows or FETCH_COLUMNAR dicts of columns,
+        k-way merged by the Order By of the statement and cut by its Limit.
+        :param description: cursor description of the chunks, needed to merge tuple rows in order
+        """
+        limit = self.part['limit']
+        if results and isinstance(results[0], dict):
+            if self.part['order'].__len__() > 0:
+                raise ValueError("Columnar results of split statements cannot be merged in order")
+            merged = ColumnarBuilder.concat(results)
+            if limit._is_valid():
+                merged = {name: column[limit.offset:limit.offset + limit.limit] for name, column in merged.items()}
+            return merged
+        sample = next((result[0] for result in results if result), None)
+        key = self._order_key(sample, description) if sample is not None else None
+        if key is not None:
+            merged = list(heapq.merge(*results, key=key))
+        else:
+            merged = []
+            for result in results:
+                merged.extend(result)
+        if limit._is_valid():
+            merged = merged[limit.offset:limit.offset + limit.limit]
+        return merged
+
+    def _chain(self, statements: list["Statement"]) -> Iterator:
+        # Lazy results of chunks one after another, a chunk is queried when the previous one is exhausted.
+        return self._limit_rows(itertools.chain.from_iterable(statement._run() for statement in statements))
+
+    def _limit_rows(self, rows: Iterator) -> Iterator:
+        limit = self.part['limit']
+        if limit._is_valid():
+            return itertools.islice(rows, limit.offset, limit.offset + limit.limit)
+        return rows
+
+    def _open_chain(self, statements: list["Statement"]) -> tuple[tuple | None, Iterator[list]]:
+        # Description and chunks of a FETCH_LAZY split IN list, the Result of a chunk runs when the previous one is exhausted.
+        results = [statement._run() for statement in statements]
+        rows = self._limit_rows(itertools.chain.from_iterable(results))
+
+        def chunks():
+            try:
+                while True:
+                    chunk = list(itertools.islice(rows, self.doo.chunk_size))
+                    if not chunk:
+                        break
+                    yield chunk
+            finally:
+                for result in results:
+                    result.close()
+        return results[0].description, chunks()
+
+    def _run_page(self) -> tuple[tuple | None, list]:
+        # Cursor description and rows of a chunk merged in order, through result_cache when cache() is set.
+        start = time.perf_counter()
+        sql = self.to_sql()
+        render_time = time.perf_counter() - start
+        if self._cache is not None:
+            return self.doo.cached_query(sql, self.values, self._cached_tables(), self._cache[0], render_time, page=True)
+        return self.doo.fetch_page(sql, self.values, render_time)
+
+    def _run_chunks(self, statements: list["Statement"], parallel: int | None, run: Callable = None) -> list:
+        # Single connection executors are not thread safe, their chunks run one after another.
+        run = Statement._run if run is None else run
+        if parallel is None or parallel <= 1 or statements.__len__() <= 1 or not isinstance(self._get_executor(), PooledExecutor):
+            return [run(statement) for statement in statements]
+        with concurrent.futures.ThreadPoolExecutor(max_workers=min(parallel, statements.__len__()), thread_name_prefix="pydoo-fanout") as threads:
+            return list(threads.map(run, statements))
+
+    def _ordered_merge(self) -> bool:
+        # Chunks merged in order need their cursor description, columnar results are refused by _merge().
+        return self.part['order'].__len__() > 0 and self.doo.result_type != self.doo.ResultType.FETCH_COLUMNAR
+
+    def _execute_split(self, in_list: InListPart, parallel: int | None = None) -> Result:
+        """
+        Run the statement in chunks of the values of an IN list and merge the results.
+        Fully fetched result types are merged in Order By order and cut by Limit,
+        lazy result types are chained one chunk after another and cannot be ordered.
+        """
+        if self.doo.result_type == self.doo.ResultType.FETCH_CURSOR_RAW:
+            raise ValueError("Split IN list needs a result type other than FETCH_CURSOR_RAW")
+        if self.doo.in_list_strategy == "temp_table" and not parallel:
+            return self._execute_temp_table(in_list)
+        if self.doo.in_list_strategy not in ("batch", "temp_table"):
+            raise ValueError(f"Unknown IN list strategy: {self.doo.in_list_strategy}")
+        statements = self._split_in_list(in_list, parallel)
+        if self.doo.result_type in self.doo.EagerResultTypes:
+            if self._ordered_merge():
+                pages = self._run_chunks(statements, parallel, Statement._run_page)
+                return self._merge([rows for _, rows in pages], pages[0][0])
+            return self._merge(self._run_chunks(statements, parallel))
+        self._check_lazy_split()
+        if self.doo.result_type == self.doo.ResultType.FETCH_LAZY:
+            return Result(None, None, lambda: self._open_chain(statements))
+        return self._chain(statements)
+
+    def _check_lazy_split(self):
+        if self.part['order'].__len__() > 0:
+            raise ValueError(f"Split IN list with Order By needs a fully fetched result type, not {self.doo.result_type.name}")
+        if self.part['limit']._is_valid() and self.doo.result_type == self.doo.ResultType.FETCH_CHUNK:
+            raise ValueError("Split IN list with Limit cannot be fetched by chunks")
+
+    @staticmethod
+    def _temp_column_type(values: list) -> str:
+        if all(type(value) is int for value in values):
+            return "BigInt"
+        if all(isinstance(value, (int, float)) and not isinstance(value, bool) for value in values):
+            return "Double"
+        if all(isinstance(value, datetime.datetime) for value in values):
+            return "DateTime"
+        if all(isinstance(value, datetime.date) for value in values):
+            return "Date"
+        return f"Varchar({max(max(str(value).__len__() for value in values), 1)})"
+
+    def _execute_temp_table(self, in_list: InListPart) -> Result:
+        """
+        Insert the values of the IN list into a temporary table and select with `col In (Select v From table)`.
+        The temporary table lives in the connection, so a single connection Executor is needed.
+        """
+        if isinstance(self._get_executor(), PooledExecutor):
+            raise ValueError("Temporary table IN lists need a single connection Executor, not PooledExecutor")
+        if self.doo.result_type not in self.doo.EagerResultTypes:
+            raise ValueError(f"Temporary table IN lists need a fully fetched result type, not {self.doo.result_type.name}")
+        values = self._in_list_values(in_list)
+        table = self.IN_LIST_TABLE
+        self.doo.execute_cursor(f"Create Temporary Table {table} (v {self._temp_column_type(values)})").close()
+        try:
+            sql = self._dialect().translate(f"Insert Into {table} (v) Values (%s)")
+            self.doo.execute_cursor(sql, [(value,) for value in values], many=True).close()
+            condition = FieldPart()
+            condition.set_expression(f"`{in_list.column}` In (Select v From {table})")
+            return self._replace_in_list(in_list, condition, [])._run()
+        finally:
+            self.doo.execute_cursor(f"Drop Table {table}").close()
+
+
+class Query(object):
+    """
+    Immutable, hashable snapshot of a Statement, made by Statement.freeze().
+
+    A prebuilt base query is frozen once and forked per request, forks share its parts copy-on-write
+    and reuse its precomputed shape key for the SQL cache until they are changed.
+    Queries are equal when their shapes and values are equal, the hash is that of the shape.
+    """
+    __slots__ = ("_statement", "key", "values")
+
+    def __init__(self, statement: Statement):
+        base = statement.copy()
+        key = ShapeKey(base.shape())
+        base._key = key
+        object.__setattr__(self, "_statement", base)
+        object.__setattr__(self, "key", key)
+        object.__setattr__(self, "values", tuple(base.values))
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    @property
+    def shape(self) -> tuple:
+        return self.key.shape
+
+    def __hash__(self):
+        return self.key.hash
+
+    def __eq__(self, other):
+        if not isinstance(other, Query):
+            return NotImplemented
+        return self.key == other.key and self.values == other.values
+
+    def fork(self) -> Statement:
+        """
+        Statement starting from this query, to be extended and executed.
+        """
+        return self._statement.copy()
+
+    def to_sql(self) -> str:
+        return self._statement.to_sql()
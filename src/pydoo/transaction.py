@@ -0,0 +1,240 @@
+# -*- coding: utf-8 -*-
+import contextlib
+import contextvars
+import time
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .async_pydoo import AsyncPydoo
+    from .pydoo import Pydoo
+
+# Open transactions of the running thread or task, innermost last.
+_transactions: contextvars.ContextVar[tuple["TransactionBase", ...]] = contextvars.ContextVar("pydoo_transactions", default=())
+
+
+def current(executor) -> "TransactionBase | None":
+    """
+    Innermost transaction open on the executor in the running thread or task.
+    """
+    for transaction in reversed(_transactions.get()):
+        if transaction.executor is executor:
+            return transaction
+    return None
+
+
+class TransactionBase(object):
+    """
+    State shared by Transaction and AsyncTransaction.
+
+    The outermost transaction of an executor begins and commits, nested ones are savepoints of it.
+    With `commit_every` or `commit_interval_ms`, the outermost transaction is a batch: it commits and begins again
+    after that many write statements or at the first write after the interval has passed, so writes share fewer commits.
+    The interval is checked only when a write is counted, there is no timer: an idle batch is not committed before
+    its next write or the end of the transaction.
+    A batch commits only while no savepoint is open, and an error rolls back the writes since its last commit only.
+    Tables written in the transaction are invalidated in Pydoo.result_cache again when it ends.
+    """
+
+    def __init__(self, doo: "Pydoo | AsyncPydoo", commit_every: int | None = None, commit_interval_ms: float | None = None):
+        if commit_every is not None and (not isinstance(commit_every, int) or commit_every <= 0):
+            raise ValueError("commit_every must be an integer greater than 0")
+        if commit_interval_ms is not None and commit_interval_ms <= 0:
+            raise ValueError("commit_interval_ms must be greater than 0")
+        self.doo = doo
+        self.executor = doo.executor
+        self.commit_every = commit_every
+        self.commit_interval = None if commit_interval_ms is None else commit_interval_ms / 1000
+        self.parent: TransactionBase | None = None
+        self.savepoint: str | None = None
+        self.token: contextvars.Token | None = None
+        # Tables written since the last commit
+        self.tables: set[str] = set()
+        # Write statements since the last commit, and when it was made
+        self.writes = 0
+        self.started = 0.0
+        self.commits = 0
+
+    @property
+    def batched(self) -> bool:
+        return self.commit_every is not None or self.commit_interval is not None
+
+    def _enter(self) -> bool:
+        """
+        :return: True when this is the outermost transaction
+        """
+        if self.token is not None:
+            raise ValueError("Transaction is already open")
+        self.parent = current(self.executor)
+        if self.parent is not None:
+            if self.batched:
+                raise ValueError("Only the outermost transaction can commit in batches")
+            self.savepoint = f"pydoo_sp_{sum(1 for transaction in _transactions.get() if transaction.executor is self.executor)}"
+        self.started = time.monotonic()
+        self.token = _transactions.set(_transactions.get() + (self,))
+        return self.parent is None
+
+    def _exit(self):
+        _transactions.reset(self.token)
+        self.token = None
+
+    def _due(self) -> bool:
+        # A batch commits when it is the innermost transaction, not inside a savepoint.
+        if not self.batched or _transactions.get()[-1] is not self:
+            return False
+        return ((self.commit_every is not None and self.writes >= self.commit_every)
+                or (self.commit_interval is not None and time.monotonic() - self.started >= self.commit_interval))
+
+    def _wrote(self, tables: tuple[str, ...]):
+        self.tables.update(tables)
+        root = self
+        while root.parent is not None:
+            root.parent.tables.update(tables)
+            root = root.parent
+        root.writes += 1
+
+    def _ended(self):
+        # Results read in the transaction may hold its uncommitted or rolled back writes.
+        if self.tables:
+            self.doo.result_cache.invalidate(self.tables)
+            self.tables = set()
+        self.writes = 0
+        self.started = time.monotonic()
+
+
+class Transaction(TransactionBase):
+    """
+    Transaction of Pydoo.transaction(), commits when the block exits normally and rolls back on exceptions.
+
+        with doo.transaction():
+            doo.table("orders").insert({...})
+            with doo.transaction():         # savepoint
+                ...
+
+    A single connection Executor is shared by all threads, statements of other threads join the transaction,
+    a PooledExecutor pins a connection to the thread for it.
+    """
+
+    def __enter__(self) -> "Transaction":
+        if self._enter():
+            try:
+                self.executor.begin()
+            except BaseException:
+                self._exit()
+                raise
+        else:
+            self.executor.savepoint(self.savepoint)
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        try:
+            if exc_type is None:
+                try:
+                    self._commit()
+                except BaseException:
+                    # The transaction or savepoint is still open after a failed commit, the error of the commit is raised.
+                    with contextlib.suppress(Exception):
+                        self._rollback()
+                    raise
+            else:
+                self._rollback()
+        finally:
+            self._exit()
+            self._ended()
+        return False
+
+    def _commit(self):
+        if self.parent is None:
+            self.executor.commit()
+            self.commits += 1
+        else:
+            self.executor.release_savepoint(self.savepoint)
+
+    def _rollback(self):
+        if self.parent is None:
+            self.executor.rollback()
+        else:
+            self.executor.rollback_to_savepoint(self.savepoint)
+            self.executor.release_savepoint(self.savepoint)
+
+    def flush(self):
+        """
+        Commit the writes so far and go on in a new transaction, only the outermost transaction can.
+        """
+        if self.parent is not None or _transactions.get()[-1] is not self:
+            raise ValueError("Only the outermost transaction can be flushed, not a savepoint or while one is open")
+        self.executor.commit()
+        self.commits += 1
+        self._ended()
+        self.executor.begin()
+
+    def wrote(self, tables: tuple[str, ...] = ()):
+        """
+        Count one write statement, called by Pydoo, a due batch is committed.
+        """
+        self._wrote(tables)
+        root = self
+        while root.parent is not None:
+            root = root.parent
+        if root._due():
+            root.flush()
+
+
+class AsyncTransaction(TransactionBase):
+    """
+    Transaction of AsyncPydoo.transaction(), used by `async with`, see Transaction.
+    The executor must have a single connection, statements of other tasks on it join the transaction.
+    """
+
+    async def __aenter__(self) -> "AsyncTransaction":
+        if self._enter():
+            try:
+                await self.executor.begin()
+            except BaseException:
+                self._exit()
+                raise
+        else:
+            await self.executor.savepoint(self.savepoint)
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        try:
+            if exc_type is None:
+                try:
+                    if self.parent is None:
+                        await self.executor.commit()
+                        self.commits += 1
+                    else:
+                        await self.executor.release_savepoint(self.savepoint)
+                except BaseException:
+                    with contextlib.suppress(Exception):
+                        await self._rollback()
+                    raise
+            else:
+                await self._rollback()
+        finally:
+            self._exit()
+            self._ended()
+        return False
+
+    async def _rollback(self):
+        if self.parent is None:
+            await self.executor.rollback()
+        else:
+            await self.executor.rollback_to_savepoint(self.savepoint)
+            await self.executor.release_savepoint(self.savepoint)
+
+    async def flush(self):
+        if self.parent is not None or _transactions.get()[-1] is not self:
+            raise ValueError("Only the outermost transaction can be flushed, not a savepoint or while one is open")
+        await self.executor.commit()
+        self.commits += 1
+        self._ended()
+        await self.executor.begin()
+
+    async def wrote(self, tables: tuple[str, ...] = ()):
+        self._wrote(tables)
+        root = self
+        while root.parent is not None:
+            root = root.parent
+        if root._due():
+            await root.flush()
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+import functools
+from typing import NamedTuple
+
+from .lex import Lex
+from .parser import Parser
+from .table_lex import TableLex
+
+
+class ParsedKey(NamedTuple):
+    """
+    Immutable result of Lex.key_op_depart() and Parser.op_analysis() of one condition key.
+    """
+    key: str
+    parts: tuple[str, ...]
+    packed: tuple[str, ...]
+    remark: Parser.Remark
+
+
+class KeyParser(object):
+    """
+    Memoized Lex + Parser of condition keys like `'name?^'` or `'col/FROM_UNIXTIME/DATE'`.
+
+    Applications use a small fixed set of keys, so each key is parsed once and kept in a bounded
+    functools.lru_cache, ParsedKey is immutable so the cached result can be shared.
+    Invalid keys raise ValueError as Lex and Parser do, and are not cached.
+    Setting size to 0 disables the cache.
+    :param lexer: Lex or TableLex, both give the same tokens
+    """
+
+    def __init__(self, size: int = 1024, lexer: type[Lex] | type[TableLex] = TableLex):
+        self.lexer = lexer
+        self.resize(size)
+
+    def _parse(self, key: str) -> ParsedKey:
+        parts = self.lexer(key).key_op_depart()
+        parser = Parser.parse(parts)
+        return ParsedKey(key, tuple(parts), tuple(parser.get_packed()), parser.get_remark())
+
+    def parse(self, key: str) -> ParsedKey:
+        if not isinstance(key, str):
+            raise ValueError(f"Condition key must be a string, got {type(key).__name__}")
+        return self.cached(key)
+
+    def resize(self, size: int):
+        """
+        Bound the cache to size keys, the keys parsed so far are dropped.
+        """
+        if not isinstance(size, int):
+            raise ValueError("Cache size must be an integer")
+        if size < 0:
+            raise ValueError("Cache size must be greater than or equal to 0")
+        self.cached = functools.lru_cache(maxsize=size)(self._parse)
+
+    def clear(self):
+        self.cached.cache_clear()
+
+    def stats(self) -> dict[str, int]:
+        info = self.cached.cache_info()
+        return {
+            "size": info.maxsize,
+            "length": info.currsize,
+            "hits": info.hits,
+            "misses": info.misses,
+        }
+
+
+key_parser = KeyParser()
+
+
+def parse_key(key: str) -> ParsedKey:
+    """
+    Parse a condition key by the shared KeyParser.
+    """
+    return key_parser.parse(key)
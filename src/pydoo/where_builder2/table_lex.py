@@ -0,0 +1,159 @@
+# -*-  coding: utf-8 -*-
+
+import re
+
+from .lex import Lex
+
+
+def _flat_op_tree(tree: dict, prefix: str = "", table: dict | None = None) -> dict[str, bool]:
+    # symbol prefix -> whether the prefix itself is a complete symbol
+    table = {prefix: False} if table is None else table
+    for char, node in tree.items():
+        if not char:
+            continue
+        if isinstance(node, dict):
+            table[prefix + char] = bool(node.get('', False))
+            _flat_op_tree(node, prefix + char, table)
+        else:
+            table[prefix + char] = bool(node)
+    return table
+
+
+class TableLex(object):
+    """
+    Lexer of condition keys giving the same tokens and errors as Lex.key_op_depart().
+    It works on the string by index, runs of characters are matched by precompiled regular expressions
+    and symbols are looked up in a flat table of Lex.OP_TREE prefixes.
+    """
+
+    SYM_TABLE = _flat_op_tree(Lex.OP_TREE)
+
+    SPACES = re.compile(r'\s*')
+    VAR = re.compile(r'\w*')
+    SEN = re.compile(r'[\w ]*')
+    EXP_HEAD = re.compile(r'\w')
+    EXP_BODY = re.compile(r'[\w\'"%\-*&^+)]*')
+
+    def __init__(self, key_op_str: str):
+        self.key_op_str = key_op_str
+        self.pos = 0
+
+    def _skip_spaces(self):
+        self.pos = self.SPACES.match(self.key_op_str, self.pos).end()
+
+    def _get_to_close_symbol(self, sym: tuple[str, str] = ("{", "}")):
+        if sym.__len__() < 2:
+            raise ValueError("Invalid symbol, expect tuple[begin_str, end_str]")
+        s = self.key_op_str
+        begin = pos = self.pos
+        stack = 0
+        while True:
+            close = s.find(sym[1], pos)
+            if close < 0:
+                self.pos = s.__len__()
+                return s[begin:]
+            opened = s.count(sym[0], pos, close)
+            if stack + opened <= 0:
+                self.pos = close + 1
+                return s[begin:self.pos]
+            stack += opened - 1
+            pos = close + 1
+
+    def _get_var(self):
+        self._skip_spaces()
+        m = self.VAR.match(self.key_op_str, self.pos)
+        self.pos = m.end()
+        return m.group()
+
+    def _get_sen(self):
+        self._skip_spaces()
+        m = self.SEN.match(self.key_op_str, self.pos)
+        self.pos = m.end()
+        return m.group().strip()
+
+    def _get_exp(self):
+        self._skip_spaces()
+        s = self.key_op_str
+        if not self.EXP_HEAD.match(s, self.pos):
+            return ""
+        buf = [s[self.pos]]
+        self.pos += 1
+        while True:
+            m = self.EXP_BODY.match(s, self.pos)
+            buf.append(m.group())
+            self.pos = m.end()
+            if self.pos < s.__len__() and s[self.pos] == '(':
+                self.pos += 1
+                buf.append('(')
+                buf.append(self._get_to_close_symbol(('(', ')')))
+            else:
+                return ''.join(buf)
+
+    def _get_sym(self):
+        self._skip_spaces()
+        s = self.key_op_str
+        table = self.SYM_TABLE
+        begin = pos = self.pos
+        while pos < s.__len__():
+            char = s[pos]
+            if s[begin:pos + 1] in table:
+                pos += 1
+            elif char.isspace() or char.isalnum():
+                self.pos = pos
+                sym = s[begin:pos]
+                if table[sym] or not sym:
+                    return sym
+                raise ValueError(f"{sym} is not a valid symbol")
+            else:
+                raise ValueError(f"{s[begin:pos + 1]} is not a valid symbol")
+        self.pos = pos
+        return s[begin:pos]
+
+    def key_op_depart(self):
+        # Same states and transitions as Lex.key_op_depart()
+        syms = []
+        sym = self._get_sym()
+        if sym:
+            status = 'SYM'
+        else:
+            sym = self._get_var()
+            if not sym:
+                raise ValueError(f"Invalid condition: {self.key_op_str}")
+            status = 'VAR'
+        syms.append(sym)
+
+        while True:
+            if status == 'VAR' or status == 'EXP':
+                sym = self._get_sym()
+                if sym:
+                    status = 'SYM'
+                    syms.append(sym)
+                elif status == 'VAR':
+                    break
+                else:
+                    status = 'SEN'
+            elif status == 'SEN':
+                self._skip_spaces()
+                if self.pos != self.key_op_str.__len__():
+                    raise ValueError(f"Invalid condition: {self.key_op_str} tell: {self.pos} len: {self.key_op_str.__len__()}")
+                break
+            else:
+                sym = syms[-1]
+                if sym == ',' or sym == '->' or sym == '#':
+                    sym = self._get_sen()
+                elif sym == '|':
+                    sym = self._get_var()
+                elif sym == '/':
+                    sym = self._get_exp()
+                    status = 'EXP'
+                elif sym == '{':
+                    sym = self._get_to_close_symbol()
+                else:
+                    status = 'SEN'
+                    continue
+                if not sym:
+                    raise ValueError(f"Invalid condition: {self.key_op_str}")
+                syms.append(sym)
+                if status != 'EXP':
+                    status = 'VAR' if syms[-2] == '|' else 'SEN'
+        return syms
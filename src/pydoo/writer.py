@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+import atexit
+import threading
+import time
+from typing import Callable, TYPE_CHECKING
+
+from .exception import WriterClosedError, WriterFullError
+from .part.where_part import ValueType
+
+if TYPE_CHECKING:
+    from .statement import Statement
+
+
+class BufferedWriter(object):
+    """
+    Write-behind buffer of Statement.writer(), rows are inserted by Statement.insert_many() from a background thread.
+
+    Rows given to write() are buffered and flushed when `max_rows` of them are buffered,
+    or when the oldest one has waited `max_latency_ms`. A flush inserts all buffered rows in batches of `batch_size`.
+    When `max_pending` rows are buffered or being inserted, write() blocks until a flush frees room,
+    `block_timeout` seconds at most (None waits forever), then raises WriterFullError.
+    An error of a flush is passed to `on_error` with the rows left uninserted from the failed batch on, or raised by
+    the next write(), flush() or close() when there is no `on_error`, those rows are dropped either way.
+    close() flushes the remaining rows and is also called at interpreter exit.
+    """
+
+    def __init__(self, statement: "Statement", max_rows: int = 1000, max_latency_ms: float = 1000.0,
+                 max_pending: int | None = None, block_timeout: float | None = None, batch_size: int = 1000,
+                 on_error: Callable[[BaseException, list[dict[str, ValueType]]], None] | None = None):
+        if not isinstance(max_rows, int) or max_rows <= 0:
+            raise ValueError("max_rows must be an integer greater than 0")
+        if max_latency_ms <= 0:
+            raise ValueError("max_latency_ms must be greater than 0")
+        max_pending = max_rows * 10 if max_pending is None else max_pending
+        if not isinstance(max_pending, int) or max_pending < max_rows:
+            raise ValueError("max_pending must be an integer greater than or equal to max_rows")
+
+        self.statement = statement
+        self.max_rows = max_rows
+        self.max_latency = max_latency_ms / 1000
+        self.max_pending = max_pending
+        self.block_timeout = block_timeout
+        self.batch_size = batch_size
+        self.on_error = on_error
+
+        # Rows waiting for a flush, and when the first of them was written
+        self.buffer: list[dict[str, ValueType]] = []
+        self.buffered_since = 0.0
+        # Rows buffered or being inserted
+        self.pending = 0
+        self.flushing = False
+        self.closed = False
+        self.error: BaseException | None = None
+
+        self.rows = 0
+        self.flushes = 0
+        self.errors = 0
+
+        self.cond = threading.Condition()
+        self.thread = threading.Thread(target=self._loop, name="pydoo-writer", daemon=True)
+        self.thread.start()
+        atexit.register(self.close)
+
+    def __enter__(self) -> "BufferedWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __len__(self):
+        return self.pending
+
+    def _raise_error(self):
+        if self.error is not None:
+            error, self.error = self.error, None
+            raise error
+
+    def write(self, row: dict[str, ValueType]):
+        """
+        Buffer one row, column name to value, all rows must have the same columns.
+        """
+        if not isinstance(row, dict) or row.__len__() <= 0:
+            raise ValueError(f"Invalid insert row: {row}, expect a non-empty dict")
+        with self.cond:
+            self._raise_error()
+            if self.closed:
+                raise WriterClosedError("Writer is closed")
+            if self.pending >= self.max_pending:
+                # Back-pressure, wait for the background thread to insert the buffered rows
+                self.flushing = True
+                self.cond.notify_all()
+                if not self.cond.wait_for(lambda: self.pending < self.max_pending or self.closed, self.block_timeout):
+                    raise WriterFullError(f"{self.pending} rows are pending for {self.block_timeout} seconds")
+                self._raise_error()
+                if self.closed:
+                    raise WriterClosedError("Writer is closed")
+            if not self.buffer:
+                self.buffered_since = time.monotonic()
+                self.cond.notify_all()
+            self.buffer.append(row)
+            self.pending += 1
+            if self.buffer.__len__() >= self.max_rows:
+                self.cond.notify_all()
+
+    def write_many(self, rows):
+        for row in rows:
+            self.write(row)
+
+    def flush(self):
+        """
+        Insert the buffered rows now and wait for them.
+        """
+        with self.cond:
+            self.flushing = True
+            self.cond.notify_all()
+            self.cond.wait_for(lambda: self.pending <= 0 or not self.thread.is_alive())
+            self._raise_error()
+
+    def close(self):
+        """
+        Flush the buffered rows and stop the background thread, writing is refused afterwards.
+        """
+        with self.cond:
+            if self.closed:
+                self._raise_error()
+                return
+            self.closed = True
+            self.cond.notify_all()
+        self.thread.join()
+        atexit.unregister(self.close)
+        with self.cond:
+            self._raise_error()
+
+    def _due(self) -> bool:
+        return (self.closed or self.flushing or self.buffer.__len__() >= self.max_rows
+                or (self.buffer.__len__() > 0 and time.monotonic() - self.buffered_since >= self.max_latency))
+
+    def _timeout(self) -> float | None:
+        # Until the oldest buffered row is due, or until a row is written
+        if not self.buffer:
+            return None
+        return max(0.0, self.buffered_since + self.max_latency - time.monotonic())
+
+    def _loop(self):
+        while True:
+            with self.cond:
+                while not self._due():
+                    self.cond.wait(self._timeout())
+                rows, self.buffer = self.buffer, []
+                self.flushing = False
+                if not rows and self.closed:
+                    return
+            if rows:
+                self._insert(rows)
+
+    def _insert(self, rows: list[dict[str, ValueType]]):
+        inserted = 0
+        try:
+            for start in range(0, rows.__len__(), self.batch_size):
+                inserted = start
+                self.statement.insert_many(rows[start:start + self.batch_size], self.batch_size)
+            inserted = rows.__len__()
+        except BaseException as e:
+            with self.cond:
+                self.errors += 1
+            if self.on_error is not None:
+                try:
+                    self.on_error(e, rows[inserted:])
+                except BaseException:
+                    pass
+            else:
+                with self.cond:
+                    self.error = e
+        finally:
+            with self.cond:
+                self.rows += inserted
+                self.flushes += 1
+                self.pending -= rows.__len__()
+                self.cond.notify_all()
+
+    def stats(self) -> dict:
+        with self.cond:
+            return {
+                "pending": self.pending,
+                "rows": self.rows,
+                "flushes": self.flushes,
+                "errors": self.errors,
+            }
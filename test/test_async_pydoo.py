@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest.mock import Mock
+
+from src.pydoo.api.sqlite_api import SQLiteConnection
+from src.pydoo.async_executor import NativeAsyncExecutor, ThreadedAsyncExecutor, AsyncExecutor
+from src.pydoo.async_pydoo import AsyncPydoo
+from src.pydoo.async_statement import AsyncStatement
+from src.pydoo.executor import Executor, PooledExecutor
+from src.pydoo.pool import ConnectionPool
+
+
+class FakeNativeCursor(object):
+    """aiosqlite style cursor over sqlite3, every method is a coroutine."""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.cursor = conn.cursor()
+
+    @property
+    def rowcount(self):
+        return self.cursor.rowcount
+
+    @property
+    def description(self):
+        return self.cursor.description
+
+    async def execute(self, sql, parameters=None):
+        await asyncio.sleep(0)
+        self.cursor.execute(sql, parameters or ())
+
+    async def fetchone(self):
+        return self.cursor.fetchone()
+
+    async def fetchmany(self, size):
+        return self.cursor.fetchmany(size)
+
+    async def fetchall(self):
+        return self.cursor.fetchall()
+
+    async def close(self):
+        self.cursor.close()
+
+
+class FakeNativeConnection(object):
+    def __init__(self):
+        self.conn = sqlite3.connect(":memory:")
+
+    async def cursor(self):
+        return FakeNativeCursor(self.conn)
+
+    async def close(self):
+        self.conn.close()
+
+
+class TestAsyncPydoo(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        fd, self.path = tempfile.mkstemp(suffix=".sqlite3")
+        os.close(fd)
+        pool = ConnectionPool(lambda: SQLiteConnection.connect(self.path), min_size=1, max_size=4)
+        self.doo = AsyncPydoo(PooledExecutor(pool))
+        await (await self.doo.executor.execute("Create Table t (id Integer Primary Key, name Text)")).close()
+        for name in ("a", "b", "c"):
+            await (await self.doo.executor.execute("Insert Into t (name) Values (?)", [name])).close()
+
+    async def asyncTearDown(self):
+        await self.doo.close()
+        os.remove(self.path)
+
+    async def test_blocking_executor_is_offloaded(self):
+        self.assertIsInstance(self.doo.executor, ThreadedAsyncExecutor)
+        self.assertEqual(self.doo.executor.max_concurrency, 4)
+
+    async def test_query_fetch_all(self):
+        self.doo.result_type = AsyncPydoo.ResultType.FETCH_ALL
+        self.assertEqual(await self.doo.query("Select name From t Order By id"), [("a",), ("b",), ("c",)])
+
+    async def test_async_iteration_closes_cursor(self):
+        self.doo.result_type = AsyncPydoo.ResultType.FETCH_ITERATE
+        rows = [row async for row in await self.doo.query("Select name From t Order By id")]
+        self.assertEqual(rows, [("a",), ("b",), ("c",)])
+        self.assertEqual(self.doo.executor.executor.pool.stats()["in_use"], 0)
+
+    async def test_statement_select_and_find(self):
+        self.doo.result_type = AsyncPydoo.ResultType.FETCH_ALL
+        statement = self.doo.table("t")
+        self.assertIsInstance(statement, AsyncStatement)
+        self.assertEqual(await statement.where("id > 1").select("name"), [("b",), ("c",)])
+        self.assertEqual(await self.doo.table("t").find("name"), [("a",)])
+
+    async def test_insert_many(self):
+        self.doo.result_type = AsyncPydoo.ResultType.FETCH_ALL
+        self.doo.logging = True
+        # 2 columns a row, batches of 2 rows
+        self.doo.executor.max_bind_params = 4
+        self.assertEqual(await self.doo.table("t").insert_many({"id": index, "name": f"n{index}"} for index in range(4, 9)), 5)
+        self.assertEqual([event.params for event in self.doo.logs], [4, 4, 2])
+        self.assertEqual(await self.doo.query("Select count(*) From t"), [(8,)])
+
+    async def test_upsert_and_update_by_key(self):
+        self.doo.result_type = AsyncPydoo.ResultType.FETCH_ALL
+        await self.doo.table("t").upsert_many([{"id": 1, "name": "A"}, {"id": 4, "name": "d"}], keys="id")
+        self.assertEqual(await self.doo.table("t").update_many_by_key([{"id": 2, "name": "B"}, {"id": 9, "name": "z"}], key="id"), 1)
+        self.assertEqual(await self.doo.query("Select name From t Order By id"), [("A",), ("B",), ("c",), ("d",)])
+
+    async def test_fetch_all_as_dict(self):
+        self.doo.result_type = AsyncPydoo.ResultType.FETCH_ALL_AS_DICT
+        self.assertEqual(await self.doo.query("Select id, name From t Where id = 1"), [{"id": 1, "name": "a"}])
+        self.assertEqual(await self.doo.table("t").where("id > 2").select("name"), [{"name": "c"}])
+        description, rows = await self.doo.fetch_page("Select name From t Where id = 2")
+        self.assertEqual(rows, [{"name": "b"}])
+
+    async def test_gather_is_bounded(self):
+        self.doo.result_type = AsyncPydoo.ResultType.FETCH_ALL
+        results = await asyncio.gather(*(self.doo.query("Select count(*) From t") for _ in range(20)))
+        self.assertEqual(results, [[(3,)]] * 20)
+
+
+class TestAsyncStatementInsert(unittest.IsolatedAsyncioTestCase):
+    async def test_insert_uses_shared_builder(self):
+        cursor = Mock(rowcount=1)
+        cursor.close = Mock(side_effect=lambda: asyncio.sleep(0))
+        executor = Mock(spec=AsyncExecutor)
+        executor.execute = Mock(side_effect=lambda sql, args: asyncio.sleep(0, cursor))
+        doo = AsyncPydoo(executor)
+        self.assertEqual(await doo.table("t").insert({"id": 1, "name": "a"}), 1)
+        executor.execute.assert_called_once_with("Insert Into t (`id`, `name`) Values (%s, %s)", [1, "a"])
+
+    async def test_insert_refuses_where(self):
+        doo = AsyncPydoo(Mock(spec=AsyncExecutor))
+        with self.assertRaises(ValueError):
+            await doo.table("t").where("id = 1").insert({"id": 1})
+
+
+class TestNativeAsyncExecutor(unittest.IsolatedAsyncioTestCase):
+    async def test_native_driver(self):
+        doo = AsyncPydoo(NativeAsyncExecutor(FakeNativeConnection()))
+        doo.result_type = AsyncPydoo.ResultType.FETCH_ALL
+        await doo.execute("Create Table t (id Integer)")
+        await doo.execute("Insert Into t (id) Values (?), (?)", [1, 2])
+        self.assertEqual(await doo.table("t").select("id"), [(1,), (2,)])
+
+        doo.result_type = AsyncPydoo.ResultType.FETCH_ITERATE
+        self.assertEqual([row async for row in await doo.query("Select id From t")], [(1,), (2,)])
+        await doo.close()
+
+    async def test_native_fetch_all_as_dict(self):
+        doo = AsyncPydoo(NativeAsyncExecutor(FakeNativeConnection()))
+        doo.result_type = AsyncPydoo.ResultType.FETCH_ALL_AS_DICT
+        await doo.execute("Create Table t (id Integer, name Text)")
+        await doo.execute("Insert Into t (id, name) Values (?, ?), (?, ?)", [1, "a", 2, "b"])
+        self.assertEqual(await doo.table("t").select("id, name"), [{"id": 1, "name": "a"}, {"id": 2, "name": "b"}])
+        self.assertEqual((await doo.fetch_page("Select id From t Where id = 2"))[1], [{"id": 2}])
+        doo.result_type = AsyncPydoo.ResultType.FETCH_ITERATE
+        self.assertEqual([row async for row in await doo.query("Select name From t")], [{"name": "a"}, {"name": "b"}])
+        await doo.close()
+
+    async def test_statements_are_serialized_on_one_connection(self):
+        doo = AsyncPydoo(NativeAsyncExecutor(FakeNativeConnection()))
+        first = await doo.query("Select 1")
+        second = asyncio.ensure_future(doo.query("Select 2"))
+        await asyncio.sleep(0.01)
+        self.assertFalse(second.done())
+        await first.close()
+        await (await second).close()
+        await doo.close()
+
+
+class TestThreadedAsyncExecutor(unittest.TestCase):
+    def test_single_connection_defaults_to_one(self):
+        executor = ThreadedAsyncExecutor(Executor(SQLiteConnection.connect()))
+        self.assertEqual(executor.max_concurrency, 1)
+        asyncio.run(executor.close())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import threading
+import time
+import unittest
+from unittest.mock import Mock
+
+from src.pydoo.api.sqlite_api import SQLiteConnection
+from src.pydoo.async_pydoo import AsyncPydoo
+from src.pydoo.executor import Executor
+from src.pydoo.pydoo import Pydoo
+from src.pydoo.result_parser import ResultParser
+
+
+class RecordingCursor(object):
+    def __init__(self, total):
+        self.total = total
+        self.position = 0
+        self.fetch_threads = []
+        self.closed = False
+
+    def fetchmany(self, size):
+        self.fetch_threads.append(threading.current_thread())
+        rows = [(i,) for i in range(self.position, min(self.position + size, self.total))]
+        self.position += rows.__len__()
+        return rows
+
+    def close(self):
+        self.closed = True
+
+
+class TestChunk(unittest.TestCase):
+    def setUp(self):
+        self.doo = Pydoo(SQLiteConnection.connect())
+        self.doo.executor.execute("Create Table t (id Integer)").close()
+        self.doo.executor.execute("Insert Into t (id) Values " + ", ".join(f"({i})" for i in range(7))).close()
+        self.doo.result_type = Pydoo.ResultType.FETCH_CHUNK
+        self.doo.chunk_size = 3
+
+    def test_chunks_use_pydoo_chunk_size(self):
+        chunks = list(self.doo.query("Select id From t Order By id"))
+        self.assertEqual(chunks, [[(0,), (1,), (2,)], [(3,), (4,), (5,)], [(6,)]])
+
+    def test_transforms_are_applied_in_order(self):
+        self.doo.chunk_transforms = [lambda rows: [row[0] for row in rows], sum]
+        self.assertEqual(list(self.doo.query("Select id From t Order By id")), [3, 12, 6])
+
+    def test_prefetch_fetches_in_background(self):
+        self.doo.chunk_prefetch = True
+        chunks = list(self.doo.query("Select id From t Order By id"))
+        self.assertEqual([len(chunk) for chunk in chunks], [3, 3, 1])
+
+    def test_prefetch_overlaps_next_fetch(self):
+        cursor = RecordingCursor(6)
+        chunks = ResultParser.result_chunk(cursor, 2, prefetch=True)
+        self.assertEqual(next(chunks), [(0,), (1,)])
+        # The second chunk is fetched before the first one is consumed.
+        deadline = time.monotonic() + 1
+        while cursor.position < 4 and time.monotonic() < deadline:
+            time.sleep(0.001)
+        self.assertEqual(cursor.position, 4)
+        self.assertNotIn(threading.current_thread(), cursor.fetch_threads)
+        chunks.close()
+        self.assertTrue(cursor.closed)
+
+    def test_early_close_closes_cursor(self):
+        cursor = RecordingCursor(6)
+        chunks = ResultParser.result_chunk(cursor, 2)
+        next(chunks)
+        chunks.close()
+        self.assertTrue(cursor.closed)
+        self.assertEqual(cursor.position, 2)
+
+
+class TestAsyncChunk(unittest.IsolatedAsyncioTestCase):
+    async def test_async_chunks_with_prefetch_and_transforms(self):
+        doo = AsyncPydoo(Executor(SQLiteConnection.connect()))
+        await (await doo.execute("Create Table t (id Integer)")).close()
+        await (await doo.execute("Insert Into t (id) Values (1), (2), (3)")).close()
+        doo.result_type = AsyncPydoo.ResultType.FETCH_CHUNK
+        doo.chunk_size = 2
+        doo.chunk_prefetch = True
+
+        async def total(rows):
+            return sum(row[0] for row in rows)
+
+        doo.chunk_transforms = [total]
+        self.assertEqual([chunk async for chunk in await doo.query("Select id From t Order By id")], [3, 3])
+        await doo.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+import datetime
+import decimal
+import importlib.util
+import unittest
+
+from src.pydoo.api.sqlite_api import SQLiteConnection
+from src.pydoo.pydoo import Pydoo
+
+HAS_NUMPY = importlib.util.find_spec("numpy") is not None
+
+
+@unittest.skipUnless(HAS_NUMPY, "numpy is not installed")
+class TestColumnarBuilder(unittest.TestCase):
+    def builder(self, description):
+        from src.pydoo.columnar import ColumnarBuilder
+        return ColumnarBuilder(description, capacity=2)
+
+    def test_mysql_type_codes(self):
+        import numpy
+        builder = self.builder((("id", 8), ("price", 246), ("at", 12), ("day", 10), ("name", 253)))
+        at = datetime.datetime(2024, 1, 2, 3, 4, 5)
+        builder.add([(1, decimal.Decimal("1.5"), at, at.date(), "a"), (2, decimal.Decimal("2.5"), None, None, "b")])
+        builder.add([(3, decimal.Decimal("3.5"), at, at.date(), None)])
+        result = builder.build()
+        self.assertEqual(result["id"].dtype, numpy.int64)
+        self.assertEqual(result["id"].tolist(), [1, 2, 3])
+        self.assertEqual(result["price"].dtype, numpy.float64)
+        self.assertEqual(result["at"].dtype, numpy.dtype("datetime64[us]"))
+        self.assertTrue(numpy.isnat(result["at"][1]))
+        self.assertEqual(result["day"].dtype, numpy.dtype("datetime64[D]"))
+        self.assertEqual(result["name"].dtype, object)
+        self.assertEqual(result["name"].tolist(), ["a", "b", None])
+
+    def test_int_with_null_becomes_float(self):
+        import numpy
+        builder = self.builder((("n", 3),))
+        builder.add([(1,), (2,)])
+        builder.add([(None,)])
+        column = builder.build()["n"]
+        self.assertEqual(column.dtype, numpy.float64)
+        self.assertTrue(numpy.isnan(column[2]))
+
+    def test_inferred_types_fall_back_to_object(self):
+        builder = self.builder((("v", None),))
+        builder.add([(1,), (2,)])
+        builder.add([("x",)])
+        column = builder.build()["v"]
+        self.assertEqual(column.dtype, object)
+        self.assertEqual(column.tolist(), [1, 2, "x"])
+
+    def test_leading_nulls_are_resolved_later(self):
+        import numpy
+        builder = self.builder((("v", None),))
+        builder.add([(None,)])
+        builder.add([(1.5,)])
+        column = builder.build()["v"]
+        self.assertEqual(column.dtype, numpy.float64)
+        self.assertTrue(numpy.isnan(column[0]))
+
+    def test_dict_rows_and_empty_result(self):
+        builder = self.builder((("a", 3), ("b", None)))
+        result = builder.build()
+        self.assertEqual(result["a"].__len__(), 0)
+        builder.add([{"a": 1, "b": "x"}])
+        self.assertEqual(builder.build()["b"].tolist(), ["x"])
+
+
+@unittest.skipUnless(HAS_NUMPY, "numpy is not installed")
+class TestFetchColumnar(unittest.TestCase):
+    def test_query_returns_columns(self):
+        import numpy
+        doo = Pydoo(SQLiteConnection.connect())
+        doo.executor.execute("Create Table t (id Integer, score Real, name Text)").close()
+        doo.executor.execute("Insert Into t Values " + ", ".join(f"({i}, {i / 2}, 'n{i}')" for i in range(250))).close()
+        doo.result_type = Pydoo.ResultType.FETCH_COLUMNAR
+        doo.chunk_size = 64
+        result = doo.query("Select id, score, name From t Order By id")
+        self.assertEqual(list(result), ["id", "score", "name"])
+        self.assertEqual(result["id"].dtype, numpy.int64)
+        self.assertEqual(result["id"].tolist(), list(range(250)))
+        self.assertAlmostEqual(float(result["score"].sum()), sum(i / 2 for i in range(250)))
+        self.assertEqual(result["name"][249], "n249")
+
+
+if __name__ == "__main__":
+    unittest.main()
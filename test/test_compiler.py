@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+import random
+import unittest
+
+from src.pydoo.compiler import SqlCompiler
+from src.pydoo.part.where_part import WhereAnd, WhereOr
+from src.pydoo.statement import Statement
+
+
+def render_by_parts(statement: Statement) -> str:
+    # Rendering by the to_sql() of every part, the compact compiler must give the same SQL.
+    part = statement.part
+    strings = []
+    if part['select'].__len__() > 0:
+        strings.append(part['select'].to_sql())
+    else:
+        strings.append("Select Distinct *" if part['select'].distinct else "Select *")
+    if part['from'].__len__() > 0:
+        strings.append(part['from'].to_sql("From"))
+    if part['where'].__len__() > 0:
+        strings.append(part['where'].to_sql("Where"))
+    if part['group'].__len__() > 0:
+        strings.append(part['group'].to_sql("Group By"))
+    if part['having'].__len__() > 0:
+        strings.append(part['having'].to_sql())
+    if part['order'].__len__() > 0:
+        strings.append(part['order'].to_sql("Order By", indent=0))
+    if part['limit']._is_valid():
+        strings.append(part['limit'].to_sql("Limit"))
+    if part['lock']:
+        strings.append(part['lock'])
+    return ' '.join(strings)
+
+
+class TestSqlCompiler(unittest.TestCase):
+    def statement(self) -> Statement:
+        on = WhereAnd()
+        on.add_exp("o.uid = u.id")
+        either = WhereOr()
+        either.add_exp("o.state = 1")
+        either.add_exp("o.state = 2")
+        on.add_exp(either)
+        stmt = Statement("users u").field(["u.id", "u.name"]).inner_join("orders", "o", on).left_join("tags", "t", "t.uid = u.id")
+        stmt.where("name", "bob").where("age", ">", 18)
+        stmt.group_by("u.id").having("Count(o.id) > 1")
+        stmt.order_by("u.id", "desc")
+        return stmt.limit(10, 20)
+
+    def test_compact(self):
+        stmt = self.statement()
+        sql = ("Select u.id, u.name From users u Inner Join orders o On o.uid = u.id And ( o.state = 1 Or o.state = 2 ) "
+               "Left Join tags t On t.uid = u.id Where `name` = %s And `age` > %s Group By u.id Having Count(o.id) > 1 Order By u.id Desc Limit 20, 10")
+        self.assertEqual(SqlCompiler().compile(stmt), sql)
+        self.assertEqual(render_by_parts(stmt), sql)
+        # Rendering does not change the parts.
+        self.assertEqual(SqlCompiler().compile(stmt), sql)
+        self.assertEqual(stmt.to_sql(), sql)
+
+    def test_defaults(self):
+        self.assertEqual(SqlCompiler().compile(Statement("t")), "Select * From t")
+        self.assertEqual(SqlCompiler().compile(Statement("t").distinct(True)), "Select Distinct * From t")
+        stmt = Statement("t")
+        stmt.part['lock'] = "for update"
+        self.assertEqual(SqlCompiler().compile(stmt), "Select * From t for update")
+
+    def test_same_as_parts(self):
+        rand = random.Random(20260418)
+        exps = ["a = 1", " b = 2", "c = 3 ", "  ", "", "d In (1, 2)"]
+
+        def where(depth: int) -> WhereAnd:
+            w = WhereOr() if rand.random() < 0.5 else WhereAnd()
+            for _ in range(rand.randint(0, 3)):
+                w.add_exp(where(depth + 1) if depth < 2 and rand.random() < 0.3 else rand.choice(exps))
+            return w
+
+        for _ in range(2000):
+            stmt = Statement(rand.choice(["t", "t x", " t "]))
+            stmt.distinct(rand.random() < 0.3)
+            for _ in range(rand.randint(0, 3)):
+                stmt.field(rand.choice(["id", " name", "age ", " "]))
+            for _ in range(rand.randint(0, 2)):
+                stmt.x_join(rand.choice(list(stmt.part['from'].tables[0].JoinType)), "j", rand.choice(["", "j"]), where(1))
+            stmt.where(where(0))
+            for _ in range(rand.randint(0, 2)):
+                stmt.group_by(rand.choice(exps))
+            for _ in range(rand.randint(0, 2)):
+                stmt.having(rand.choice(exps))
+            for _ in range(rand.randint(0, 2)):
+                stmt.order_by(rand.choice(exps), rand.choice(["asc", "desc"]))
+            if rand.random() < 0.5:
+                stmt.limit(rand.randint(1, 9), rand.randint(0, 9))
+            self.assertEqual(SqlCompiler().compile(stmt), render_by_parts(stmt))
+
+    def test_pretty(self):
+        self.assertEqual(self.statement().to_sql(pretty=True), "\n".join((
+            "Select",
+            "    u.id,",
+            "    u.name",
+            "From",
+            "    users u",
+            "    Inner Join orders o",
+            "        On",
+            "            o.uid = u.id",
+            "            And (",
+            "                o.state = 1",
+            "                Or o.state = 2",
+            "            )",
+            "    Left Join tags t",
+            "        On",
+            "            t.uid = u.id",
+            "Where",
+            "    `name` = %s",
+            "    And `age` > %s",
+            "Group By",
+            "    u.id",
+            "Having",
+            "    Count(o.id) > 1",
+            "Order By",
+            "    u.id Desc",
+            "Limit 20, 10",
+        )))
+        self.assertEqual(SqlCompiler(pretty=True, indent=2).compile(Statement("t")), "Select\n  *\nFrom\n  t")
+
+
+if __name__ == "__main__":
+    unittest.main()
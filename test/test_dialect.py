@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+import unittest
+
+from src.pydoo.api.sqlite_api import SQLiteConnection
+from src.pydoo.dialect import DIALECTS, MSSQLDialect, get_dialect
+from src.pydoo.executor import Executor
+from src.pydoo.pydoo import Pydoo
+from src.pydoo.statement import Statement
+
+
+class TestDialect(unittest.TestCase):
+    SQL = "Select * From t Where `a` = %s And `b``c` Like 'x%%`y`%s' And d Like \"%s\" Or e = %s And f % 2 = %%"
+
+    def test_translate(self):
+        self.assertIs(DIALECTS["mysql"].translate(self.SQL), self.SQL)
+        self.assertEqual(DIALECTS["sqlite"].translate(self.SQL),
+                         "Select * From t Where `a` = ? And `b``c` Like 'x%%`y`%s' And d Like \"%s\" Or e = ? And f % 2 = %")
+        self.assertEqual(DIALECTS["postgresql"].translate(self.SQL),
+                         "Select * From t Where \"a\" = %s And \"b`c\" Like 'x%%`y`%s' And d Like \"%s\" Or e = %s And f % 2 = %%")
+        self.assertEqual(DIALECTS["mssql"].translate("Select `a]b` From `t` Where `id` = %s"), "Select [a]]b] From [t] Where [id] = ?")
+
+    def test_row_compare(self):
+        self.assertEqual(DIALECTS["mysql"].row_compare(["a", "b"], ">", (1, 2)), ("(`a`, `b`) > (%s, %s)", [1, 2]))
+        self.assertEqual(DIALECTS["mssql"].row_compare(["a", "b", "c"], "<", [1, 2, 3]),
+                         ("(`a` < %s Or (`a` = %s And (`b` < %s Or (`b` = %s And `c` < %s))))", [1, 1, 2, 2, 3]))
+
+    def test_get_dialect(self):
+        dialect = MSSQLDialect()
+        self.assertIs(get_dialect(dialect), dialect)
+        self.assertIs(get_dialect("sqlite"), DIALECTS["sqlite"])
+        with self.assertRaises(ValueError):
+            get_dialect("oracle")
+
+    def test_limit(self):
+        def sql(dialect: str, ordered: bool = True) -> str:
+            stmt = Pydoo(SQLiteConnection.connect(), dialect=dialect).table("t").limit(10, 20)
+            if ordered:
+                stmt.order_by("id")
+            return stmt.to_sql()
+
+        self.assertEqual(sql("mysql"), "Select * From t Order By id Asc Limit 20, 10")
+        self.assertEqual(sql("sqlite"), "Select * From t Order By id Asc Limit 10 Offset 20")
+        self.assertEqual(sql("postgresql"), "Select * From t Order By id Asc Limit 10 Offset 20")
+        self.assertEqual(sql("mssql"), "Select * From t Order By id Asc Offset 20 Rows Fetch Next 10 Rows Only")
+        self.assertEqual(sql("mssql", False), "Select * From t Order By (Select Null) Offset 20 Rows Fetch Next 10 Rows Only")
+
+    def test_upsert(self):
+        columns, keys, update = ("id", "hits"), ("id",), (("hits", "+"),)
+        self.assertEqual(DIALECTS["sqlite"].upsert("t", columns, keys, update, 1),
+                         "Insert Into t (`id`, `hits`) Values (%s, %s) On Conflict (`id`) Do Update Set `hits` = t.`hits` + excluded.`hits`")
+        self.assertEqual(DIALECTS["sqlite"].upsert("t", columns, keys, (), 1),
+                         "Insert Into t (`id`, `hits`) Values (%s, %s) On Conflict (`id`) Do Nothing")
+        self.assertEqual(DIALECTS["mssql"].upsert("t", columns, keys, update, 2),
+                         "Merge Into t As target Using (Values (%s, %s), (%s, %s)) As source (`id`, `hits`) On target.`id` = source.`id` "
+                         "When Matched Then Update Set target.`hits` = target.`hits` + source.`hits` "
+                         "When Not Matched Then Insert (`id`, `hits`) Values (source.`id`, source.`hits`);")
+
+    def test_sql_cache(self):
+        doo = Pydoo(SQLiteConnection.connect())
+        self.assertEqual(doo.table("t").where("a", "1").to_sql(), "Select * From t Where `a` = ?")
+        doo.dialect = "mysql"
+        self.assertEqual(doo.table("t").where("a", "1").to_sql(), "Select * From t Where `a` = %s")
+        doo.dialect = "sqlite"
+        self.assertEqual(doo.table("t").where("a", "1").to_sql(pretty=True), "Select\n    *\nFrom\n    t\nWhere\n    `a` = ?")
+
+    def test_detected(self):
+        self.assertIs(Pydoo(SQLiteConnection.connect()).dialect, DIALECTS["sqlite"])
+        executor = Executor(SQLiteConnection.connect())
+        executor.type, executor.placeholder = "mssql", "%s"
+        self.assertEqual(Pydoo(executor).dialect.translate("Select `a` From t Where `a` = %s"), "Select [a] From t Where [a] = %s")
+        self.assertEqual(Statement("t", executor).where("a", "1").to_sql(), "Select * From t Where [a] = %s")
+        self.assertEqual(Statement("t").where("a", "1").to_sql(), "Select * From t Where `a` = %s")
+
+    def test_bind_params(self):
+        stmt = Statement("t")
+        stmt.doo = Pydoo(SQLiteConnection.connect(), dialect="mssql")
+        self.assertEqual(stmt._max_bind_params(stmt.doo.executor), 2100)
+
+
+class TestSQLiteDialect(unittest.TestCase):
+    """sqlite3 runs the SQL of the sqlite dialect as it is, no placeholder rewriting executor."""
+
+    def setUp(self):
+        self.doo = Pydoo(SQLiteConnection.connect())
+        self.doo.result_type = Pydoo.ResultType.FETCH_ALL
+        self.doo.execute("Create Table t (id Integer Primary Key, a Integer, b Integer, v Text)")
+        self.doo.table("t").insert_many({"id": index, "a": index % 3, "b": index, "v": f"v{index}"} for index in range(20))
+
+    def test_select(self):
+        stmt = self.doo.table("t").field(["id", "v"]).where({"a": 1, "id": [1, 4, 7, 8]}).limit(2, 1)
+        stmt.order_by("id", "desc")
+        self.assertEqual(stmt.select(), [(4, "v4"), (1, "v1")])
+
+    def test_split_in_list(self):
+        self.doo.max_in_values = 2
+        self.assertEqual(sorted(row[0] for row in self.doo.table("t").field("id").where({"id": [1, 2, 3, 4, 5]}).select()), [1, 2, 3, 4, 5])
+        self.doo.in_list_strategy = "temp_table"
+        self.assertEqual(sorted(row[0] for row in self.doo.table("t").field("id").where({"id": [1, 2, 3]}).select()), [1, 2, 3])
+
+    def test_seek(self):
+        rows = self.doo.table("t").field(["a", "b"]).seek_after(["a", "b"], [1, 10]).limit(3).select()
+        self.assertEqual(rows, [(1, 13), (1, 16), (1, 19)])
+
+    def test_writes(self):
+        self.doo.table("t").upsert_many([{"id": 1, "a": 9, "b": 9, "v": "x"}], keys="id")
+        self.doo.table("t").update_many_by_key([{"a": 9, "b": 9, "v": "y"}], key=["a", "b"])
+        self.assertEqual(self.doo.table("t").where("id", "1").find(), [(1, 9, 9, "y")])
+
+
+if __name__ == "__main__":
+    unittest.main()
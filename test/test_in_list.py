@@ -0,0 +1,211 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import os
+import tempfile
+import threading
+import unittest
+
+from src.pydoo.api.sqlite_api import SQLiteConnection
+from src.pydoo.async_pydoo import AsyncPydoo
+from src.pydoo.executor import Executor, PooledExecutor
+from src.pydoo.part.in_list_part import InListPart
+from src.pydoo.pool import ConnectionPool
+from src.pydoo.pydoo import Pydoo
+from src.pydoo.statement import Statement
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class TestInListPart(unittest.TestCase):
+    def test_where_list(self):
+        stmt = Statement("t").where({"a": 1, "id": [1, 2, 3], "b": "x"})
+        self.assertEqual(stmt.to_sql(), "Select * From t Where `a` = %s And `id` In (%s, %s, %s) And `b` = %s")
+        self.assertEqual(stmt.values, [1, 1, 2, 3, "x"])
+        in_list = stmt.part['where'].parts[1]
+        self.assertEqual((in_list.offset, in_list.count), (1, 3))
+
+    def test_empty_list(self):
+        stmt = Statement("t").where({"id": []})
+        self.assertEqual(stmt.to_sql(), "Select * From t Where 1 = 0")
+        self.assertEqual(stmt.values, [])
+
+    def test_placeholders(self):
+        self.assertEqual(InListPart.placeholders(1), "%s")
+        self.assertEqual(InListPart.placeholders(3), "%s, %s, %s")
+
+
+class TestSplitInList(unittest.TestCase):
+    def setUp(self):
+        self.executor = Executor(SQLiteConnection.connect())
+        self.executor.execute("Create Table t (id Integer, grp Integer, v Text)").close()
+        self.executor.execute_many("Insert Into t Values (?, ?, ?)", [(index, index % 2, f"v{index}") for index in range(20)]).close()
+        self.doo = Pydoo(self.executor)
+        self.doo.logging = True
+        self.doo.result_type = Pydoo.ResultType.FETCH_ALL
+        self.doo.max_in_values = 3
+        self.ids = [1, 3, 5, 7, 9, 11, 13, 3, 1, 100]
+
+    def queries(self) -> list[str]:
+        return [event.sql for event in self.doo.logs if event.kind == "query"]
+
+    def select(self):
+        return self.doo.table("t").field("id").where({"grp": 1, "id": self.ids}).select()
+
+    def test_batch(self):
+        self.assertEqual(sorted(row[0] for row in self.select()), [1, 3, 5, 7, 9, 11, 13])
+        # 8 distinct values in chunks of 3, the last one padded
+        self.assertEqual(self.queries(), ["Select id From t Where `grp` = ? And `id` In (?, ?, ?)"] * 3)
+
+    def test_under_limit(self):
+        self.doo.max_in_values = 100
+        self.assertEqual(self.select().__len__(), 7)
+        self.assertEqual(self.queries().__len__(), 1)
+
+    def test_bind_params_limit(self):
+        self.doo.max_in_values = 100
+        self.executor.max_bind_params = 5
+        self.assertEqual(self.select().__len__(), 7)
+        self.assertEqual(self.queries().__len__(), 2)
+
+    def test_lazy(self):
+        self.doo.result_type = Pydoo.ResultType.FETCH_STREAM
+        rows = self.select()
+        self.assertEqual(self.queries().__len__(), 0)
+        self.assertEqual(sorted(row[0] for row in rows), [1, 3, 5, 7, 9, 11, 13])
+        self.doo.result_type = Pydoo.ResultType.FETCH_CURSOR_RAW
+        with self.assertRaises(ValueError):
+            self.select()
+
+    def test_joined_subquery_before_in_list(self):
+        sub = self.doo.table("t").field("id AS sid").where("v", "!=", "v5")
+        stmt = self.doo.table("t").field("t.id").where({"grp": 1, "id": self.ids}).inner_join(sub, "s", "s.sid = t.id")
+        in_list = stmt.part['where'].parts[1]
+        self.assertEqual(stmt._in_list_values(in_list), list(dict.fromkeys(self.ids)))
+        self.assertEqual(sorted(row[0] for row in stmt.select()), [1, 3, 7, 9, 11, 13])
+
+    def test_unsplittable(self):
+        stmt = self.doo.table("t").where({"id": self.ids})
+        stmt.group_by("grp")
+        with self.assertRaises(ValueError):
+            stmt.select()
+        with self.assertRaises(ValueError):
+            self.doo.table("t").where({"id": self.ids}).distinct(True).select()
+
+    def ordered(self, order_type: str = 'desc'):
+        stmt = self.doo.table("t").field(["t.id", "v AS value"]).where({"id": self.ids})
+        stmt.order_by("t.id", order_type)
+        return stmt
+
+    def test_ordered_merge(self):
+        self.assertEqual([row[0] for row in self.ordered().select()], [13, 11, 9, 7, 5, 3, 1])
+        self.assertEqual([row[0] for row in self.ordered('asc').limit(3, 2).select()], [5, 7, 9])
+        self.assertTrue(all(query.endswith("Order By t.id Asc Limit 5") for query in self.queries()[-3:]))
+        self.doo.result_type = Pydoo.ResultType.FETCH_STREAM
+        with self.assertRaises(ValueError):
+            self.ordered().select()
+
+    def test_ordered_merge_select_all(self):
+        # Order columns are found by the cursor description, the default `*` field list selects them
+        rows = self.doo.table("t").where({"id": self.ids}).order_by("id", "desc").limit(5).select()
+        self.assertEqual(rows, [(13, 1, "v13"), (11, 1, "v11"), (9, 1, "v9"), (7, 1, "v7"), (5, 1, "v5")])
+        cached = self.doo.table("t").where({"id": self.ids}).order_by("t.id").limit(2).cache()
+        self.assertEqual(cached.select(), [(1, 1, "v1"), (3, 1, "v3")])
+        count = self.queries().__len__()
+        self.assertEqual(cached.select(), [(1, 1, "v1"), (3, 1, "v3")])
+        self.assertEqual(self.queries().__len__(), count)
+
+    def test_ordered_merge_dict_rows(self):
+        stmt = Statement("t")
+        stmt.order_by("`v`", "desc")
+        stmt.order_by("id")
+        key = stmt._order_key({"id": 1, "v": None})
+        rows = [{"id": 2, "v": "b"}, {"id": 1, "v": None}, {"id": 1, "v": "b"}, {"id": 3, "v": "c"}]
+        self.assertEqual(sorted(rows, key=key), [{"id": 3, "v": "c"}, {"id": 1, "v": "b"}, {"id": 2, "v": "b"}, {"id": 1, "v": None}])
+
+    def test_order_column_not_selected(self):
+        stmt = self.doo.table("t").field("v").where({"id": self.ids})
+        stmt.order_by("id")
+        with self.assertRaises(ValueError):
+            stmt.select()
+
+    def test_parallel_chunks(self):
+        self.doo.max_in_values = 100
+        rows = self.ordered().select(parallel=4)
+        self.assertEqual([row[0] for row in rows], [13, 11, 9, 7, 5, 3, 1])
+        # 8 distinct values in 4 chunks of 2, one after another on a single connection
+        self.assertEqual(self.queries().__len__(), 4)
+        with self.assertRaises(ValueError):
+            self.ordered().select(parallel=0)
+
+    def test_temp_table(self):
+        self.doo.in_list_strategy = "temp_table"
+        self.assertEqual(sorted(row[0] for row in self.select()), [1, 3, 5, 7, 9, 11, 13])
+        self.assertEqual(self.queries(), ["Select id From t Where `grp` = ? And `id` In (Select v From pydoo_in_list)"])
+        # Dropped afterwards
+        self.assertEqual(self.select().__len__(), 7)
+
+    @unittest.skipUnless(numpy is not None, "numpy is not installed")
+    def test_columnar(self):
+        self.doo.result_type = Pydoo.ResultType.FETCH_COLUMNAR
+        columns = self.select()
+        self.assertEqual(sorted(columns["id"].tolist()), [1, 3, 5, 7, 9, 11, 13])
+
+    def test_async(self):
+        async def run():
+            async with AsyncPydoo(self.executor) as doo:
+                doo.result_type = AsyncPydoo.ResultType.FETCH_ALL
+                ordered = doo.table("t").where({"id": self.ids})
+                ordered.order_by("id", "desc")
+                self.assertEqual([row[0] for row in await ordered.limit(2).select(parallel=3)], [13, 11])
+                doo.result_type = AsyncPydoo.ResultType.FETCH_ALL
+                doo.max_in_values = 3
+                rows = await doo.table("t").field("id").where({"id": self.ids}).select()
+                doo.result_type = AsyncPydoo.ResultType.FETCH_STREAM
+                streamed = [row async for row in await doo.table("t").field("id").where({"id": self.ids}).select()]
+                return rows, streamed
+
+        rows, streamed = asyncio.run(run())
+        self.assertEqual(sorted(row[0] for row in rows), [1, 3, 5, 7, 9, 11, 13])
+        self.assertEqual(sorted(row[0] for row in streamed), [1, 3, 5, 7, 9, 11, 13])
+
+
+class TestParallelInList(unittest.TestCase):
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix=".sqlite3")
+        os.close(fd)
+        pool = ConnectionPool(lambda: SQLiteConnection.connect(self.path), min_size=1, max_size=4)
+        self.executor = PooledExecutor(pool)
+        self.executor.execute("Create Table t (id Integer, v Text)").close()
+        self.executor.execute_many("Insert Into t Values (?, ?)", [(index, f"v{index}") for index in range(100)]).close()
+        self.doo = Pydoo(self.executor)
+        self.doo.result_type = Pydoo.ResultType.FETCH_ALL
+
+    def tearDown(self):
+        self.executor.close()
+        os.remove(self.path)
+
+    def test_fan_out(self):
+        threads = set()
+        query = self.executor.query
+        # Every chunk waits for the others, so they must run at the same time.
+        barrier = threading.Barrier(4, timeout=5)
+
+        def record(sql, args=None, stream=False):
+            threads.add(threading.current_thread().name)
+            barrier.wait()
+            return query(sql, args, stream)
+        self.executor.query = record
+
+        stmt = self.doo.table("t").field(["id", "v"]).where({"id": list(range(0, 100, 3))})
+        stmt.order_by("id")
+        rows = stmt.select(parallel=4)
+        self.assertEqual([row[0] for row in rows], list(range(0, 100, 3)))
+        self.assertEqual(threads.__len__(), 4)
+        self.assertTrue(all(name.startswith("pydoo-fanout") for name in threads))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+import unittest
+from unittest.mock import Mock
+
+from src.pydoo.statement import Statement
+
+
+class TestInsertMany(unittest.TestCase):
+    def setUp(self):
+        self.executor = Mock()
+        self.executor.max_bind_params = 65535
+        self.executor.max_packet_size = 4 * 1024 * 1024
+        self.executor.prefer_executemany = False
+        self.executor.execute.side_effect = lambda sql, args: Mock(rowcount=args.__len__() // 2)
+        self.executor.execute_many.side_effect = lambda sql, args: Mock(rowcount=args.__len__())
+
+    def statement(self):
+        stmt = Statement("t")
+        stmt.executor = self.executor
+        return stmt
+
+    @staticmethod
+    def rows(n):
+        return ({"id": i, "name": f"n{i}"} for i in range(n))
+
+    def test_multi_row_values_in_batches(self):
+        self.assertEqual(self.statement().insert_many(self.rows(5), batch_size=2), 5)
+        calls = self.executor.execute.call_args_list
+        self.assertEqual([len(call.args[1]) for call in calls], [4, 4, 2])
+        self.assertEqual(calls[0].args[0], "Insert Into t (`id`, `name`) Values (%s, %s), (%s, %s)")
+        self.assertEqual(calls[0].args[1], [0, "n0", 1, "n1"])
+        self.assertEqual(calls[2].args[0], "Insert Into t (`id`, `name`) Values (%s, %s)")
+
+    def test_split_by_bind_params(self):
+        self.executor.max_bind_params = 6
+        self.statement().insert_many(self.rows(7), batch_size=1000)
+        self.assertEqual([len(call.args[1]) // 2 for call in self.executor.execute.call_args_list], [3, 3, 1])
+
+    def test_split_by_packet_size(self):
+        self.executor.max_packet_size = 100
+        rows = [{"id": i, "name": "x" * 30} for i in range(4)]
+        self.statement().insert_many(rows)
+        self.assertEqual([len(call.args[1]) // 2 for call in self.executor.execute.call_args_list], [2, 2])
+
+    def test_prefer_executemany(self):
+        self.executor.prefer_executemany = True
+        self.assertEqual(self.statement().insert_many(self.rows(3), batch_size=2), 3)
+        self.executor.execute.assert_not_called()
+        first = self.executor.execute_many.call_args_list[0]
+        self.assertEqual(first.args[0], "Insert Into t (`id`, `name`) Values (%s, %s)")
+        self.assertEqual(first.args[1], [[0, "n0"], [1, "n1"]])
+
+    def test_rows_with_different_columns_raise(self):
+        with self.assertRaises(ValueError):
+            self.statement().insert_many([{"id": 1}, {"name": "a"}])
+
+    def test_empty_rows_insert_nothing(self):
+        self.assertEqual(self.statement().insert_many([]), 0)
+        self.executor.execute.assert_not_called()
+
+    def test_invalid_batch_size(self):
+        with self.assertRaises(ValueError):
+            self.statement().insert_many(self.rows(1), batch_size=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import unittest
+
+from src.pydoo.api.sqlite_api import SQLiteConnection
+from src.pydoo.async_pydoo import AsyncPydoo
+from src.pydoo.executor import Executor
+from src.pydoo.instrument import QueryEvent, QueryHooks, QueryStats, ShapeStats
+from src.pydoo.pydoo import Pydoo
+
+
+class Recorder(object):
+    def __init__(self):
+        self.calls = []
+
+    def before_execute(self, event: QueryEvent):
+        self.calls.append(("before", event.sql))
+
+    def after_execute(self, event: QueryEvent):
+        self.calls.append(("after", event.sql))
+
+    def on_error(self, event: QueryEvent):
+        self.calls.append(("error", event.sql))
+
+    def on_fetch(self, event: QueryEvent):
+        self.calls.append(("fetch", event.sql, event.rows))
+
+
+class TestQueryStats(unittest.TestCase):
+    def test_percentiles(self):
+        self.assertEqual(ShapeStats.percentiles(range(1, 101)), {"p50": 50, "p95": 95, "p99": 99})
+        self.assertEqual(ShapeStats.percentiles([3.0]), {"p50": 3.0, "p95": 3.0, "p99": 3.0})
+        self.assertEqual(ShapeStats.percentiles([]), {"p50": 0.0, "p95": 0.0, "p99": 0.0})
+
+    def test_report_by_shape(self):
+        stats = QueryStats(samples=10, max_shapes=2)
+        for index in range(20):
+            event = QueryEvent("query", "Select 1", [], "FETCH_ALL")
+            event.execute_time = index / 1000
+            event.rows = 1
+            stats.on_fetch(event)
+        failed = QueryEvent("query", "Select 2", [1], "FETCH_ALL")
+        failed.error = ValueError("failed")
+        stats.on_error(failed)
+        stats.on_fetch(QueryEvent("query", "Select 3", [], "FETCH_ALL"))
+        report = stats.report()
+        self.assertEqual(set(report), {"Select 1", "Select 2", QueryStats.OTHER})
+        self.assertEqual(report["Select 1"]["count"], 20)
+        self.assertEqual(report["Select 1"]["rows"], 20)
+        # Only the latest 10 samples are kept
+        self.assertEqual(report["Select 1"]["p50"], 0.014)
+        self.assertEqual(report["Select 1"]["execute"]["p99"], 0.019)
+        self.assertEqual(report["Select 2"]["errors"], 1)
+        self.assertEqual(stats.slowest(1)[0][0], "Select 1")
+        stats.reset()
+        self.assertEqual(stats.report(), {})
+
+
+class TestPydooHooks(unittest.TestCase):
+    def setUp(self):
+        self.executor = Executor(SQLiteConnection.connect())
+        self.executor.execute("Create Table t (id Integer, v Text)").close()
+        self.executor.execute("Insert Into t Values (1, 'a'), (2, 'b'), (3, 'c')").close()
+        self.doo = Pydoo(self.executor)
+        self.doo.result_type = Pydoo.ResultType.FETCH_ALL
+        self.recorder = self.doo.hooks.attach(Recorder())
+        self.stats = self.doo.hooks.attach(QueryStats())
+
+    def test_statement(self):
+        self.doo.table("t").field("v").where("v", "a").select()
+        self.doo.table("t").field("v").where("v", "b").select()
+        sql = "Select v From t Where `v` = ?"
+        self.assertEqual(self.recorder.calls, [("before", sql), ("after", sql), ("fetch", sql, 1)] * 2)
+        report = self.stats.report()[sql]
+        self.assertEqual(report["count"], 2)
+        self.assertEqual(report["rows"], 2)
+        self.assertGreater(report["render"]["p99"], 0)
+
+    def test_error(self):
+        with self.assertRaises(Exception):
+            self.doo.query("Select * From missing")
+        self.assertEqual(self.recorder.calls, [("before", "Select * From missing"), ("error", "Select * From missing")])
+        self.assertEqual(self.stats.report()["Select * From missing"]["errors"], 1)
+
+    def test_lazy_results(self):
+        self.doo.result_type = Pydoo.ResultType.FETCH_STREAM
+        self.doo.chunk_size = 2
+        rows = self.doo.query("Select * From t")
+        self.assertEqual(self.recorder.calls[-1][0], "after")
+        self.assertEqual(list(rows).__len__(), 3)
+        self.assertEqual(self.recorder.calls[-1], ("fetch", "Select * From t", 3))
+
+        self.doo.result_type = Pydoo.ResultType.FETCH_CHUNK
+        chunks = self.doo.query("Select * From t")
+        next(chunks)
+        chunks.close()
+        self.assertEqual(self.recorder.calls[-1], ("fetch", "Select * From t", 2))
+
+        self.doo.result_type = Pydoo.ResultType.FETCH_CURSOR_RAW
+        self.doo.query("Select * From t").close()
+        self.assertEqual(self.recorder.calls[-1], ("fetch", "Select * From t", None))
+
+    def test_writes_and_logs(self):
+        self.doo.logging = True
+        self.doo.table("t").insert({"id": 4, "v": "d"})
+        self.doo.execute("Update t Set v = 'x' Where id > ?", [2])
+        self.assertEqual([event.kind for event in self.doo.logs], ["execute", "execute"])
+        self.assertEqual([event.rows for event in self.doo.logs], [1, 2])
+        self.assertEqual([event.params for event in self.doo.logs], [2, 1])
+
+    def test_detach(self):
+        self.doo.hooks.detach(self.recorder)
+        self.doo.hooks.detach(self.stats)
+        self.assertFalse(self.doo.hooks)
+        self.doo.query("Select * From t")
+        self.assertEqual(self.recorder.calls, [])
+
+    def test_async(self):
+        async def run():
+            async with AsyncPydoo(self.executor) as doo:
+                doo.result_type = AsyncPydoo.ResultType.FETCH_ALL
+                recorder = doo.hooks.attach(Recorder())
+                await doo.table("t").field("v").where("v", "a").select()
+                doo.result_type = AsyncPydoo.ResultType.FETCH_STREAM
+                self.assertEqual([row async for row in await doo.query("Select * From t")].__len__(), 3)
+                await doo.table("t").insert({"id": 4, "v": "d"})
+            return recorder.calls
+
+        calls = asyncio.run(run())
+        self.assertEqual([call for call in calls if call[0] == "fetch"], [
+            ("fetch", "Select v From t Where `v` = ?", 1),
+            ("fetch", "Select * From t", 3),
+            ("fetch", "Insert Into t (`id`, `v`) Values (?, ?)", 1),
+        ])
+
+
+class TestQueryHooks(unittest.TestCase):
+    def test_row_count(self):
+        self.assertEqual(QueryHooks.row_count([(1,), (2,)]), 2)
+        self.assertEqual(QueryHooks.row_count({"a": [1, 2, 3]}), 3)
+        self.assertEqual(QueryHooks.row_count({}), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import Mock
+
+from src.pydoo.api.sqlite_api import SQLiteConnection
+from src.pydoo.exception import PoolTimeoutError, PoolClosedError
+from src.pydoo.executor import PooledExecutor, PooledCursor
+from src.pydoo.pool import ConnectionPool
+from src.pydoo.pydoo import Pydoo
+
+
+class TestConnectionPool(unittest.TestCase):
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix=".sqlite3")
+        os.close(fd)
+        self.created = []
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def creator(self):
+        conn = SQLiteConnection.connect(self.path)
+        self.created.append(conn)
+        return conn
+
+    def test_min_size_is_created_at_once(self):
+        pool = ConnectionPool(self.creator, min_size=2, max_size=4)
+        self.assertEqual(pool.stats(), {"size": 2, "idle": 2, "in_use": 0})
+        pool.close()
+
+    def test_checkout_reuses_released_connection(self):
+        pool = ConnectionPool(self.creator, min_size=0, max_size=2)
+        with pool.connection() as conn:
+            self.assertEqual(pool.stats()["in_use"], 1)
+        with pool.connection() as conn2:
+            self.assertIs(conn, conn2)
+        self.assertEqual(self.created.__len__(), 1)
+        pool.close()
+
+    def test_wait_timeout_when_exhausted(self):
+        pool = ConnectionPool(self.creator, min_size=0, max_size=1, wait_timeout=0.05)
+        conn = pool.acquire()
+        with self.assertRaises(PoolTimeoutError):
+            pool.acquire()
+        pool.release(conn)
+        pool.release(pool.acquire())
+        pool.close()
+
+    def test_waiter_gets_released_connection(self):
+        pool = ConnectionPool(self.creator, min_size=1, max_size=1, wait_timeout=5)
+        conn = pool.acquire()
+        got = []
+        waiter = threading.Thread(target=lambda: got.append(pool.acquire()))
+        waiter.start()
+        time.sleep(0.05)
+        pool.release(conn)
+        waiter.join(1)
+        self.assertEqual(got, [conn])
+        pool.release(conn)
+        pool.close()
+
+    def test_broken_connection_is_replaced_by_ping(self):
+        pool = ConnectionPool(self.creator, min_size=1, max_size=1)
+        broken = pool.acquire()
+        pool.release(broken)
+        broken.connection.close()
+        conn = pool.acquire()
+        self.assertIsNot(conn, broken)
+        self.assertEqual(pool.stats()["size"], 1)
+        pool.release(conn)
+        pool.close()
+
+    def test_idle_timeout_keeps_min_size(self):
+        pool = ConnectionPool(self.creator, min_size=1, max_size=3, idle_timeout=0.01)
+        conns = [pool.acquire() for _ in range(3)]
+        for conn in conns:
+            pool.release(conn)
+        time.sleep(0.02)
+        pool.release(pool.acquire())
+        self.assertEqual(pool.stats()["size"], 1)
+        pool.close()
+
+    def test_closed_pool_refuses_checkout(self):
+        pool = ConnectionPool(self.creator, min_size=1, max_size=1)
+        pool.close()
+        with self.assertRaises(PoolClosedError):
+            pool.acquire()
+
+    def test_invalid_sizes(self):
+        with self.assertRaises(ValueError):
+            ConnectionPool(self.creator, min_size=2, max_size=1)
+        with self.assertRaises(ValueError):
+            ConnectionPool(self.creator, max_size=0)
+
+
+class TestPooledExecutor(unittest.TestCase):
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix=".sqlite3")
+        os.close(fd)
+        self.pool = ConnectionPool(lambda: SQLiteConnection.connect(self.path), min_size=1, max_size=4)
+        self.executor = PooledExecutor(self.pool)
+        self.executor.execute("Create Table t (id Integer Primary Key, name Text)").close()
+
+    def tearDown(self):
+        self.executor.close()
+        os.remove(self.path)
+
+    def test_cursor_close_releases_connection(self):
+        cursor = self.executor.execute("Insert Into t (name) Values (?)", ["a"])
+        self.assertIsInstance(cursor, PooledCursor)
+        self.assertEqual(self.pool.stats()["in_use"], 1)
+        cursor.close()
+        self.assertEqual(self.pool.stats()["in_use"], 0)
+
+    def test_iteration_releases_connection(self):
+        self.executor.execute("Insert Into t (name) Values (?)", ["a"]).close()
+        rows = list(self.executor.query("Select name From t"))
+        self.assertEqual(rows, [("a",)])
+        self.assertEqual(self.pool.stats()["in_use"], 0)
+
+    def test_failed_statement_releases_connection(self):
+        with self.assertRaises(Exception):
+            self.executor.query("Select * From missing_table")
+        self.assertEqual(self.pool.stats()["in_use"], 0)
+
+    def test_pydoo_shared_across_threads(self):
+        doo = Pydoo(self.executor)
+        doo.result_type = Pydoo.ResultType.FETCH_ALL
+        errors = []
+
+        def worker(n):
+            try:
+                for i in range(20):
+                    doo.execute("Insert Into t (name) Values (?)", [f"{n}-{i}"])
+                    doo.query("Select count(*) From t")
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(doo.query("Select count(*) From t"), [(80,)])
+        self.assertEqual(self.pool.stats()["in_use"], 0)
+
+    def test_dict_cursor_on_checked_out_connections(self):
+        created = []
+
+        def creator():
+            conn = Mock()
+            conn.cursor.return_value.fetchall.return_value = [{"id": 1}]
+            created.append(conn)
+            return conn
+        doo = Pydoo(PooledExecutor(ConnectionPool(creator, min_size=2, max_size=2)))
+        doo.result_type = Pydoo.ResultType.FETCH_ALL_AS_DICT
+        self.assertEqual(doo.query("Select id From t"), [{"id": 1}])
+        # The second query runs on the other connection while the first one is checked out.
+        with doo.executor.pool.connection():
+            self.assertEqual(doo.query("Select id From t"), [{"id": 1}])
+        self.assertEqual(created.__len__(), 2)
+        for conn in created:
+            conn.cursor.assert_called()
+            self.assertIs(conn.cursorclass, conn.DictCursor)
+
+    def test_pydoo_wraps_plain_connection(self):
+        conn = Mock()
+        doo = Pydoo(conn)
+        self.assertIs(doo.executor.connection(), conn)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+import sqlite3
+import unittest
+
+from src.pydoo.api.sqlite_api import SQLiteConnection
+from src.pydoo.executor import Executor, PooledExecutor
+from src.pydoo.pool import ConnectionPool
+from src.pydoo.prepared import PreparedCache, PreparedCursor
+from src.pydoo.pydoo import Pydoo
+
+
+class ReconnectingConnection(SQLiteConnection):
+    session = 1
+
+    def thread_id(self):
+        return self.session
+
+
+class TestPreparedCache(unittest.TestCase):
+    def test_prepared_on_threshold(self):
+        cache = PreparedCache(2)
+        opened = []
+        open_cursor = lambda: opened.append(object()) or opened[-1]
+        self.assertIsNone(cache.acquire("a", 2, open_cursor))
+        handle = cache.acquire("a", 2, open_cursor)
+        self.assertIsNotNone(handle)
+        self.assertIsNone(cache.acquire("a", 2, open_cursor), "handle in use")
+        cache.release(handle)
+        self.assertIs(cache.acquire("a", 2, open_cursor), handle)
+        self.assertEqual(opened.__len__(), 1)
+        self.assertEqual(cache.stats(), {"size": 2, "length": 1, "hits": 1, "misses": 3, "prepares": 1, "evictions": 0})
+
+    def test_eviction_closes_handles(self):
+        cache = PreparedCache(1)
+        conn = sqlite3.connect(":memory:")
+        first = cache.acquire("a", 1, conn.cursor)
+        cache.release(first)
+        second = cache.acquire("b", 1, conn.cursor)
+        self.assertNotIn("a", cache)
+        with self.assertRaises(sqlite3.ProgrammingError):
+            first.cursor.execute("Select 1")
+        # An evicted handle in use is closed on release.
+        cache.acquire("c", 1, conn.cursor)
+        second.cursor.execute("Select 1")
+        cache.release(second)
+        with self.assertRaises(sqlite3.ProgrammingError):
+            second.cursor.execute("Select 1")
+        self.assertEqual(cache.stats()["evictions"], 2)
+
+    def test_invalid_size(self):
+        with self.assertRaises(ValueError):
+            PreparedCache(0)
+
+
+class TestPreparedExecutor(unittest.TestCase):
+    def setUp(self):
+        self.conn = ReconnectingConnection(sqlite3.connect(":memory:", check_same_thread=False))
+        self.executor = Executor(self.conn)
+        self.executor.prepared_cache_size = 2
+        self.executor.execute("Create Table t (id Integer, name Text)").close()
+        self.executor.execute("Insert Into t Values (1, 'a'), (2, 'b')").close()
+
+    def query(self, value):
+        cursor = self.executor.query("Select name From t Where id = ?", [value])
+        try:
+            return cursor, cursor.fetchall()
+        finally:
+            cursor.close()
+
+    def test_disabled_by_default(self):
+        executor = Executor(SQLiteConnection.connect())
+        for _ in range(3):
+            cursor = executor.query("Select 1")
+            self.assertNotIsInstance(cursor, PreparedCursor)
+            cursor.close()
+        self.assertEqual(executor.prepared_stats()["connections"], 0)
+
+    def test_repeated_query_reuses_handle(self):
+        first, rows = self.query(1)
+        self.assertNotIsInstance(first, PreparedCursor)
+        self.assertEqual(rows, [("a",)])
+        second, rows = self.query(2)
+        self.assertIsInstance(second, PreparedCursor)
+        self.assertEqual(rows, [("b",)])
+        third, rows = self.query(1)
+        self.assertIs(third.handle, second.handle)
+        self.assertEqual(rows, [("a",)])
+        stats = self.executor.prepared_stats()
+        self.assertEqual((stats["prepares"], stats["hits"]), (1, 1))
+
+    def test_handle_in_use_runs_unprepared(self):
+        self.query(1)
+        held = self.executor.query("Select name From t Where id = ?", [1])
+        self.assertIsInstance(held, PreparedCursor)
+        other, rows = self.query(2)
+        self.assertNotIsInstance(other, PreparedCursor)
+        self.assertEqual(rows, [("b",)])
+        self.assertEqual(held.fetchall(), [("a",)])
+        held.close()
+        self.assertIsInstance(self.query(2)[0], PreparedCursor)
+
+    def test_reconnect_invalidates(self):
+        self.query(1)
+        handle = self.query(1)[0].handle
+        self.conn.session = 2
+        cursor, rows = self.query(1)
+        self.assertNotIsInstance(cursor, PreparedCursor)
+        self.assertEqual(rows, [("a",)])
+        with self.assertRaises(sqlite3.ProgrammingError):
+            handle.cursor.execute("Select 1")
+        self.assertIsInstance(self.query(1)[0], PreparedCursor)
+
+    def test_failed_handle_is_discarded(self):
+        self.query(1)
+        self.executor.execute("Drop Table t").close()
+        with self.assertRaises(sqlite3.OperationalError):
+            self.query(1)
+        self.assertEqual(self.executor.prepared[self.conn].__len__(), 0)
+
+    def test_invalidate_prepared(self):
+        self.query(1)
+        self.query(1)
+        self.executor.invalidate_prepared()
+        self.assertEqual(self.executor.prepared_stats()["length"], 0)
+
+    def test_writes_and_pydoo(self):
+        for index in range(3):
+            self.executor.execute("Insert Into t Values (?, ?)", [10 + index, "x"]).close()
+        self.assertEqual(self.executor.prepared_stats()["prepares"], 1)
+        doo = Pydoo(self.executor)
+        doo.result_type = Pydoo.ResultType.FETCH_ALL
+        for _ in range(3):
+            self.assertEqual(doo.table("t").where("name", "x").select("id"), [(10,), (11,), (12,)])
+
+    def test_pooled_executor(self):
+        pool = ConnectionPool(lambda: ReconnectingConnection(sqlite3.connect(":memory:", check_same_thread=False)), min_size=1, max_size=1)
+        executor = PooledExecutor(pool)
+        executor.prepared_cache_size = 4
+        executor.prepare_threshold = 1
+        for _ in range(2):
+            cursor = executor.query("Select 1")
+            self.assertIsInstance(cursor.cursor, PreparedCursor)
+            self.assertEqual(cursor.fetchall(), [(1,)])
+            cursor.close()
+        self.assertEqual(pool.stats()["in_use"], 0)
+        self.assertEqual(executor.prepared_stats(), {"connections": 1, "length": 1, "hits": 1, "misses": 1, "prepares": 1, "evictions": 0})
+        pool.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
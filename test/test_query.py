@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+import unittest
+from unittest.mock import Mock, patch
+
+from src.pydoo.part.select_part import SelectPart
+from src.pydoo.part.where_part import WhereAnd
+from src.pydoo.pydoo import Pydoo
+from src.pydoo.statement import Query, ShapeKey, Statement
+
+
+class TestStatementCopy(unittest.TestCase):
+    def base(self) -> Statement:
+        return Statement("users").field(["id", "name"]).where("state", "1")
+
+    def test_fork_is_independent(self):
+        base = self.base()
+        fork = base.copy()
+        fork.where("age", ">", 18).limit(10)
+        base.where("name", "bob")
+        self.assertEqual(base.to_sql(), "Select id, name From users Where `state` = %s And `name` = %s")
+        self.assertEqual(base.values, ["1", "bob"])
+        self.assertEqual(fork.to_sql(), "Select id, name From users Where `state` = %s And `age` > %s Limit 10")
+        self.assertEqual(fork.values, ["1", 18])
+
+    def test_unchanged_parts_are_shared(self):
+        base = self.base()
+        fork = base.copy()
+        fork.where("age", ">", 18)
+        self.assertIs(fork.part['select'], base.part['select'])
+        self.assertIs(fork.part['from'], base.part['from'])
+        self.assertIsNot(fork.part['where'], base.part['where'])
+        self.assertIs(fork.part['where'].parts[0], base.part['where'].parts[0])
+
+    def test_alias_and_select_copy_on_write(self):
+        base = self.base()
+        fork = base.copy().alias("u").distinct(True)
+        self.assertEqual(base.to_sql(), "Select id, name From users Where `state` = %s")
+        self.assertEqual(fork.to_sql(), "Select Distinct id, name From users u Where `state` = %s")
+        self.assertIs(fork.part['select'].fields, fork.part['select'].parts)
+
+    def test_where_replace(self):
+        base = self.base()
+        fork = base.copy()
+        cond = WhereAnd()
+        cond.add_exp("id = 1")
+        fork.where(cond)
+        self.assertEqual(base.to_sql(), "Select id, name From users Where `state` = %s")
+        self.assertEqual(fork.to_sql(), "Select id, name From users Where id = 1")
+
+    def test_group_having_order_copy_on_write(self):
+        base = Statement("orders").field(["uid", "Count(*)"]).group_by("uid")
+        fork = base.copy().group_by(["shop"]).having("Count(*) > 1").order_by("uid", "desc")
+        self.assertEqual(base.to_sql(), "Select uid, Count(*) From orders Group By uid")
+        self.assertEqual(fork.to_sql(), "Select uid, Count(*) From orders Group By uid, shop Having Count(*) > 1 Order By uid Desc")
+        query = fork.freeze()
+        query.fork().order_by("shop")
+        self.assertEqual(query.to_sql(), fork.to_sql())
+
+    def test_shape_of_shared_parts_computed_once(self):
+        fork = self.base().copy()
+        fork.shape()
+        with patch.object(SelectPart, "shape") as shape:
+            fork.where("age", ">", 18).shape()
+        shape.assert_not_called()
+
+    def test_shape_skipped_without_sql_cache(self):
+        with patch.object(Statement, "shape") as shape:
+            self.assertEqual(self.base().to_sql(), "Select id, name From users Where `state` = %s")
+            doo = Pydoo(Mock(), sql_cache_size=0)
+            self.assertEqual(doo.table("users").where("state", "1").to_sql(), "Select * From users Where `state` = %s")
+        shape.assert_not_called()
+
+
+class TestQuery(unittest.TestCase):
+    def test_immutable_and_hashable(self):
+        query = Statement("users").where("state", "1").freeze()
+        with self.assertRaises(AttributeError):
+            query.values = ()
+        self.assertEqual(query, Statement("users").where("state", "1").freeze())
+        self.assertNotEqual(query, Statement("users").where("state", "2").freeze())
+        self.assertEqual(hash(query), hash(Statement("users").where("state", "2").freeze()))
+        self.assertEqual(query.shape, Statement("users").where("state", "1").shape())
+        self.assertEqual(query.values, ("1",))
+        self.assertEqual({query: 1}[Statement("users").where("state", "1").freeze()], 1)
+
+    def test_freeze_is_a_snapshot(self):
+        statement = Statement("users").where("state", "1")
+        query = statement.freeze()
+        statement.where("name", "bob")
+        fork = query.fork()
+        fork.limit(5)
+        self.assertEqual(query.to_sql(), "Select * From users Where `state` = %s")
+        self.assertEqual(query.fork().values, ["1"])
+        self.assertEqual(fork.to_sql(), "Select * From users Where `state` = %s Limit 5")
+        self.assertEqual(statement.to_sql(), "Select * From users Where `state` = %s And `name` = %s")
+
+    def test_shape_key(self):
+        shape = Statement("users").shape()
+        key = ShapeKey(shape)
+        self.assertEqual(key, shape)
+        self.assertEqual(hash(key), hash(shape))
+        self.assertEqual({shape: "sql"}[key], "sql")
+
+    def test_forks_reuse_key_in_sql_cache(self):
+        doo = Pydoo(Mock())
+        query = doo.table("users").field(["id"]).where("state", "1").freeze()
+        self.assertEqual(query.fork().to_sql(), "Select id From users Where `state` = %s")
+        with patch.object(Statement, "shape") as shape, patch.object(Statement, "_render") as render:
+            self.assertEqual(query.fork().to_sql(), "Select id From users Where `state` = %s")
+        shape.assert_not_called()
+        render.assert_not_called()
+        fork = query.fork()
+        self.assertIs(fork.doo, doo)
+        self.assertEqual(fork.where("id", "2").to_sql(), "Select id From users Where `state` = %s And `id` = %s")
+
+
+if __name__ == "__main__":
+    unittest.main()
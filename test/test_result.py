@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+import unittest
+
+from src.pydoo.api.sqlite_api import SQLiteConnection
+from src.pydoo.pydoo import Pydoo
+from src.pydoo.statement import Result
+
+
+class TestLazyResult(unittest.TestCase):
+    def setUp(self):
+        self.doo = Pydoo(SQLiteConnection.connect())
+        self.doo.result_type = Pydoo.ResultType.FETCH_ALL
+        self.doo.execute("Create Table t (id Integer Primary Key, v Text)")
+        self.doo.table("t").insert_many({"id": index, "v": f"v{index}"} for index in range(20))
+        self.doo.result_type = Pydoo.ResultType.FETCH_LAZY
+        self.doo.chunk_size = 5
+        self.queries = []
+        query = self.doo.executor.query
+
+        def counted(sql, args=None, stream=False):
+            self.queries.append(sql)
+            return query(sql, args, stream)
+        self.doo.executor.query = counted
+
+    def test_deferred(self):
+        result = self.doo.table("t").field(["id", "v"]).where("id", "3").select()
+        self.assertIsInstance(result, Result)
+        self.assertEqual(result.sql, "Select id, v From t Where `id` = ?")
+        self.assertFalse(result.executed)
+        self.assertEqual(self.queries, [])
+        self.assertEqual(list(result), [(3, "v3")])
+        self.assertEqual(list(result), [(3, "v3")])
+        self.assertEqual(self.queries.__len__(), 1)
+
+    def test_values_kept(self):
+        stmt = self.doo.table("t").field("id").where("id", "3")
+        result = stmt.select()
+        stmt.where("v", "v4")
+        self.assertEqual(result.values, ["3"])
+        self.assertEqual(list(result), [(3,)])
+
+    def test_incremental(self):
+        result = self.doo.table("t").field(["id", "v"]).select()
+        self.assertEqual(result.first(), (0, "v0"))
+        self.assertEqual(result._rows.__len__(), 5)
+        self.assertEqual(result[6], (6, "v6"))
+        self.assertEqual(result._rows.__len__(), 10)
+        self.assertEqual(len(result), 20)
+        self.assertEqual(result[-1], (19, "v19"))
+        self.assertEqual([row[0] for row in result][:3], [0, 1, 2])
+        self.assertEqual(self.queries.__len__(), 1)
+
+    def test_accessors(self):
+        result = self.doo.table("t").field(["id", "v"]).where("id", "<", "3").select()
+        self.assertEqual(result.columns, ["id", "v"])
+        self.assertEqual(result.column("v"), ["v0", "v1", "v2"])
+        self.assertEqual(result.column(0), [0, 1, 2])
+        self.assertEqual(result.to_dicts()[1], {"id": 1, "v": "v1"})
+        with self.assertRaises(ValueError):
+            result.column("missing")
+        self.assertEqual(self.doo.table("t").field("Count(*)").select().scalar(), 20)
+        self.assertIsNone(self.doo.table("t").where("id", "99").find().scalar())
+        self.assertFalse(self.doo.table("t").where("id", "99").select())
+
+    def test_close(self):
+        fetched = []
+        self.doo.hooks.on_fetch.append(fetched.append)
+        with self.doo.table("t").select() as result:
+            self.assertIsNotNone(result.first())
+        self.assertEqual(fetched.__len__(), 1)
+        self.assertEqual(fetched[0].rows, 5)
+        self.assertEqual(list(result).__len__(), 5)
+
+    def test_split_in_list(self):
+        self.doo.max_in_values = 3
+        result = self.doo.table("t").field("id").where({"id": [1, 4, 7, 8, 12, 19]}).limit(4).select()
+        self.assertEqual(self.queries, [])
+        self.assertEqual(result.columns, ["id"])
+        self.assertEqual(sorted(result.column("id")), [1, 4, 7, 8])
+        with self.assertRaises(ValueError):
+            self.doo.table("t").cache().select()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import time
+import unittest
+
+from src.pydoo.api.sqlite_api import SQLiteConnection
+from src.pydoo.async_pydoo import AsyncPydoo
+from src.pydoo.executor import Executor
+from src.pydoo.pydoo import Pydoo
+from src.pydoo.result_cache import MISS, MemoryCacheBackend, ResultCache
+
+
+class TestMemoryCacheBackend(unittest.TestCase):
+    def test_lru_and_ttl(self):
+        backend = MemoryCacheBackend(size=2)
+        backend.set("a", 1, None, ("t",))
+        backend.set("b", 2, 0.05, ("t",))
+        self.assertEqual(backend.get("a"), 1)
+        backend.set("c", 3, None, ("u",))
+        self.assertIs(backend.get("b"), MISS)
+        self.assertEqual(backend.get("a"), 1)
+        backend.set("d", 4, 0.01, ())
+        time.sleep(0.02)
+        self.assertIs(backend.get("d"), MISS)
+        self.assertEqual(backend.stats()["expirations"], 1)
+
+    def test_invalidate_tables(self):
+        backend = MemoryCacheBackend()
+        backend.set("a", 1, None, ("t", "u"))
+        backend.set("b", 2, None, ("u",))
+        backend.set("c", 3, None, ("v",))
+        backend.invalidate(["u"])
+        self.assertIs(backend.get("a"), MISS)
+        self.assertIs(backend.get("b"), MISS)
+        self.assertEqual(backend.get("c"), 3)
+        self.assertEqual(backend.table_keys, {"v": {"c"}})
+
+
+class TestResultCache(unittest.TestCase):
+    def test_write_tables(self):
+        cache = ResultCache()
+        for sql, table in (
+                ("Insert Into `users` (`id`) Values (%s)", "users"),
+                ("insert ignore into db.users values (1)", "db.users"),
+                ("Replace Into users Values (1)", "users"),
+                (" Update users Set a = 1", "users"),
+                ("Delete From users Where id = 1", "users"),
+                ("Truncate Table users", "users"),
+        ):
+            cache.versions.clear()
+            cache.invalidate_sql(sql)
+            self.assertEqual(cache.versions, {table: 1}, sql)
+        cache.versions.clear()
+        cache.invalidate_sql("Select * From users")
+        self.assertEqual(cache.versions, {})
+
+    def test_racing_write_is_not_stored(self):
+        cache = ResultCache()
+        version = cache.version(("t",))
+        cache.invalidate(["t"])
+        cache.set("k", [1], None, ("t",), version)
+        self.assertIs(cache.get("k"), MISS)
+
+
+class TestStatementCache(unittest.TestCase):
+    def setUp(self):
+        self.executor = Executor(SQLiteConnection.connect())
+        self.executor.execute("Create Table conf (k Text, v Text)").close()
+        self.executor.execute("Create Table other (k Text)").close()
+        self.executor.execute("Insert Into conf Values ('a', '1'), ('b', '2')").close()
+        self.doo = Pydoo(self.executor)
+        self.doo.result_type = Pydoo.ResultType.FETCH_ALL
+        self.doo.logging = True
+
+    @staticmethod
+    def queries(doo: Pydoo | AsyncPydoo) -> int:
+        # Queries which reached the database, cache hits are not logged
+        return sum(event.kind == "query" for event in doo.logs)
+
+    def select(self, key: str = "a", **kwargs):
+        return self.doo.table("conf").field("v").where("k", key).cache(**kwargs).select()
+
+    def test_hit(self):
+        self.assertEqual(self.select(), [("1",)])
+        rows = self.select()
+        self.assertEqual(rows, [("1",)])
+        rows.append("changed")
+        self.assertEqual(self.select(), [("1",)])
+        self.assertEqual(self.select("b"), [("2",)])
+        self.assertEqual(self.queries(self.doo), 2)
+        self.assertEqual(self.doo.table("conf").field("v").where("k", "a").select(), [("1",)])
+        self.assertEqual(self.queries(self.doo), 3)
+
+    def test_ttl(self):
+        self.select(ttl=0.01)
+        time.sleep(0.02)
+        self.select(ttl=0.01)
+        self.assertEqual(self.queries(self.doo), 2)
+
+    def test_invalidated_by_insert(self):
+        self.select()
+        self.doo.table("other").insert({"k": "x"})
+        self.select()
+        self.assertEqual(self.queries(self.doo), 1)
+        self.doo.table("conf").insert({"k": "c", "v": "3"})
+        self.select()
+        self.doo.table("conf").insert_many([{"k": "d", "v": "4"}])
+        self.select()
+        self.assertEqual(self.queries(self.doo), 3)
+
+    def test_invalidated_by_raw_write_and_joined_table(self):
+        self.doo.table("conf c").field("c.v").inner_join("other", "o", "o.k = c.k").cache().select()
+        self.doo.execute("Update other Set k = 'y'")
+        self.doo.table("conf c").field("c.v").inner_join("other", "o", "o.k = c.k").cache().select()
+        self.assertEqual(self.queries(self.doo), 2)
+
+    def test_extra_tables(self):
+        self.select(tables="other")
+        self.doo.result_cache.invalidate(["other"])
+        self.select(tables="other")
+        self.assertEqual(self.queries(self.doo), 2)
+
+    def test_lazy_result_type_rejected(self):
+        self.doo.result_type = Pydoo.ResultType.FETCH_ITERATE
+        with self.assertRaises(ValueError):
+            self.select()
+
+    def test_async(self):
+        async def run():
+            async with AsyncPydoo(self.executor) as doo:
+                doo.result_type = AsyncPydoo.ResultType.FETCH_ALL
+                doo.logging = True
+                for _ in range(2):
+                    self.assertEqual(await doo.table("conf").field("v").where("k", "a").cache().select(), [("1",)])
+                await doo.table("conf").insert({"k": "c", "v": "3"})
+                await doo.table("conf").field("v").where("k", "a").cache().select()
+                self.assertEqual(self.queries(doo), 2)
+        asyncio.run(run())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import unittest
+
+from src.pydoo.api.sqlite_api import SQLiteConnection
+from src.pydoo.async_pydoo import AsyncPydoo
+from src.pydoo.dialect import SQLiteDialect
+from src.pydoo.executor import Executor
+from src.pydoo.pydoo import Pydoo
+from src.pydoo.statement import Statement
+
+
+class TestSeek(unittest.TestCase):
+    def setUp(self):
+        self.executor = Executor(SQLiteConnection.connect())
+        self.executor.execute("Create Table t (a Integer, b Integer, name Text)").close()
+        rows = [(a, b, f"{a}-{b}") for a in range(4) for b in range(3)]
+        self.executor.conn.connection.executemany("Insert Into t Values (?, ?, ?)", rows)
+        self.queries = []
+        query = self.executor.query
+
+        def record(sql, args=None, stream=False):
+            self.queries.append((sql, list(args or ())))
+            return query(sql, args, stream)
+        self.executor.query = record
+
+    def statement(self):
+        return Statement("t", self.executor)
+
+    def test_seek_after_sql(self):
+        stmt = self.statement().field(["a", "b"]).seek_after(["a", "b"], (1, 2), 10)
+        self.assertEqual(stmt.to_sql(), "Select a, b From t Where (`a`, `b`) > (?, ?) Order By a Asc, b Asc Limit 10")
+        self.assertEqual(stmt.values, [1, 2])
+
+    def test_seek_after_single_column_desc(self):
+        stmt = self.statement().where("name", "x").seek_after("a", [3], 5, "desc")
+        self.assertEqual(stmt.to_sql(), "Select * From t Where `name` = ? And `a` < ? Order By a Desc Limit 5")
+        self.assertEqual(stmt.values, ["x", 3])
+
+    def test_seek_after_without_row_values(self):
+        stmt = Pydoo(SQLiteConnection.connect(), dialect="mssql").table("t").field(["a", "b"]).seek_after(["a", "b"], (1, 2), 10)
+        self.assertEqual(stmt.to_sql(), "Select a, b From t Where ([a] > ? Or ([a] = ? And [b] > ?)) "
+                                        "Order By a Asc, b Asc Offset 0 Rows Fetch Next 10 Rows Only")
+        self.assertEqual(stmt.values, [1, 1, 2])
+        # The expanded comparison walks the same rows
+        dialect = SQLiteDialect()
+        dialect.row_values = False
+        doo = Pydoo(self.executor, dialect=dialect)
+        doo.result_type = Pydoo.ResultType.FETCH_ALL
+        expanded = list(doo.table("t").field(["a", "b"]).seek_iterate(["a", "b"], page_size=5, order_type="desc"))
+        self.assertEqual(expanded, list(self.statement().field(["a", "b"]).seek_iterate(["a", "b"], page_size=5, order_type="desc")))
+        self.assertEqual(expanded.__len__(), 12)
+        self.assertEqual(self.queries[1][0], "Select a, b From t Where (`a` < ? Or (`a` = ? And `b` < ?)) Order By a Desc, b Desc Limit 5")
+
+    def test_seek_after_first_page(self):
+        stmt = self.statement().seek_after("a", None, 5)
+        self.assertEqual(stmt.to_sql(), "Select * From t Order By a Asc Limit 5")
+
+    def test_seek_after_value_count_mismatch(self):
+        with self.assertRaises(ValueError):
+            self.statement().seek_after(["a", "b"], [1])
+
+    def test_seek_iterate_walks_all_rows_in_key_order(self):
+        stmt = self.statement().field(["a", "b", "name"]).where("a >= 1")
+        rows = list(stmt.seek_iterate(["a", "b"], page_size=4))
+        self.assertEqual([row[2] for row in rows], [f"{a}-{b}" for a in range(1, 4) for b in range(3)])
+        # 9 rows in pages of 4, 4 and 1
+        self.assertEqual(self.queries.__len__(), 3)
+        self.assertEqual(self.queries[1], ("Select a, b, name From t Where a >= 1 And (`a`, `b`) > (?, ?) Order By a Asc, b Asc Limit 4", [2, 0]))
+        # Pages run on copies, the statement is not changed
+        self.assertEqual(stmt.to_sql(), "Select a, b, name From t Where a >= 1")
+        self.assertEqual(stmt.values, [])
+        self.assertEqual(list(stmt.seek_iterate(["a", "b"], page_size=4)), rows)
+        self.assertEqual(self.queries[3], self.queries[0])
+
+    def test_seek_iterate_through_pydoo(self):
+        doo = Pydoo(self.executor)
+        doo.logging = True
+        fetched = []
+        doo.hooks.on_fetch.append(lambda event: fetched.append(event.rows))
+        rows = list(doo.table("t").field(["a", "b"]).seek_iterate(["a", "b"], page_size=5, order_type="desc"))
+        self.assertEqual(rows[:2], [(3, 2), (3, 1)])
+        self.assertEqual(rows.__len__(), 12)
+        self.assertEqual(fetched, [5, 5, 2])
+        self.assertEqual(doo.logs[1].args, [2, 1])
+
+    def test_seek_iterate_async(self):
+        async def run():
+            async with AsyncPydoo(self.executor) as doo:
+                return [row async for row in doo.table("t").field(["a", "b"]).where("a = 2").seek_iterate("b", page_size=2)]
+        self.assertEqual(asyncio.run(run()), [(2, 0), (2, 1), (2, 2)])
+
+    def test_seek_iterate_requires_selected_columns(self):
+        stmt = self.statement().field("name")
+        with self.assertRaises(ValueError):
+            list(stmt.seek_iterate("a", page_size=2))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+import datetime
+import json
+import os
+import tempfile
+import time
+import unittest
+
+from src.pydoo.api.sqlite_api import SQLiteConnection
+from src.pydoo.executor import Executor, PooledExecutor
+from src.pydoo.instrument import QueryEvent
+from src.pydoo.pool import ConnectionPool
+from src.pydoo.pydoo import Pydoo
+from src.pydoo.slow_query import SlowQueryLog
+
+
+class TestRenderLiterals(unittest.TestCase):
+    def test_literals(self):
+        self.assertEqual(
+            Executor.render_literals("Select %s, %s, %s, %s, %s, %s", [None, True, 1.5, b"\x01", datetime.date(2024, 1, 2), "it's"]),
+            "Select NULL, 1, 1.5, X'01', '2024-01-02', 'it\\'s'")
+        self.assertEqual(Executor.render_literals("Select 1"), "Select 1")
+        self.assertEqual(Executor.render_literals("Select %s", [1, 2]), "Select %s -- [1, 2]")
+        self.assertEqual(Executor.render_literals("Select ? Where a Like '%a'", [1]), "Select 1 Where a Like '%a'")
+
+
+class TestSlowQueryLog(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, "slow.log")
+        self.executor = Executor(SQLiteConnection.connect())
+        self.executor.execute("Create Table t (id Integer, v Text)").close()
+        self.executor.execute("Insert Into t Values (1, 'a'), (2, 'b')").close()
+        self.doo = Pydoo(self.executor)
+        self.doo.result_type = Pydoo.ResultType.FETCH_ALL
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def lines(self, path: str | None = None) -> list[dict]:
+        with open(path or self.path, encoding="utf-8") as f:
+            return [json.loads(line) for line in f]
+
+    def test_threshold(self):
+        log = self.doo.hooks.attach(SlowQueryLog(self.executor, self.path, threshold_ms=60000))
+        self.doo.table("t").where("v", "a").select()
+        log.close()
+        self.assertEqual(log.logged, 0)
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_record_with_explain(self):
+        log = self.doo.hooks.attach(SlowQueryLog(self.executor, self.path, threshold_ms=0, explain=True, explain_prefix="Explain Query Plan"))
+        self.doo.table("t").where("v", "a").select()
+        with self.assertRaises(Exception):
+            self.doo.query("Select * From missing")
+        log.close()
+        select, error = self.lines()
+        self.assertEqual(select["shape"], "Select * From t Where `v` = ?")
+        self.assertEqual(select["sql"], "Select * From t Where `v` = 'a'")
+        self.assertEqual(select["rows"], 1)
+        self.assertEqual(select["params"], 1)
+        self.assertIsNone(select["error"])
+        self.assertGreaterEqual(select["duration_ms"], select["execute_ms"])
+        self.assertIn("detail", select["explain"][0])
+        self.assertIn("missing", error["error"])
+        self.assertNotIn("explain", error)
+
+    def test_explain_skipped_for_open_raw_cursor(self):
+        log = self.doo.hooks.attach(SlowQueryLog(self.executor, self.path, threshold_ms=0, explain=True, explain_prefix="Explain Query Plan"))
+        self.doo.result_type = Pydoo.ResultType.FETCH_CURSOR_RAW
+        cursor = self.doo.query("Select * From t")
+        self.assertEqual(cursor.fetchall().__len__(), 2)
+        cursor.close()
+        log.close()
+        record, = self.lines()
+        self.assertEqual(record["explain_skipped"], "cursor open")
+        self.assertNotIn("explain", record)
+
+    def test_pooled_explain_does_not_wait(self):
+        pool = ConnectionPool(lambda: SQLiteConnection.connect(), min_size=1, max_size=1, wait_timeout=5)
+        executor = PooledExecutor(pool)
+        log = SlowQueryLog(executor, self.path, explain=True, explain_prefix="Explain Query Plan")
+        event = QueryEvent("query", "Select ?", [1], Pydoo.ResultType.FETCH_ALL.name)
+        self.assertIn("detail", log.record(event)["explain"][0])
+        with pool.connection():
+            start = time.perf_counter()
+            record = log.record(event)
+            self.assertLess(time.perf_counter() - start, 1)
+        self.assertEqual(record["sql"], "Select 1")
+        self.assertEqual(record["explain_skipped"], "no idle connection")
+        # A transaction of the thread explains on its own connection
+        executor.begin()
+        self.assertIn("explain", log.record(event))
+        executor.rollback()
+        log.close()
+        executor.close()
+
+    def test_rotation(self):
+        log = self.doo.hooks.attach(SlowQueryLog(self.executor, self.path, threshold_ms=0, max_bytes=400, backup_count=1))
+        for _ in range(10):
+            self.doo.query("Select * From t")
+        log.close()
+        self.assertTrue(os.path.exists(self.path + ".1"))
+        self.assertFalse(os.path.exists(self.path + ".2"))
+        self.assertEqual(self.lines(self.path + ".1")[0]["shape"], "Select * From t")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+import unittest
+from unittest.mock import Mock, patch
+
+from src.pydoo.sql_cache import SqlCache
+from src.pydoo.statement import Statement
+
+
+class TestSqlCache(unittest.TestCase):
+    def test_get_put_counts_hits_and_misses(self):
+        cache = SqlCache(2)
+        self.assertIsNone(cache.get("a"))
+        cache.put("a", "Select 1")
+        self.assertEqual(cache.get("a"), "Select 1")
+        self.assertEqual(cache.stats(), {"size": 2, "length": 1, "hits": 1, "misses": 1})
+
+    def test_lru_eviction(self):
+        cache = SqlCache(2)
+        cache.put("a", "A")
+        cache.put("b", "B")
+        cache.get("a")  # "b" becomes least recently used
+        cache.put("c", "C")
+        self.assertIn("a", cache)
+        self.assertNotIn("b", cache)
+        self.assertIn("c", cache)
+
+    def test_resize_and_disable(self):
+        cache = SqlCache(3)
+        for key in "abc":
+            cache.put(key, key)
+        cache.resize(1)
+        self.assertEqual(len(cache), 1)
+        self.assertIn("c", cache)
+        cache.resize(0)
+        cache.put("d", "d")
+        self.assertEqual(len(cache), 0)
+        with self.assertRaises(ValueError):
+            cache.resize(-1)
+
+    def test_get_or_render_calls_render_once(self):
+        cache = SqlCache()
+        render = Mock(return_value="Select *")
+        self.assertEqual(cache.get_or_render("k", render), "Select *")
+        self.assertEqual(cache.get_or_render("k", render), "Select *")
+        render.assert_called_once()
+
+
+class TestStatementSqlCache(unittest.TestCase):
+    @staticmethod
+    def _statement(doo, name: str):
+        return Statement("users u", doo=doo).field(["id", "name"]).where("name", name).limit(10)
+
+    def test_shape_ignores_bound_values(self):
+        a = self._statement(None, "Alice")
+        b = self._statement(None, "Bob")
+        self.assertEqual(a.shape(), b.shape())
+        self.assertEqual(hash(a.shape()), hash(b.shape()))
+        self.assertNotEqual(a.shape(), self._statement(None, "Bob").limit(20).shape())
+
+    def test_same_shape_skips_rendering(self):
+        doo = Mock()
+        doo.sql_cache = SqlCache(8)
+        first = self._statement(doo, "Alice")
+        self.assertEqual(first.to_sql(), "Select id, name From users u Where `name` = %s Limit 10")
+
+        second = self._statement(doo, "Bob")
+        with patch.object(Statement, "_render") as render:
+            self.assertEqual(second.to_sql(), "Select id, name From users u Where `name` = %s Limit 10")
+            render.assert_not_called()
+        self.assertEqual(second.values, ["Bob"])
+        self.assertEqual(doo.sql_cache.hits, 1)
+        self.assertEqual(doo.sql_cache.misses, 1)
+
+    def test_without_pydoo_renders_directly(self):
+        stmt = Statement("tableA")
+        self.assertEqual(stmt.to_sql(), "Select * From tableA")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -5,11 +5,11 @@ Unit tests for src.pydoo.statement.Statement
 Notes:
 - Tests focus on current implementation behavior in statement.py, aligned with data/Usage.md where possible.
 - For execution methods (select/find), _execute is patched to avoid real execution.
-- Several methods have known issues (e.g., group_by/order_by/having keys, lock variable bug, ValueType usage in where);
+- Several methods have known issues (e.g., lock variable bug, ValueType usage in where);
   the tests capture current behavior (exceptions) to make the suite reflect the code as-is.
 """
 import unittest
-from unittest.mock import patch
+from unittest.mock import Mock, patch
 
 from src.pydoo.statement import Statement
 from src.pydoo.part.from_part import From
@@ -123,36 +123,49 @@ class TestStatement(unittest.TestCase):
         self.assertEqual(tables[4].join_type, From.JoinType.Join)
         self.assertEqual(tables[5].join_type, From.JoinType.CrossJoin)
 
-    def test_join_with_subquery_statement_uses_select_string(self):
-        # When joining a subquery statement, x_join should embed (sub.select()) alias
-        stmt = Statement("tableA a")
-        sub = Statement("tableB")
-        with patch.object(Statement, "select", return_value="SELECT id FROM tableB"):
+    def test_join_with_subquery_statement_renders_sql(self):
+        # Joining a subquery embeds its SQL without executing it, its values precede those of Where
+        stmt = Statement("tableA a").where("a.state", "1")
+        sub = Statement("tableB").field("id").where("kind", "x")
+        with patch.object(Statement, "select") as select:
             stmt.inner_join(sub, "b", "a.id = b.id")
+        select.assert_not_called()
         # Verify the second table (index 1) is the joined subquery
         t = stmt.part["from"].tables[1]
-        self.assertEqual(t.get_table(), "(SELECT id FROM tableB)")
+        self.assertEqual(t.get_table(), "(Select id From tableB Where `kind` = %s)")
         self.assertEqual(t.get_alias(), "b")
+        stmt.left_join(Statement("tableC").where("kind", "y"), "c", "c.id = a.id")
+        self.assertEqual(stmt.to_sql(), "Select * From tableA a Inner Join (Select id From tableB Where `kind` = %s) b On a.id = b.id "
+                                        "Left Join (Select * From tableC Where `kind` = %s) c On c.id = a.id Where `a.state` = %s")
+        self.assertEqual(stmt.values, ["x", "y", "1"])
+
+    def test_where_in_subquery_statement(self):
+        stmt = Statement("tableA").where("state", "1")
+        sub = Statement("tableB").field("aid").where("kind", "x")
+        with patch.object(Statement, "select") as select:
+            stmt.where({"id": sub})
+        select.assert_not_called()
+        self.assertEqual(stmt.to_sql(), "Select * From tableA Where `state` = %s And `id` in (Select aid From tableB Where `kind` = %s)")
+        self.assertEqual(stmt.values, ["1", "x"])
+    def test_group_by_appends_fields(self):
+        stmt = Statement("tableA")
+        self.assertIs(stmt.group_by("colA"), stmt)
+        self.assertIs(stmt.group_by(["colB", "colC"]), stmt)
+        self.assertEqual(stmt.to_sql(), "Select * From tableA Group By colA, colB, colC")
+        with self.assertRaises(ValueError):
+            stmt.group_by(("colD",))
 
-    def test_group_by_missing_key_raises_keyerror(self):
-        # Statement.__init__ uses key 'group', but group_by() uses 'group_by' -> KeyError
-        stmt = Statement("tableA")
-        with self.assertRaises(KeyError):
-            stmt.group_by("colA")
-        with self.assertRaises(KeyError):
-            stmt.group_by(["colA", "colB"])
-
-    def test_order_by_missing_key_raises_keyerror(self):
-        # Statement.__init__ uses key 'order', but order_by() uses 'order_by' -> KeyError
+    def test_order_by_appends_order(self):
         stmt = Statement("tableA")
-        with self.assertRaises(KeyError):
-            stmt.order_by("colA", "desc")
+        self.assertIs(stmt.order_by("colA", "desc"), stmt)
+        self.assertIs(stmt.order_by("colB"), stmt)
+        self.assertEqual(stmt.to_sql(), "Select * From tableA Order By colA Desc, colB Asc")
 
-    def test_having_missing_key_raises_keyerror(self):
-        # 'having' key is not initialized in __init__ -> KeyError
+    def test_having_after_group_by(self):
         stmt = Statement("tableA")
-        with self.assertRaises(KeyError):
-            stmt.having("count(*) > 1")
+        self.assertIs(stmt.group_by("colA").having("count(*) > 1"), stmt)
+        stmt.having("sum(colB) > 10")
+        self.assertEqual(stmt.to_sql(), "Select * From tableA Group By colA Having count(*) > 1 And sum(colB) > 10")
 
     def test_limit_offset_page_set_values_and_return_self(self):
         stmt = Statement("tableA")
@@ -200,6 +213,20 @@ class TestStatement(unittest.TestCase):
             self.assertTrue(mocked.called)
             self.assertEqual(stmt.part["limit"].limit, 1)
 
+    def test_insert_executes_sql_and_returns_rowcount(self):
+        executor = Mock()
+        executor.execute.return_value = Mock(rowcount=1)
+        stmt = Statement("tableA")
+        stmt.executor = executor
+        self.assertEqual(stmt.insert({"colA": 1, "colB": "x"}), 1)
+        executor.execute.assert_called_once_with("Insert Into tableA (`colA`, `colB`) Values (%s, %s)", [1, "x"])
+        executor.execute.return_value.close.assert_called_once()
+
+    def test_insert_with_where_raises(self):
+        stmt = Statement("tableA").where("colA = 1")
+        with self.assertRaises(ValueError):
+            stmt.insert({"colA": 1})
+
 
 if __name__ == "__main__":
     unittest.main()
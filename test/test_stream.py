@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import os
+import tempfile
+import unittest
+from unittest.mock import Mock
+
+from src.pydoo.api.sqlite_api import SQLiteConnection
+from src.pydoo.async_pydoo import AsyncPydoo
+from src.pydoo.executor import Executor, PooledExecutor
+from src.pydoo.pool import ConnectionPool
+from src.pydoo.pydoo import Pydoo
+
+
+class FakeStreamCursor(object):
+    def __init__(self, total):
+        self.total = total
+        self.position = 0
+        self.fetch_sizes = []
+        self.closed = False
+
+    def execute(self, query, args=None):
+        ...
+
+    def fetchmany(self, size):
+        self.fetch_sizes.append(size)
+        rows = [(i,) for i in range(self.position, min(self.position + size, self.total))]
+        self.position += rows.__len__()
+        return rows
+
+    def close(self):
+        self.closed = True
+
+
+class TestStream(unittest.TestCase):
+    def setUp(self):
+        self.cursor = FakeStreamCursor(10)
+        self.conn = Mock()
+        self.conn.cursor.return_value = self.cursor
+        self.doo = Pydoo(self.conn)
+        self.doo.result_type = Pydoo.ResultType.FETCH_STREAM
+        self.doo.chunk_size = 4
+
+    def test_rows_are_fetched_lazily_in_chunks(self):
+        rows = self.doo.query("Select id From t")
+        self.assertEqual(self.cursor.fetch_sizes, [])
+        self.assertEqual(next(rows), (0,))
+        self.assertEqual(self.cursor.fetch_sizes, [4])
+        self.assertEqual(list(rows), [(i,) for i in range(1, 10)])
+        self.assertTrue(self.cursor.closed)
+
+    def test_early_close_closes_cursor(self):
+        rows = self.doo.query("Select id From t")
+        next(rows)
+        rows.close()
+        self.assertTrue(self.cursor.closed)
+        self.assertEqual(self.cursor.position, 4)
+
+    def test_stream_cursor_class_is_used(self):
+        stream_cursor = object()
+        self.doo.executor.stream_cursor_class = stream_cursor
+        list(self.doo.query("Select id From t"))
+        self.conn.cursor.assert_called_with(stream_cursor)
+
+    def test_other_modes_use_default_cursor(self):
+        self.doo.executor.stream_cursor_class = object()
+        self.doo.result_type = Pydoo.ResultType.FETCH_CURSOR_RAW
+        self.doo.query("Select id From t")
+        self.conn.cursor.assert_called_with()
+
+    def test_unknown_driver_has_no_stream_cursor(self):
+        self.assertIsNone(Executor._detect_stream_cursor(self.conn))
+
+
+class TestPooledStream(unittest.TestCase):
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix=".sqlite3")
+        os.close(fd)
+        self.pool = ConnectionPool(lambda: SQLiteConnection.connect(self.path), min_size=1, max_size=2)
+        self.doo = Pydoo(PooledExecutor(self.pool))
+        self.doo.executor.execute("Create Table t (id Integer)").close()
+        self.doo.executor.execute("Insert Into t (id) Values (1), (2), (3)").close()
+        self.doo.result_type = Pydoo.ResultType.FETCH_STREAM
+        self.doo.chunk_size = 2
+
+    def tearDown(self):
+        self.pool.close()
+        os.remove(self.path)
+
+    def test_early_close_releases_connection(self):
+        rows = self.doo.query("Select id From t")
+        self.assertEqual(next(rows), (1,))
+        self.assertEqual(self.pool.stats()["in_use"], 1)
+        rows.close()
+        self.assertEqual(self.pool.stats()["in_use"], 0)
+
+    def test_async_stream(self):
+        async def run():
+            doo = AsyncPydoo(PooledExecutor(self.pool))
+            doo.result_type = AsyncPydoo.ResultType.FETCH_STREAM
+            doo.chunk_size = 2
+            rows = [row async for row in await doo.query("Select id From t")]
+            stream = await doo.query("Select id From t")
+            first = await stream.__anext__()
+            await stream.aclose()
+            return rows, first
+
+        rows, first = asyncio.run(run())
+        self.assertEqual(rows, [(1,), (2,), (3,)])
+        self.assertEqual(first, (1,))
+        self.assertEqual(self.pool.stats()["in_use"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,239 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import os
+import sqlite3
+import tempfile
+import threading
+import unittest
+
+from src.pydoo.api.sqlite_api import SQLiteConnection
+from src.pydoo.async_pydoo import AsyncPydoo
+from src.pydoo.executor import Executor, PooledExecutor
+from src.pydoo.pool import ConnectionPool
+from src.pydoo.pydoo import Pydoo
+
+
+class CountingExecutor(Executor):
+    """Executor counting the commits sent, the next commit or savepoint release fails when asked to."""
+    fail_commit = False
+    fail_release = False
+
+    def commit(self):
+        if self.fail_commit:
+            self.fail_commit = False
+            raise sqlite3.OperationalError("database is locked")
+        self.commits += 1
+        super().commit()
+
+    def release_savepoint(self, name: str):
+        if self.fail_release:
+            self.fail_release = False
+            raise sqlite3.OperationalError("database is locked")
+        super().release_savepoint(name)
+
+
+class TestTransaction(unittest.TestCase):
+    def setUp(self):
+        self.executor = CountingExecutor(SQLiteConnection.connect())
+        self.executor.commits = 0
+        self.executor.execute("Create Table t (id Integer, v Text)").close()
+        self.doo = Pydoo(self.executor)
+        self.doo.result_type = Pydoo.ResultType.FETCH_ALL
+
+    def ids(self) -> list[int]:
+        return [row[0] for row in self.doo.query("Select id From t Order By id")]
+
+    def test_commit(self):
+        with self.doo.transaction() as transaction:
+            self.doo.table("t").insert({"id": 1, "v": "a"})
+            self.doo.execute("Insert Into t Values (2, 'b')")
+            self.assertTrue(self.executor.connection().connection.in_transaction)
+        self.assertFalse(self.executor.connection().connection.in_transaction)
+        self.assertEqual(self.ids(), [1, 2])
+        self.assertEqual((transaction.commits, self.executor.commits), (1, 1))
+
+    def test_rollback(self):
+        with self.assertRaises(KeyError):
+            with self.doo.transaction():
+                self.doo.table("t").insert({"id": 1, "v": "a"})
+                raise KeyError("id")
+        self.assertEqual(self.ids(), [])
+
+    def test_savepoint(self):
+        with self.doo.transaction() as outer:
+            self.doo.table("t").insert({"id": 1, "v": "a"})
+            with self.assertRaises(KeyError):
+                with self.doo.transaction() as inner:
+                    self.assertEqual(inner.savepoint, "pydoo_sp_1")
+                    self.doo.table("t").insert({"id": 2, "v": "b"})
+                    raise KeyError("id")
+            with self.doo.transaction():
+                self.doo.table("t").insert({"id": 3, "v": "c"})
+                with self.doo.transaction() as innermost:
+                    self.assertEqual(innermost.savepoint, "pydoo_sp_2")
+                    for transaction in (innermost, outer):
+                        with self.assertRaisesRegex(ValueError, "^Only the outermost transaction can be flushed, not a savepoint"):
+                            transaction.flush()
+        self.assertEqual(self.ids(), [1, 3])
+        self.assertEqual(self.executor.commits, 1)
+        with self.assertRaises(ValueError):
+            with self.doo.transaction():
+                with self.doo.transaction(commit_every=10):
+                    pass
+
+    def test_failed_commit_rolls_back(self):
+        self.executor.fail_commit = True
+        with self.assertRaises(sqlite3.OperationalError):
+            with self.doo.transaction():
+                self.doo.table("t").insert({"id": 1, "v": "a"})
+        self.assertFalse(self.executor.connection().connection.in_transaction)
+        self.assertEqual(self.ids(), [])
+        with self.doo.transaction():
+            self.doo.table("t").insert({"id": 2, "v": "b"})
+            self.executor.fail_release = True
+            with self.assertRaises(sqlite3.OperationalError):
+                with self.doo.transaction():
+                    self.doo.table("t").insert({"id": 3, "v": "c"})
+        self.assertEqual(self.ids(), [2])
+
+    def test_result_cache(self):
+        with self.doo.transaction():
+            self.doo.table("t").insert({"id": 1, "v": "a"})
+            self.assertEqual(self.doo.table("t").cache().select().__len__(), 1)
+            with self.assertRaises(KeyError):
+                with self.doo.transaction():
+                    self.doo.table("t").insert({"id": 2, "v": "b"})
+                    self.assertEqual(self.doo.table("t").cache().select().__len__(), 2)
+                    raise KeyError("id")
+            # Read inside the rolled back savepoint, invalidated when it ended
+            self.assertEqual(self.doo.table("t").cache().select().__len__(), 1)
+
+    def test_batch_every(self):
+        with self.doo.transaction(commit_every=3) as transaction:
+            for index in range(7):
+                self.doo.table("t").insert({"id": index, "v": "a"})
+            with self.assertRaises(KeyError):
+                with self.doo.transaction():
+                    # No batch commit inside a savepoint
+                    self.doo.table("t").insert_many([{"id": 7, "v": "a"}, {"id": 8, "v": "a"}], batch_size=1)
+                    self.assertEqual(transaction.writes, 3)
+                    raise KeyError("id")
+            self.doo.query("Select * From t")
+            self.assertEqual(transaction.writes, 3)
+            self.doo.execute("Delete From t Where id = 6")
+            self.assertEqual(transaction.writes, 0)
+        self.assertEqual(transaction.commits, 4)
+        self.assertEqual(self.ids(), [0, 1, 2, 3, 4, 5])
+
+    def test_batch_rollback(self):
+        with self.assertRaises(KeyError):
+            with self.doo.transaction(commit_every=2):
+                for index in range(5):
+                    self.doo.table("t").insert({"id": index, "v": "a"})
+                raise KeyError("id")
+        # The writes since the last commit only
+        self.assertEqual(self.ids(), [0, 1, 2, 3])
+
+    def test_batch_interval(self):
+        with self.doo.transaction(commit_interval_ms=1) as transaction:
+            transaction.started -= 1
+            self.doo.table("t").insert({"id": 1, "v": "a"})
+            self.assertEqual(transaction.commits, 1)
+            self.doo.table("t").insert({"id": 2, "v": "a"})
+            self.assertEqual(transaction.commits, 1)
+        self.assertEqual(transaction.commits, 2)
+        with self.assertRaises(ValueError):
+            self.doo.transaction(commit_every=0)
+
+
+class TestPooledTransaction(unittest.TestCase):
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix=".sqlite3")
+        os.close(fd)
+        self.pool = ConnectionPool(lambda: SQLiteConnection.connect(self.path, timeout=0.1), min_size=1, max_size=2)
+        self.executor = PooledExecutor(self.pool)
+        self.executor.execute("Create Table t (id Integer)").close()
+        self.doo = Pydoo(self.executor)
+        self.doo.result_type = Pydoo.ResultType.FETCH_ALL
+
+    def tearDown(self):
+        self.executor.close()
+        os.remove(self.path)
+
+    def test_pinned(self):
+        other = []
+        with self.doo.transaction():
+            self.doo.execute("Insert Into t Values (1)")
+            self.assertEqual(self.doo.query("Select id From t"), [(1,)])
+            # Another thread runs on another connection and does not see the uncommitted row
+            thread = threading.Thread(target=lambda: other.extend(self.doo.query("Select id From t")))
+            thread.start()
+            thread.join()
+            with self.assertRaises(ValueError):
+                self.executor.begin()
+        self.assertEqual(other, [])
+        self.assertEqual(self.doo.query("Select id From t"), [(1,)])
+        with self.assertRaises(ValueError):
+            self.executor.commit()
+
+    def test_rollback(self):
+        with self.assertRaises(KeyError):
+            with self.doo.transaction():
+                self.doo.execute("Insert Into t Values (1)")
+                raise KeyError("id")
+        self.assertEqual(self.doo.query("Select id From t"), [])
+
+
+class TestAsyncTransaction(unittest.TestCase):
+    def test_async(self):
+        executor = CountingExecutor(SQLiteConnection.connect())
+        executor.commits = 0
+        executor.execute("Create Table t (id Integer)").close()
+
+        async def run():
+            async with AsyncPydoo(executor) as doo:
+                doo.result_type = AsyncPydoo.ResultType.FETCH_ALL
+                async with doo.transaction(commit_every=2) as transaction:
+                    await doo.table("t").insert({"id": 1})
+                    try:
+                        async with doo.transaction():
+                            await doo.execute("Insert Into t Values (2)")
+                            raise KeyError("id")
+                    except KeyError:
+                        pass
+                    await doo.table("t").insert({"id": 3})
+                    await doo.table("t").insert({"id": 4})
+                return transaction, await doo.query("Select id From t Order By id")
+
+        transaction, rows = asyncio.run(run())
+        self.assertEqual(rows, [(1,), (3,), (4,)])
+        self.assertEqual(transaction.commits, 2)
+
+    def test_failed_commit_rolls_back(self):
+        executor = CountingExecutor(SQLiteConnection.connect())
+        executor.execute("Create Table t (id Integer)").close()
+        executor.fail_commit = True
+
+        async def run():
+            async with AsyncPydoo(executor) as doo:
+                doo.result_type = AsyncPydoo.ResultType.FETCH_ALL
+                with self.assertRaises(sqlite3.OperationalError):
+                    async with doo.transaction():
+                        await doo.execute("Insert Into t Values (1)")
+                return await doo.query("Select id From t")
+
+        self.assertEqual(asyncio.run(run()), [])
+        self.assertFalse(executor.connection().connection.in_transaction)
+
+    def test_pooled(self):
+        async def run():
+            async with AsyncPydoo(PooledExecutor(ConnectionPool(SQLiteConnection.connect, max_size=1))) as doo:
+                async with doo.transaction():
+                    pass
+
+        with self.assertRaises(ValueError):
+            asyncio.run(run())
+
+
+if __name__ == "__main__":
+    unittest.main()
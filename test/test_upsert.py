@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+import unittest
+from unittest.mock import Mock
+
+from src.pydoo.api.sqlite_api import SQLiteConnection
+from src.pydoo.executor import Executor
+from src.pydoo.pydoo import Pydoo
+from src.pydoo.statement import Statement
+
+
+class TestUpsertSql(unittest.TestCase):
+    def setUp(self):
+        self.executor = Mock()
+        self.executor.type = "mysql"
+        self.executor.placeholder = "%s"
+        self.executor.max_bind_params = 65535
+        self.executor.max_packet_size = 4 * 1024 * 1024
+        self.executor.execute.side_effect = lambda sql, args: Mock(rowcount=1)
+
+    def statement(self):
+        stmt = Statement("t")
+        stmt.executor = self.executor
+        return stmt
+
+    def sql(self) -> list[str]:
+        return [call.args[0] for call in self.executor.execute.call_args_list]
+
+    def test_mysql(self):
+        rows = [{"id": 1, "name": "a", "hits": 1}, {"id": 2, "name": "b", "hits": 1}]
+        self.statement().upsert_many(rows, keys="id", update=["name", "hits+="])
+        self.statement().upsert_many(rows[:1], keys="id", update=[])
+        self.assertEqual(self.sql(), [
+            "Insert Into t (`id`, `name`, `hits`) Values (%s, %s, %s), (%s, %s, %s) "
+            "On Duplicate Key Update `name` = Values(`name`), `hits` = `hits` + Values(`hits`)",
+            "Insert Into t (`id`, `name`, `hits`) Values (%s, %s, %s) On Duplicate Key Update `id` = `id`",
+        ])
+        self.assertEqual(self.executor.execute.call_args_list[0].args[1], [1, "a", 1, 2, "b", 1])
+
+    def test_sqlite(self):
+        self.executor.type = "sqlite"
+        self.statement().upsert_many([{"a": 1, "b": 2, "v": 3}], keys=["a", "b"])
+        self.statement().upsert_many([{"a": 1, "b": 2, "v": 3}], keys=["a", "b"], update=[])
+        self.assertEqual(self.sql(), [
+            "Insert Into t (`a`, `b`, `v`) Values (%s, %s, %s) On Conflict (`a`, `b`) Do Update Set `v` = excluded.`v`",
+            "Insert Into t (`a`, `b`, `v`) Values (%s, %s, %s) On Conflict (`a`, `b`) Do Nothing",
+        ])
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            self.statement().upsert_many([{"id": 1}], keys="uid")
+        with self.assertRaises(ValueError):
+            self.statement().upsert_many([{"id": 1, "v": 1}], keys="id", update=["w"])
+        with self.assertRaises(ValueError):
+            self.statement().where({"id": 1}).upsert_many([{"id": 1}], keys="id")
+        with self.assertRaises(ValueError):
+            self.statement().update_many_by_key([{"id": 1}], key="id")
+
+    def test_update_by_key(self):
+        rows = [{"id": 1, "name": "a", "n": 10}, {"id": 2, "name": "b", "n": 20}]
+        self.statement().update_many_by_key(rows, key="id")
+        self.assertEqual(self.sql(), [
+            "Update t Set `name` = Case `id` When %s Then %s When %s Then %s Else `name` End, "
+            "`n` = Case `id` When %s Then %s When %s Then %s Else `n` End Where `id` In (%s, %s)"])
+        self.assertEqual(self.executor.execute.call_args_list[0].args[1], [1, "a", 2, "b", 1, 10, 2, 20, 1, 2])
+
+    def test_update_by_composite_key(self):
+        self.statement().update_many_by_key([{"a": 1, "b": 2, "v": 3}], key=["a", "b"])
+        self.assertEqual(self.sql(), [
+            "Update t Set `v` = Case When `a` = %s And `b` = %s Then %s Else `v` End Where (`a`, `b`) In ((%s, %s))"])
+        self.assertEqual(self.executor.execute.call_args_list[0].args[1], [1, 2, 3, 1, 2])
+
+    def test_update_by_key_batches(self):
+        # 2 set columns and the key take 2 * 2 + 1 parameters a row
+        self.executor.max_bind_params = 11
+        self.statement().update_many_by_key(({"id": index, "a": index, "b": index} for index in range(5)), key="id", batch_size=3)
+        self.assertEqual([len(call.args[1]) // 5 for call in self.executor.execute.call_args_list], [2, 1, 2])
+
+
+class TestUpsertSQLite(unittest.TestCase):
+    def setUp(self):
+        self.executor = Executor(SQLiteConnection.connect())
+        self.executor.execute("Create Table t (id Integer Primary Key, name Text, hits Integer)").close()
+        self.executor.execute("Insert Into t Values (1, 'a', 1), (2, 'b', 1)").close()
+        self.doo = Pydoo(self.executor)
+        self.doo.logging = True
+        self.doo.result_type = Pydoo.ResultType.FETCH_ALL
+
+    def rows(self) -> list[tuple]:
+        return self.doo.query("Select id, name, hits From t Order By id")
+
+    def test_detect_type(self):
+        self.assertEqual(self.executor.type, "sqlite")
+        self.assertEqual(self.doo.dialect.name, "sqlite")
+
+    def test_upsert(self):
+        cached = self.doo.table("t").cache().select()
+        self.doo.table("t").upsert_many([{"id": 2, "name": "B", "hits": 5}, {"id": 3, "name": "c", "hits": 1}],
+                                        keys="id", update=["name", "hits+="], batch_size=1)
+        self.assertEqual(self.rows(), [(1, "a", 1), (2, "B", 6), (3, "c", 1)])
+        self.assertNotEqual(self.doo.table("t").cache().select(), cached)
+
+    def test_update_by_key(self):
+        self.executor.max_bind_params = 7
+        updated = self.doo.table("t").update_many_by_key(
+            [{"id": 1, "name": "x", "hits": 7}, {"id": 2, "name": "y", "hits": 8}, {"id": 9, "name": "z", "hits": 9}], key="id")
+        self.assertEqual(updated, 2)
+        self.assertEqual([event.kind for event in self.doo.logs], ["execute"] * 3)
+        self.assertEqual(self.rows(), [(1, "x", 7), (2, "y", 8)])
+
+
+if __name__ == "__main__":
+    unittest.main()
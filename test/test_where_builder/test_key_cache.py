@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+import unittest
+
+from src.pydoo.where_builder2.key_cache import KeyParser, ParsedKey, parse_key
+from src.pydoo.where_builder2.lex import Lex
+from src.pydoo.where_builder2.parser import Parser
+
+
+class TestKeyParser(unittest.TestCase):
+    def test_parse(self):
+        test_cases = (
+            ('name?^', (('name', '?^'), ('name', 'Like'), Parser.Remark.REMARK_LIKE_PREFIX)),
+            ('col/FROM_UNIXTIME/DATE', (('col', '/', 'FROM_UNIXTIME', '/', 'DATE'), ('DATE(FROM_UNIXTIME(col))',), Parser.Remark.REMARK_NULL)),
+            ('id,between', (('id', ',', 'between'), ('id', 'Between'), Parser.Remark.REMARK_BETWEEN)),
+            ('#or', (('#', 'or'), (), Parser.Remark.REMARK_OR)),
+            ('col->Integer', (('col', '->', 'Integer'), ('Cast(col As Integer)',), Parser.Remark.REMARK_NULL)),
+        )
+        for parser in (KeyParser(), KeyParser(lexer=Lex)):
+            for key, (parts, packed, remark) in test_cases:
+                self.assertEqual(parser.parse(key), ParsedKey(key, parts, packed, remark))
+
+    def test_cache_hits(self):
+        parser = KeyParser()
+        first = parser.parse('name?^')
+        self.assertIs(parser.parse('name?^'), first)
+        parser.parse('id')
+        self.assertEqual(parser.stats(), {"size": 1024, "length": 2, "hits": 1, "misses": 2})
+        with self.assertRaises(AttributeError):
+            first.remark = Parser.Remark.REMARK_NULL
+
+    def test_lru_bound(self):
+        parser = KeyParser(size=2)
+        parser.parse('a')
+        parser.parse('b')
+        parser.parse('a')
+        parser.parse('c')
+        self.assertEqual(parser.stats(), {"size": 2, "length": 2, "hits": 1, "misses": 3})
+        # 'a' was used last and is kept, 'b' was evicted
+        parser.parse('a')
+        parser.parse('b')
+        self.assertEqual(parser.stats()["hits"], 2)
+        parser.resize(0)
+        parser.parse('a')
+        self.assertEqual(parser.stats(), {"size": 0, "length": 0, "hits": 0, "misses": 1})
+        with self.assertRaises(ValueError):
+            parser.resize(-1)
+
+    def test_invalid_key(self):
+        parser = KeyParser()
+        for key in ('?!', ':col', 'col, foo'):
+            with self.assertRaises(ValueError):
+                parser.parse(key)
+        self.assertEqual(parser.stats()["length"], 0)
+        with self.assertRaises(ValueError):
+            parser.parse(1)
+
+    def test_shared_parser(self):
+        self.assertEqual(parse_key('col:').packed, ('col', 'In'))
+
+
+if __name__ == "__main__":
+    unittest.main()
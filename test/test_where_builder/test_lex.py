@@ -1,10 +1,14 @@
 # -*- coding: utf-8 -*-
 
+import random
 import unittest
 
 from pydoo.where_builder2.lex import Lex
+from pydoo.where_builder2.table_lex import TableLex
 
 class TestLex(unittest.TestCase):
+    lex_class = Lex
+
     def test_key_op_depart(self):
         test_cases = (
             ('id', ['id']),
@@ -41,9 +45,30 @@ class TestLex(unittest.TestCase):
         )
 
         for test_case, expect in test_cases:
-            lex = Lex(test_case)
+            lex = self.lex_class(test_case)
             if isinstance(expect, BaseException):
                 with self.assertRaises(expect.__class__):
                     lex.key_op_depart()
             else:
                 self.assertListEqual(lex.key_op_depart(), expect)
+
+
+class TestTableLex(TestLex):
+    lex_class = TableLex
+
+    def test_same_as_lex(self):
+        rand = random.Random(20260418)
+        chars = 'ab_1 ,|/{}()#-><=!?~:\\*\'%'
+        tokens = ['col', ' ', ',', 'eq', 'not like', '|', '/', 'F(*, 1)', 'G', '(', ')', '{', '}', '#', 'or', '->', 'int',
+                  '=', '<=', '!', '!?', '?^', ':', '~', '\\', '*', '\'']
+        keys = [''.join(rand.choice(chars) for _ in range(rand.randint(1, 12))) for _ in range(3000)]
+        keys += [''.join(rand.choice(tokens) for _ in range(rand.randint(1, 6))) for _ in range(3000)]
+        for key in keys:
+            try:
+                expect = Lex(key).key_op_depart()
+            except ValueError as e:
+                with self.assertRaises(ValueError, msg=key) as cm:
+                    TableLex(key).key_op_depart()
+                self.assertEqual(str(cm.exception), str(e), msg=key)
+            else:
+                self.assertListEqual(TableLex(key).key_op_depart(), expect, msg=key)
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+import threading
+import time
+import unittest
+
+from src.pydoo.api.sqlite_api import SQLiteConnection
+from src.pydoo.exception import WriterClosedError, WriterFullError
+from src.pydoo.executor import Executor
+from src.pydoo.pydoo import Pydoo
+
+
+class TestBufferedWriter(unittest.TestCase):
+    def setUp(self):
+        self.executor = Executor(SQLiteConnection.connect())
+        self.executor.connection().connection.execute("Create Table events (id Integer, v Text)")
+        self.doo = Pydoo(self.executor)
+        self.doo.result_type = Pydoo.ResultType.FETCH_ALL
+        self.doo.logging = True
+
+    def inserts(self) -> list[int]:
+        # Rows of every Insert statement sent, 2 values a row
+        return [event.params // 2 for event in self.doo.logs if event.kind == "execute"]
+
+    def count(self) -> int:
+        return self.doo.query("Select Count(*) From events")[0][0]
+
+    def test_max_rows(self):
+        with self.doo.table("events").writer(max_rows=10, max_latency_ms=60000, batch_size=4) as writer:
+            writer.write_many({"id": index, "v": "a"} for index in range(25))
+            writer.flush()
+            self.assertEqual(self.count(), 25)
+            self.assertEqual(len(writer), 0)
+        # Two flushes of 10 rows in batches of 4 and the rest by flush()
+        self.assertEqual(sum(self.inserts()), 25)
+        self.assertTrue(all(rows <= 4 for rows in self.inserts()))
+        self.assertEqual(writer.stats()["rows"], 25)
+        with self.assertRaises(WriterClosedError):
+            writer.write({"id": 1, "v": "a"})
+
+    def test_max_latency(self):
+        writer = self.doo.table("events").writer(max_rows=1000, max_latency_ms=20)
+        writer.write({"id": 1, "v": "a"})
+        deadline = time.monotonic() + 5
+        while writer.stats()["rows"] < 1 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(self.count(), 1)
+        writer.write({"id": 2, "v": "a"})
+        writer.close()
+        self.assertEqual(self.count(), 2)
+
+    def test_back_pressure(self):
+        release = threading.Event()
+        execute = self.executor.execute
+
+        def slow(query, args=None):
+            release.wait(5)
+            return execute(query, args)
+        self.executor.execute = slow
+
+        writer = self.doo.table("events").writer(max_rows=2, max_latency_ms=60000, max_pending=4, block_timeout=0.05)
+        for index in range(4):
+            writer.write({"id": index, "v": "a"})
+        with self.assertRaises(WriterFullError):
+            writer.write({"id": 4, "v": "a"})
+        release.set()
+        writer.write({"id": 4, "v": "a"})
+        writer.close()
+        self.assertEqual(self.count(), 5)
+
+    def test_errors(self):
+        writer = self.doo.table("events").writer(max_rows=2, max_latency_ms=60000)
+        writer.write_many([{"id": 1, "missing": "a"}, {"id": 2, "missing": "b"}])
+        with self.assertRaises(Exception):
+            writer.flush()
+        writer.write({"id": 3, "v": "c"})
+        writer.close()
+        self.assertEqual(self.count(), 1)
+
+        failed = []
+        writer = self.doo.table("events").writer(max_rows=10, on_error=lambda error, rows: failed.extend(rows))
+        writer.write({"id": 1, "missing": "a"})
+        writer.close()
+        self.assertEqual(failed, [{"id": 1, "missing": "a"}])
+        self.assertEqual(writer.stats()["errors"], 1)
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            self.doo.table("events").where({"id": 1}).writer()
+        with self.assertRaises(ValueError):
+            self.doo.table("events").writer(max_rows=10, max_pending=5)
+        with self.doo.table("events").writer() as writer:
+            with self.assertRaises(ValueError):
+                writer.write({})
+
+
+if __name__ == "__main__":
+    unittest.main()